@@ -0,0 +1,50 @@
+"""
+Measures the import time of the packages and the startup time of the rule scripts.
+
+Each target runs in a fresh interpreter, as Snakemake runs each rule, and the median
+of several runs is reported. Add `-X importtime` to a target's command to see which
+imports dominate.
+
+Usage: python etc/benchmark_startup.py [--runs 10] [--script projects/.../S301_parse_llm_annotation.py]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+DEFAULT_MODULES = ["llm_inference.backends", "llm_inference.cache", "more_europa.helpers"]
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_command(command, runs: int) -> float:
+    """Returns the median wall time of a command in milliseconds."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.path.join(REPO_DIR, "src"), os.environ.get("PYTHONPATH")])))
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, env=env, stdout=subprocess.DEVNULL)
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="Runs per target (default: 10)")
+    parser.add_argument("--module", action="append", default=[], help="Module to import (repeatable, default: the packages)")
+    parser.add_argument("--script", action="append", default=[], help="Rule script to run with --help (repeatable)")
+    args = parser.parse_args()
+
+    baseline = time_command([sys.executable, "-c", "pass"], args.runs)
+    print(f"{'interpreter':<60} {baseline:>8.1f} ms")
+    for module in args.module or DEFAULT_MODULES:
+        duration = time_command([sys.executable, "-c", f"import {module}"], args.runs)
+        print(f"{'import ' + module:<60} {duration - baseline:>+8.1f} ms")
+    for script in args.script:
+        duration = time_command([sys.executable, script, "--help"], args.runs)
+        print(f"{os.path.basename(script) + ' --help':<60} {duration - baseline:>+8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
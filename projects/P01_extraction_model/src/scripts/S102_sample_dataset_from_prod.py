@@ -1,4 +1,3 @@
-import weaviate
 import json
 import random
 import os
@@ -6,9 +5,11 @@ import io
 import click
 from tqdm import tqdm
 from datetime import datetime
-from weaviate.classes.query import Filter
 from pprint import pprint
 
+from more_europa.helpers.sampling import fetch_objects_by_ids, iter_uuids, reservoir_sample, sample_uuids_by_cursor
+from more_europa.helpers.vector_store import WeaviateConnectionManager
+
 from dotenv import load_dotenv
 
 # set random seed for reproducibility
@@ -24,27 +25,19 @@ def serialize(obj):
     raise TypeError(f"Type {type(obj)} not serializable")
 
 
-def sample_from_collection(publication_collection, n_samples):
+def sample_from_collection(publication_collection, n_samples, method="reservoir", seed=None):
     """
-    Sample n_samples from iterator
+    Sample n_samples UUIDs, uniformly with a single scan of the ids (reservoir) or with random cursors (cursor, biased)
     """
     total_count = publication_collection.aggregate.over_all(total_count=True).total_count
     print(f"Total objects in collection: {total_count}")
 
-    iterator = publication_collection.iterator()
-
-    print("Collecting UUIDs")
-    uuids = []
-
-    pbar = tqdm(total=total_count)
-    for i, item in enumerate(iterator):
-        uuids.append(item.uuid)
-        pbar.update(1)
-
-    pbar.close()
-
-    print(f"Collected {len(uuids)} UUIDs")
-    sampled = random.sample(uuids, n_samples)
+    if method == "cursor":
+        sampled = sample_uuids_by_cursor(publication_collection, n_samples, seed=seed)
+    else:
+        print("Scanning UUIDs")
+        uuids = tqdm(iter_uuids(publication_collection), total=total_count)
+        sampled = reservoir_sample(uuids, n_samples, seed=seed)
 
     print(f"Sampled {len(sampled)} UUIDs")
 
@@ -55,51 +48,36 @@ def sample_from_collection(publication_collection, n_samples):
 @click.option('--collection_name', help='Collection name to fetch data from')
 @click.option('--output_jsonl', help='Output JSONL file')
 @click.option('--seed', default=42, help='Random seed for reproducibility')
-def fetch_weaviate_data(n_samples, collection_name, output_jsonl, seed):
+@click.option('--method', type=click.Choice(['reservoir', 'cursor']), default='reservoir', help='Sample uniformly with a scan of the ids (reservoir), or without a scan but with a bias towards objects after large id gaps (cursor)')
+@click.option('--fetch_workers', default=4, help='Number of concurrent fetch queries')
+def fetch_weaviate_data(n_samples, collection_name, output_jsonl, seed, method, fetch_workers):
     # Set random seed for reproducibility
     random.seed(seed)
 
-    # Configuration dictionary
-    weaviate_conf = {
-        "http_host": os.getenv("WEAVIATE__HTTP_HOST"),
-        "http_port": os.getenv("WEAVIATE__HTTP_PORT"),
-        "http_secure": True,
-        "grpc_host": os.getenv("WEAVIATE__GRPC_HOST"),
-        "grpc_port": os.getenv("WEAVIATE__GRPC_PORT"),
-        "grpc_secure": False,
-        "skip_init_checks": True,
-    }
-
-    # Connect to Weaviate
-    weaviate_client = weaviate.connect_to_custom(**weaviate_conf)
-
-    # Access the specified collection
-    print(f"Fetching data from collection: {collection_name}")
-    publication_collection = weaviate_client.collections.get(collection_name)
-    
-    # Sample UUIDs
-    random_uuid = sample_from_collection(publication_collection, n_samples)
-
-    # Fetch detailed objects by sampled UUIDs
-    print(f"Fetching {len(random_uuid)} objects")
-    response = publication_collection.query.fetch_objects(
-        filters=Filter.by_id().contains_any(random_uuid)
-    )
-    
-    print(f"Fetched {len(response.objects)} objects")
-
-    # Close connection
-    weaviate_client.close()
+    # Connect to Weaviate, the connection is closed on exit
+    with WeaviateConnectionManager() as weaviate_client:
+        # Access the specified collection
+        print(f"Fetching data from collection: {collection_name}")
+        publication_collection = weaviate_client.collections.get(collection_name)
+
+        # Sample UUIDs
+        random_uuid = sample_from_collection(publication_collection, n_samples, method=method, seed=seed)
+
+        # Fetch detailed objects by sampled UUIDs, in chunks
+        print(f"Fetching {len(random_uuid)} objects")
+        objects = fetch_objects_by_ids(publication_collection, random_uuid, workers=fetch_workers)
+
+        print(f"Fetched {len(objects)} objects")
 
     # make sure output directory exists
     os.makedirs(os.path.dirname(output_jsonl), exist_ok=True)
 
     # Save to JSONL file
     with io.open(output_jsonl, "w", encoding="utf-8") as f:
-        for obj in response.objects:
+        for obj in objects:
             f.write(json.dumps(obj.properties, default=serialize) + "\n")
 
-    print(f"Saved {len(response.objects)} objects to {output_jsonl}")
+    print(f"Saved {len(objects)} objects to {output_jsonl}")
 
 if __name__ == "__main__":
     fetch_weaviate_data()
@@ -0,0 +1,33 @@
+import click
+from dotenv import load_dotenv
+
+from more_europa.helpers.export import export_collection
+from more_europa.helpers.vector_store import WeaviateConnectionManager
+
+# Load environment variables
+load_dotenv()
+
+@click.command()
+@click.option('--collection_name', required=True, help='Collection name to export')
+@click.option('--output_dir', required=True, help='Output directory of the shards and their manifest')
+@click.option('--num_shards', default=64, help='Number of UUID ranges exported as shards')
+@click.option('--workers', default=8, help='Number of shards read concurrently')
+@click.option('--properties', default=None, help='Comma-separated properties to export (default: all)')
+@click.option('--format', 'file_format', type=click.Choice(['parquet', 'jsonl']), default='parquet', help='Shard format')
+def export(collection_name, output_dir, num_shards, workers, properties, file_format):
+    """Export a Weaviate collection to shards, resuming a previous export in the same directory."""
+    return_properties = properties.split(",") if properties else None
+    with WeaviateConnectionManager() as weaviate_client:
+        collection = weaviate_client.collections.get(collection_name)
+        manifest = export_collection(
+            collection,
+            output_dir,
+            num_shards=num_shards,
+            workers=workers,
+            return_properties=return_properties,
+            file_format=file_format,
+        )
+    print(f"Exported {manifest['rows']} objects to {output_dir}")
+
+if __name__ == "__main__":
+    export()
@@ -2,7 +2,8 @@ import os
 import json
 import click
 from dotenv import load_dotenv
-from more_europa import helpers
+from llm_inference.backends.mistral_sync import MistralBackend
+from more_europa.helpers.prefilter import RegistryPreFilter, make_negative_response, make_text
 
 # Load environment variables
 load_dotenv()
@@ -12,8 +13,13 @@ load_dotenv()
 @click.option('--prompt_txt', type=str, required=True, help="Path to the annotation prompt text file")
 @click.option('--model_config', type=str, required=True, help="Path to the model configuration JSON file")
 @click.option('--n_samples', type=int, required=False, default=None, help="Number of samples to generate per record")
+@click.option('--prefilter/--no-prefilter', default=False, help="Label clearly non-registry abstracts locally instead of calling the LLM")
+@click.option('--registry_names_json', type=str, required=False, default=None, help="Path to a registry names dataset whose names extend the pre-filter vocabulary")
+@click.option('--dedup_threshold', type=float, required=False, default=None, help="Annotate one representative per cluster of abstracts above this Jaccard similarity and reuse its annotation")
+@click.option('--dedup_audit_jsonl', type=str, required=False, default=None, help="Path to the JSONL audit trail of reused annotations")
+@click.option('--output_schema', type=str, required=False, default=None, help="Path to a JSON output schema the LLM responses are validated against, re-asking on invalid ones")
 @click.option('--output_jsonl', type=str, required=True, help="Path to output JSONL file with LLM annotations")
-def annotate_with_llm(base_pubmed_dataset_jsonl, prompt_txt, model_config, n_samples, output_jsonl):
+def annotate_with_llm(base_pubmed_dataset_jsonl, prompt_txt, model_config, n_samples, prefilter, registry_names_json, dedup_threshold, dedup_audit_jsonl, output_schema, output_jsonl):
     """Annotate the base PubMed dataset using an LLM model."""
     
     # Load model configuration
@@ -28,6 +34,13 @@ def annotate_with_llm(base_pubmed_dataset_jsonl, prompt_txt, model_config, n_sam
 
     print(f"Loaded annotation prompt: {annotation_prompt}")
 
+    # Load the output schema the responses are validated against
+    schema = None
+    if output_schema is not None:
+        from llm_inference.schema import OutputSchema
+        schema = OutputSchema.from_json(output_schema)
+        print(f"Loaded output schema: {schema.name}")
+
     # Load base PubMed dataset
     records = []
     with open(base_pubmed_dataset_jsonl, "r", encoding="utf-8") as f:
@@ -51,17 +64,61 @@ def annotate_with_llm(base_pubmed_dataset_jsonl, prompt_txt, model_config, n_sam
         prompts.append(full_prompt)
 
 
-    # # Perform batch inference using the LLM
-    llm_responses = helpers.mistral.inference_by_one(prompts=prompts, model_config=model_config_data)
+    # Keep only the records that may refer to a registry for the LLM
+    if prefilter:
+        if registry_names_json is not None:
+            registry_prefilter = RegistryPreFilter.from_registry_names_dataset(registry_names_json)
+        else:
+            registry_prefilter = RegistryPreFilter()
+        is_candidate = [registry_prefilter.is_candidate(make_text(record)) for record in records]
+    else:
+        is_candidate = [True] * len(records)
+
+    # Annotate one representative per cluster of near-duplicate abstracts
+    representatives = {}
+    if dedup_threshold is not None:
+        from more_europa.helpers.dedup import NearDuplicateDetector
+        detector = NearDuplicateDetector(threshold=dedup_threshold)
+        for index, (record, candidate) in enumerate(zip(records, is_candidate)):
+            if candidate:
+                representatives[index] = detector.add(index, record.get("abstract") or "")
+    is_representative = [candidate and representatives.get(index, (index,))[0] == index for index, candidate in enumerate(is_candidate)]
+
+    candidate_prompts = [prompt for prompt, representative in zip(prompts, is_representative) if representative]
+    print(f"Sending {len(candidate_prompts)} of {len(prompts)} records to the LLM")
+
+    # # Perform inference using the LLM, in the order of the prompts
+    backend = MistralBackend(api_key=os.environ["MISTRAL_API_KEY"], output_schema=schema)
+    prompt_items = [{"custom_id": str(index), "prompt": prompt} for index, prompt in enumerate(candidate_prompts)]
+    responses = {result.pop("custom_id"): result for result in backend.infer_many(prompt_items, model_config_data)}
+    llm_responses = iter(responses[item["custom_id"]] for item in prompt_items)
 
     results = []
+    annotations = {}
     # # Attach annotations to records
-    for record, annotation in zip(records, llm_responses):
+    for index, (record, candidate) in enumerate(zip(records, is_candidate)):
+        if is_representative[index]:
+            annotation = annotations[index] = next(llm_responses)
+        elif candidate:
+            representative = representatives[index][0]
+            annotation = dict(annotations[representative], reused_from=records[representative].get("object_id"))
+        else:
+            annotation = make_negative_response()
         results.append({
             "object_id": record.get("object_id"),
             "llm_response": annotation
         })
 
+    if dedup_audit_jsonl is not None:
+        from more_europa.helpers.dedup import write_reuse_audit
+        os.makedirs(os.path.dirname(dedup_audit_jsonl) or ".", exist_ok=True)
+        audit = {
+            records[index].get("object_id"): (records[representative].get("object_id"), similarity)
+            for index, (representative, similarity) in representatives.items()
+        }
+        reused = write_reuse_audit(audit, dedup_audit_jsonl, threshold=dedup_threshold)
+        print(f"Reused {reused} annotations, audit trail saved to {dedup_audit_jsonl}")
+
     # makedir
     os.makedirs(os.path.dirname(output_jsonl), exist_ok=True)
 
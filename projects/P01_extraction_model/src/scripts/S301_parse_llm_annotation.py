@@ -21,16 +21,20 @@ def annotate_with_llm(llm_annotated_jsonl, output_jsonl):
     for record in records:
         llm_response = record.get("llm_response")
         if "response" in llm_response:
-            llm_annotation = llm_response.get("response").get("body").get("choices")[0].get("message").get("content")
+            choice = llm_response.get("response").get("body").get("choices")[0]
         else:
-            llm_annotation = llm_response.get("choices")[0].get("message").get("content")
+            choice = llm_response.get("choices")[0]
+        llm_annotation = choice.get("message").get("content")
         try:
             llm_annotation = llm_annotation.replace("```json\n", "").replace("```", "")
             llm_annotation = llm_annotation.strip()
             if llm_annotation[-1] == ",":
                 llm_annotation = llm_annotation[:-1]
-            
-            if "}" not in llm_annotation:
+
+            # Truncated responses are continued by the backends, only a response still cut
+            # by max_tokens after its continuations is closed here.
+            if choice.get("finish_reason") == "length" and not llm_annotation.endswith("}"):
+                print(f"Closing the annotation of record {record.get('object_id')}, truncated by max_tokens")
                 llm_annotation += "}"
 
             llm_annotation = json.loads(llm_annotation)
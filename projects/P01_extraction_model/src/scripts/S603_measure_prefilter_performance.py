@@ -0,0 +1,50 @@
+import os
+import json
+import click
+
+from more_europa.helpers.prefilter import RegistryPreFilter, load_registry_names_dataset, make_text
+
+
+@click.command()
+@click.option('--registry_names_dataset_json', type=click.Path(exists=True), required=True,
+              help='Path to the registry names dataset JSON file.')
+@click.option('--with_registry_names/--without_registry_names', default=False,
+              help='Extend the pre-filter vocabulary with the registry names of the dataset.')
+@click.option('--output_dir', type=click.Path(), required=True,
+              help='Directory to save the performance metrics.')
+def main(registry_names_dataset_json, with_registry_names, output_dir):
+    records = load_registry_names_dataset(registry_names_dataset_json)
+
+    if with_registry_names:
+        # Names come from the evaluated dataset itself, so recall is optimistic.
+        prefilter = RegistryPreFilter.from_registry_names_dataset(registry_names_dataset_json)
+    else:
+        prefilter = RegistryPreFilter()
+
+    metrics = prefilter.evaluate(records)
+    metrics["vocabulary"] = prefilter.vocabulary
+    metrics["n_registry_names"] = len(prefilter.registry_names)
+
+    # Keep the missed registry related records for inspection
+    missed = [
+        {"object_id": record.get("object_id"), "registry_name": record.get("registry_name"), "title": record.get("title")}
+        for record in records
+        if record.get("registry_name") != "NONE" and not prefilter.is_candidate(make_text(record))
+    ]
+
+    # Create output directory if it does not exist
+    os.makedirs(output_dir, exist_ok=True)
+    print(metrics)
+    # Save performance metrics
+    metrics_output = os.path.join(output_dir, "prefilter_metrics.json")
+    with open(metrics_output, 'w') as f:
+        json.dump(metrics, f, indent=4)
+
+    missed_output = os.path.join(output_dir, "missed_registry_related.json")
+    with open(missed_output, 'w') as f:
+        json.dump(missed, f, indent=4, ensure_ascii=False)
+
+    print(f"Pre-filter metrics saved to {metrics_output}")
+
+if __name__ == '__main__':
+    main()
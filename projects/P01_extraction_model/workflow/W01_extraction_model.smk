@@ -3,7 +3,8 @@ rule W01_R00_extraction_with_mistral_large:
         script="src/scripts/S201_annotate_with_llm.py",
         base_pubmed_dataset_jsonl="data/W00_R00_sample_publication_dataset/prod_publication_dataset.jsonl",
         prompt_txt="etc/prompts/prompt_publications_v1.1.txt",
-        model_config="etc/configs/large_mistral_config.json"
+        model_config="etc/configs/large_mistral_config.json",
+        output_schema="etc/schemas/prompt_publications_v1.1.json"
     output:
         jsonl="data/W01_R00_extraction_with_mistral_large/llm_inference.jsonl"
     shell:
@@ -12,6 +13,7 @@ rule W01_R00_extraction_with_mistral_large:
           --base_pubmed_dataset_jsonl {input.base_pubmed_dataset_jsonl} \
           --prompt_txt {input.prompt_txt} \
           --model_config {input.model_config} \
+          --output_schema {input.output_schema} \
           --output_jsonl {output.jsonl}
         """
 
@@ -33,7 +35,8 @@ rule W01_R10_extraction_with_mistral_small:
         script="src/scripts/S201_annotate_with_llm.py",
         base_pubmed_dataset_jsonl="data/W00_R00_sample_publication_dataset/prod_publication_dataset.jsonl",
         prompt_txt="etc/prompts/prompt_publications_v1.1.txt",
-        model_config="etc/configs/small_mistral_config.json"
+        model_config="etc/configs/small_mistral_config.json",
+        output_schema="etc/schemas/prompt_publications_v1.1.json"
     output:
         jsonl="data/W01_R10_extraction_with_mistral_small/llm_inference.jsonl"
     shell:
@@ -42,6 +45,7 @@ rule W01_R10_extraction_with_mistral_small:
           --base_pubmed_dataset_jsonl {input.base_pubmed_dataset_jsonl} \
           --prompt_txt {input.prompt_txt} \
           --model_config {input.model_config} \
+          --output_schema {input.output_schema} \
           --output_jsonl {output.jsonl}
         """
 
@@ -155,4 +159,17 @@ rule W01_R22_compare_large_vs_small_with_transformers:
           --model_a_dataset_jsonl {input.model_a_dataset_jsonl} \
           --model_b_dataset_jsonl {input.model_b_dataset_jsonl} \
           --output_jsonl {output.jsonl}
-        """
\ No newline at end of file
+        """
+
+rule W01_R40_measure_prefilter_performance:
+    input:
+        script="src/scripts/S603_measure_prefilter_performance.py",
+        registry_names_dataset="../../datasets/002_registry_names_dataset/registry_names_dataset.json"
+    output:
+        directory("data/W01_R40_measure_prefilter_performance/")
+    shell:
+        """
+        python {input.script} \
+          --registry_names_dataset_json {input.registry_names_dataset} \
+          --output_dir {output}
+        """
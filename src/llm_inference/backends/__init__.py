@@ -1,5 +1,24 @@
-from .mistral_async import MistralAsyncBackend
-from .mistral_sync import MistralBackend
-from .mistral_batch import MistralBatchBackend
+# Backends are imported on first use (PEP 562), so that importing the package does
+# not load the client library of every provider.
+import importlib
 
-__all__ = ["MistralBackend", "MistralAsyncBackend", "MistralBatchBackend"]
\ No newline at end of file
+_BACKEND_MODULES = {
+    "MistralBackend": ".mistral_sync",
+    "MistralAsyncBackend": ".mistral_async",
+    "MistralBatchBackend": ".mistral_batch",
+}
+
+__all__ = ["MistralBackend", "MistralAsyncBackend", "MistralBatchBackend"]
+
+
+def __getattr__(name):
+    module_name = _BACKEND_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -3,19 +3,39 @@ from abc import ABC, abstractmethod
 from typing import List, Generator, Optional, Dict
 
 from llm_inference.cache.base import AbstractCacheStorage
+from llm_inference.cache.keys import CacheKeyBuilder
 from llm_inference.logger_mixin import LoggingMixin
+from llm_inference.schema import OutputSchema
+from llm_inference.token_budget import CompletionLengthTracker
 
 class BaseBackend(LoggingMixin, ABC):
     """Base backend class for model inference with common logic."""
 
-    def __init__(self, cache_storage: Optional["AbstractCacheStorage"] = None):
+    def __init__(
+        self,
+        cache_storage: Optional["AbstractCacheStorage"] = None,
+        output_schema: Optional["OutputSchema"] = None,
+        token_budget: Optional["CompletionLengthTracker"] = None,
+        cache_key_builder: Optional["CacheKeyBuilder"] = None,
+    ):
         """
         Initializes the backend with an optional cache storage.
 
         Args:
             cache_storage (AbstractCacheStorage, optional): A cache storage implementation.
+            output_schema (OutputSchema, optional): Schema the parsed responses must follow.
+                Invalid fields are re-asked instead of re-running the whole prompt.
+            token_budget (CompletionLengthTracker, optional): Tunes `max_tokens` per request
+                from the completion lengths observed for the prompt template and model.
+            cache_key_builder (CacheKeyBuilder, optional): Builds the cache keys, e.g. with the
+                namespace of a rule (default: `CacheKeyBuilder()`).
         """
         self.cache_storage = cache_storage
+        self.output_schema = output_schema
+        self.token_budget = token_budget
+        self.cache_key_builder = cache_key_builder or CacheKeyBuilder()  # Keys cover the prompt and the model configuration.
+        self.max_reasks = 1       # Default maximum number of re-asks per response.
+        self.max_continuations = 2  # Default maximum number of continuations of a truncated response.
 
     @abstractmethod
     def _call_api(self, prompt: str, model_config: dict) -> dict:
@@ -46,6 +66,250 @@ class BaseBackend(LoggingMixin, ABC):
         """
         pass
 
+    def _call_api_with_messages(self, messages: List[dict], model_config: dict) -> dict:
+        """
+        Performs an API call with a full conversation instead of a single prompt.
+        Used for follow-up requests such as schema re-asks.
+
+        Args:
+            messages (List[dict]): The chat messages.
+            model_config (dict): A dictionary containing model parameters and settings.
+
+        Returns:
+            dict: The API response.
+        """
+        raise NotImplementedError("Multi-turn calls are not supported by this backend.")
+
+    def _get_response_content(self, response: dict) -> str:
+        """
+        Extracts the raw text content from an API response.
+
+        Args:
+            response (dict): The raw API response.
+
+        Returns:
+            str: The generated content.
+        """
+        raise NotImplementedError("Content extraction is not supported by this backend.")
+
+    def _set_response_content(self, response: dict, content: str) -> dict:
+        """
+        Replaces the generated content of an API response.
+
+        Args:
+            response (dict): The raw API response.
+            content (str): The new content.
+
+        Returns:
+            dict: The updated response.
+        """
+        raise NotImplementedError("Content replacement is not supported by this backend.")
+
+    def _is_truncated(self, response: dict) -> bool:
+        """
+        Tells whether the generation was cut off by the `max_tokens` limit.
+
+        Args:
+            response (dict): The raw API response.
+
+        Returns:
+            bool: True if the response should be continued.
+        """
+        return False
+
+    def _merge_continuation(self, response: dict, continuation: dict) -> dict:
+        """
+        Merges a continuation response into the truncated response it continues.
+
+        Args:
+            response (dict): The truncated API response.
+            continuation (dict): The API response to the continuation request.
+
+        Returns:
+            dict: The combined response.
+        """
+        raise NotImplementedError("Continuation is not supported by this backend.")
+
+    def _make_continuation_messages(self, prompt: str, partial_content: str) -> List[dict]:
+        """Builds the conversation used to continue a truncated answer from its partial content."""
+        return [
+            {"role": "user", "content": prompt},
+            {"role": "assistant", "content": partial_content, "prefix": True},
+        ]
+
+    def _run_follow_ups(self, follow_ups: Generator[List[dict], dict, dict], model_config: dict) -> dict:
+        """
+        Runs a multi-turn procedure such as `_continuation_follow_ups`.
+
+        The procedure yields the conversations to send and receives the API responses,
+        so that the sync and async backends share it and only differ by how they call the API.
+
+        Args:
+            follow_ups (Generator[List[dict], dict, dict]): The procedure.
+            model_config (dict): A dictionary containing model parameters and settings.
+
+        Returns:
+            dict: The value returned by the procedure.
+        """
+        try:
+            messages = next(follow_ups)
+            while True:
+                messages = follow_ups.send(self._call_api_with_messages(messages, model_config))
+        except StopIteration as stop:
+            return stop.value
+
+    def _continuation_follow_ups(self, prompt: str, response: dict) -> Generator[List[dict], dict, dict]:
+        """
+        Continues a response truncated by `max_tokens` instead of retrying it from scratch.
+
+        The partial answer is sent back as an assistant prefix, and the generated
+        continuation is appended to it.
+
+        Args:
+            prompt (str): The input prompt.
+            response (dict): The raw API response.
+
+        Returns:
+            dict: The combined response.
+        """
+        continuations = 0
+        while self._is_truncated(response) and continuations < self.max_continuations:
+            continuations += 1
+            self.logger.info("Response truncated, requesting continuation %d of %d.", continuations, self.max_continuations)
+            continuation = yield self._make_continuation_messages(prompt, self._get_response_content(response))
+            response = self._merge_continuation(response, continuation)
+
+        if continuations:
+            response["continuations"] = continuations
+        return response
+
+    def _continue_truncated(self, prompt: str, response: dict, model_config: dict) -> dict:
+        """
+        Continues a truncated response, see `_continuation_follow_ups`.
+
+        Args:
+            prompt (str): The input prompt.
+            response (dict): The raw API response.
+            model_config (dict): A dictionary containing model parameters and settings.
+
+        Returns:
+            dict: The combined response.
+        """
+        return self._run_follow_ups(self._continuation_follow_ups(prompt, response), model_config)
+
+    def _generate(self, prompt: str, model_config: dict) -> dict:
+        """
+        Calls the API for a prompt with a tuned `max_tokens` and continues truncated responses.
+
+        Continuations use the configured `max_tokens`, which acts as the higher cap
+        for answers longer than the tuned value.
+
+        Args:
+            prompt (str): The input prompt.
+            model_config (dict): A dictionary containing model parameters and settings.
+
+        Returns:
+            dict: The API response.
+        """
+        call_config = model_config
+        if self.token_budget is not None:
+            template_key = self.token_budget.template_key(prompt)
+            call_config = self.token_budget.tune(template_key, model_config)
+
+        result = self._call_api(prompt, call_config)
+        result = self._continue_truncated(prompt, result, model_config)
+
+        if self.token_budget is not None:
+            self.token_budget.observe(template_key, model_config, result)
+        return result
+
+    def _try_parse_response(self, response: dict) -> Optional[dict]:
+        """Parses the response, returning None instead of raising on malformed content."""
+        try:
+            return self._parse_response(response)
+        except (ValueError, KeyError, IndexError, TypeError):
+            return None
+
+    def _make_reask_messages(self, prompt: str, response: dict, errors: Dict[str, str]) -> List[dict]:
+        """Builds the conversation used to re-ask only the fields in error."""
+        return [
+            {"role": "user", "content": prompt},
+            {"role": "assistant", "content": self._get_response_content(response)},
+            {"role": "user", "content": self.output_schema.make_reask_prompt(errors)},
+        ]
+
+    def _validation_follow_ups(self, prompt: str, response: dict) -> Generator[List[dict], dict, dict]:
+        """
+        Validates a response against the output schema, re-asking for invalid fields.
+
+        The repaired content replaces the original one and the validation outcome is
+        stored in the response, so cached responses are never checked again.
+
+        Args:
+            prompt (str): The input prompt.
+            response (dict): The raw API response.
+
+        Returns:
+            dict: The validated (and possibly repaired) response.
+        """
+        schema = self.output_schema
+        parsed = self._try_parse_response(response)
+        errors = schema.validate(parsed)
+
+        reasks = 0
+        while errors and reasks < self.max_reasks:
+            reasks += 1
+            self.logger.info("Re-asking %d invalid field(s): %s", len(errors), list(errors))
+            reask_response = yield self._make_reask_messages(prompt, response, errors)
+            parsed = schema.merge(parsed, self._try_parse_response(reask_response), errors)
+            errors = schema.validate(parsed)
+
+        if reasks:
+            response = self._set_response_content(response, json.dumps(parsed, ensure_ascii=False))
+        if errors:
+            self.logger.warning("Response still invalid after %d re-ask(s): %s", reasks, errors)
+        return schema.mark(response, errors, reasks)
+
+    def _validate_response(self, prompt: str, response: dict, model_config: dict) -> dict:
+        """
+        Validates a response against the output schema, see `_validation_follow_ups`.
+
+        Args:
+            prompt (str): The input prompt.
+            response (dict): The raw API response.
+            model_config (dict): A dictionary containing model parameters and settings.
+
+        Returns:
+            dict: The validated (and possibly repaired) response.
+        """
+        return self._run_follow_ups(self._validation_follow_ups(prompt, response), model_config)
+
+    def _is_final(self, cached_response: dict) -> bool:
+        """
+        Whether a cached response can be returned as is, without validation.
+        """
+        return self.output_schema is None or self.output_schema.is_validated(cached_response)
+
+    def _complete(self, prompt: str, model_config: dict, cached_response: Optional[dict] = None) -> dict:
+        """
+        Generates a response, unless a cached one is given, and validates it against the output schema.
+
+        Args:
+            prompt (str): The input prompt.
+            model_config (dict): A dictionary containing model parameters and settings.
+            cached_response (dict, optional): A cached response not validated yet.
+
+        Returns:
+            dict: The inference result.
+        """
+        result = cached_response
+        if result is None:
+            result = self._generate(prompt, model_config)
+
+        if self.output_schema is not None:
+            result = self._validate_response(prompt, result, model_config)
+        return result
+
     def infer_one(self, prompt: str, model_config: dict, use_cache: bool = True) -> dict:
         """
         Performs inference on a single prompt, optionally using cache.
@@ -58,18 +322,22 @@ class BaseBackend(LoggingMixin, ABC):
         Returns:
             dict: The inference result.
         """
+        use_cache = use_cache and self.cache_storage is not None
+
         # Check cache first
-        if use_cache and self.cache_storage is not None:
-            cached_response = self.cache_storage.get(prompt)
-            if cached_response is not None:
+        cached_response = None
+        if use_cache:
+            cache_key = self.cache_key_builder.build(prompt, model_config)
+            cached_response = self.cache_storage.get(cache_key)
+            if cached_response is not None and self._is_final(cached_response):
                 return cached_response
 
         # Call the API with the provided model_config
-        result = self._call_api(prompt, model_config)
+        result = self._complete(prompt, model_config, cached_response)
 
         # Save to cache if enabled
-        if use_cache and self.cache_storage is not None:
-            self.cache_storage.put(prompt, result)
+        if use_cache:
+            self.cache_storage.put(cache_key, result)
 
         return result
 
@@ -79,6 +347,9 @@ class BaseBackend(LoggingMixin, ABC):
         Each input dictionary must have keys 'custom_id' and 'prompt', and each output
         dictionary will include the corresponding 'custom_id'.
 
+        When caching is enabled, all the cached results are fetched at once and yielded
+        first, then the remaining prompts are inferred, identical prompts only once.
+
         Args:
             prompt_items (List[dict]): A list of dictionaries, each with keys 'custom_id' and 'prompt'.
             model_config (dict): A dictionary containing model parameters and settings.
@@ -87,9 +358,36 @@ class BaseBackend(LoggingMixin, ABC):
         Yields:
             dict: The inference result for each prompt, augmented with a 'custom_id' key.
         """
-        for item in prompt_items:
-            result = self.infer_one(item["prompt"], model_config, use_cache=use_cache)
+        def with_custom_id(item: dict, result: dict) -> dict:
             # Create a copy in case the result is cached/shared so that custom_id modifications are isolated.
             result = dict(result)
             result["custom_id"] = item["custom_id"]
-            yield result
+            return result
+
+        if not use_cache or self.cache_storage is None:
+            for item in prompt_items:
+                yield with_custom_id(item, self.infer_one(item["prompt"], model_config, use_cache=False))
+            return
+
+        cache_keys = {}
+        for item in prompt_items:
+            if item["prompt"] not in cache_keys:
+                cache_keys[item["prompt"]] = self.cache_key_builder.build(item["prompt"], model_config)
+        cached_responses = dict(zip(cache_keys, self.cache_storage.get_many(list(cache_keys.values()))))
+        self.logger.info(f"Found {sum(value is not None for value in cached_responses.values())}/{len(cache_keys)} prompts in cache")
+
+        misses = []
+        for item in prompt_items:
+            cached_response = cached_responses[item["prompt"]]
+            if cached_response is not None and self._is_final(cached_response):
+                yield with_custom_id(item, cached_response)
+            else:
+                misses.append(item)
+
+        results = {}
+        for item in misses:
+            prompt = item["prompt"]
+            if prompt not in results:
+                results[prompt] = self._complete(prompt, model_config, cached_responses[prompt])
+                self.cache_storage.put(cache_keys[prompt], results[prompt])
+            yield with_custom_id(item, results[prompt])
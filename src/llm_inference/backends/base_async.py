@@ -1,12 +1,15 @@
 import asyncio
 import time
 from abc import ABC, abstractmethod
-from typing import List, AsyncGenerator, Optional
+from typing import List, AsyncGenerator, Awaitable, Generator, Optional
 
 from mistralai.models.sdkerror import SDKError  # Adjust the import as needed
 from llm_inference.backends.base import BaseBackend  # Provided base class (synchronous)
 from llm_inference.cache.base import AbstractCacheStorage
+from llm_inference.cache.keys import CacheKeyBuilder
 from llm_inference.logger_mixin import LoggingMixin
+from llm_inference.schema import OutputSchema
+from llm_inference.token_budget import CompletionLengthTracker
 
 # Define a simple asynchronous rate limiter.
 class RateLimiter(LoggingMixin):
@@ -44,12 +47,21 @@ class BaseAsyncBackend(BaseBackend, LoggingMixin, ABC):
     Asynchronous version of BaseBackend that implements common logic
     such as caching, rate limiting, retry logic, and batch processing.
     """
-    def __init__(self, cache_storage: Optional["AbstractCacheStorage"] = None):
+    def __init__(
+        self,
+        cache_storage: Optional["AbstractCacheStorage"] = None,
+        output_schema: Optional["OutputSchema"] = None,
+        token_budget: Optional["CompletionLengthTracker"] = None,
+        cache_key_builder: Optional["CacheKeyBuilder"] = None,
+    ):
         """
         Args:
             cache_storage (AbstractCacheStorage, optional): A cache storage implementation.
+            output_schema (OutputSchema, optional): Schema the parsed responses must follow.
+            token_budget (CompletionLengthTracker, optional): Tunes `max_tokens` per request.
+            cache_key_builder (CacheKeyBuilder, optional): Builds the cache keys (default: `CacheKeyBuilder()`).
         """
-        super().__init__(cache_storage)
+        super().__init__(cache_storage, output_schema, token_budget, cache_key_builder)
         self.rate_limiter = None  # To be set by subclasses if needed.
         self.max_retries = 5      # Default maximum number of retries.
 
@@ -82,38 +94,37 @@ class BaseAsyncBackend(BaseBackend, LoggingMixin, ABC):
         """
         pass
 
-    async def infer_one(self, prompt: str, model_config: dict, use_cache: bool = True) -> dict:
+    async def _call_api_with_messages(self, messages: List[dict], model_config: dict) -> dict:
         """
-        Performs asynchronous inference on a single prompt with caching,
-        rate limiting, and retry logic.
+        Asynchronous API call with a full conversation instead of a single prompt.
 
         Args:
-            prompt (str): The input prompt.
+            messages (List[dict]): The chat messages.
             model_config (dict): A dictionary containing model parameters and settings.
-            use_cache (bool): Whether to use caching (default is True).
 
         Returns:
-            dict: The inference result.
+            dict: The API response.
         """
-        # Check cache if enabled.
-        if use_cache and self.cache_storage is not None:
-            cached_response = await asyncio.to_thread(self.cache_storage.get, prompt)
-            if cached_response is not None:
-                return cached_response
+        raise NotImplementedError("Multi-turn calls are not supported by this backend.")
+
+    async def _call_with_retries(self, call, *args) -> dict:
+        """
+        Awaits an API call with rate limiting and retry on rate limit errors.
+
+        Args:
+            call: The coroutine function performing the API call.
+            *args: Arguments passed to `call`.
 
+        Returns:
+            dict: The API response.
+        """
         retry_delay = 1.0
         for attempt in range(self.max_retries):
             try:
                 if self.rate_limiter:
                     await self.rate_limiter.acquire()
 
-                result = await self._call_api(prompt, model_config)
-
-                # Cache the result if enabled.
-                if use_cache and self.cache_storage is not None:
-                    await asyncio.to_thread(self.cache_storage.put, prompt, result)
-
-                return result
+                return await call(*args)
 
             except SDKError as e:
                 # If the error indicates rate limiting, retry with exponential backoff.
@@ -129,11 +140,136 @@ class BaseAsyncBackend(BaseBackend, LoggingMixin, ABC):
 
         raise RuntimeError("Maximum retries exceeded due to rate limiting.")
 
+    async def _run_follow_ups(self, follow_ups: Generator[List[dict], dict, dict], model_config: dict) -> dict:
+        """
+        Asynchronous version of `BaseBackend._run_follow_ups`, calls are rate limited and retried.
+
+        Args:
+            follow_ups (Generator[List[dict], dict, dict]): The procedure.
+            model_config (dict): A dictionary containing model parameters and settings.
+
+        Returns:
+            dict: The value returned by the procedure.
+        """
+        try:
+            messages = next(follow_ups)
+            while True:
+                response = await self._call_with_retries(self._call_api_with_messages, messages, model_config)
+                messages = follow_ups.send(response)
+        except StopIteration as stop:
+            return stop.value
+
+    async def _continue_truncated(self, prompt: str, response: dict, model_config: dict) -> dict:
+        """
+        Asynchronous version of `BaseBackend._continue_truncated`.
+
+        Args:
+            prompt (str): The input prompt.
+            response (dict): The raw API response.
+            model_config (dict): A dictionary containing model parameters and settings.
+
+        Returns:
+            dict: The combined response.
+        """
+        return await self._run_follow_ups(self._continuation_follow_ups(prompt, response), model_config)
+
+    async def _generate(self, prompt: str, model_config: dict) -> dict:
+        """
+        Asynchronous version of `BaseBackend._generate`.
+
+        Args:
+            prompt (str): The input prompt.
+            model_config (dict): A dictionary containing model parameters and settings.
+
+        Returns:
+            dict: The API response.
+        """
+        call_config = model_config
+        if self.token_budget is not None:
+            template_key = self.token_budget.template_key(prompt)
+            call_config = self.token_budget.tune(template_key, model_config)
+
+        result = await self._call_with_retries(self._call_api, prompt, call_config)
+        result = await self._continue_truncated(prompt, result, model_config)
+
+        if self.token_budget is not None:
+            self.token_budget.observe(template_key, model_config, result)
+        return result
+
+    async def _validate_response(self, prompt: str, response: dict, model_config: dict) -> dict:
+        """
+        Asynchronous version of `BaseBackend._validate_response`.
+
+        Args:
+            prompt (str): The input prompt.
+            response (dict): The raw API response.
+            model_config (dict): A dictionary containing model parameters and settings.
+
+        Returns:
+            dict: The validated (and possibly repaired) response.
+        """
+        return await self._run_follow_ups(self._validation_follow_ups(prompt, response), model_config)
+
+    async def _complete(self, prompt: str, model_config: dict, cached_response: Optional[dict] = None) -> dict:
+        """
+        Generates a response, unless a cached one is given, and validates it against the output schema.
+
+        Args:
+            prompt (str): The input prompt.
+            model_config (dict): A dictionary containing model parameters and settings.
+            cached_response (dict, optional): A cached response not validated yet.
+
+        Returns:
+            dict: The inference result.
+        """
+        result = cached_response
+        if result is None:
+            result = await self._generate(prompt, model_config)
+
+        if self.output_schema is not None:
+            result = await self._validate_response(prompt, result, model_config)
+        return result
+
+    async def infer_one(self, prompt: str, model_config: dict, use_cache: bool = True) -> dict:
+        """
+        Performs asynchronous inference on a single prompt with caching,
+        rate limiting, and retry logic.
+
+        Args:
+            prompt (str): The input prompt.
+            model_config (dict): A dictionary containing model parameters and settings.
+            use_cache (bool): Whether to use caching (default is True).
+
+        Returns:
+            dict: The inference result.
+        """
+        use_cache = use_cache and self.cache_storage is not None
+
+        # Check cache if enabled.
+        cached_response = None
+        if use_cache:
+            cache_key = self.cache_key_builder.build(prompt, model_config)
+            cached_response = await self.cache_storage.aget(cache_key)
+            if cached_response is not None and self._is_final(cached_response):
+                return cached_response
+
+        result = await self._complete(prompt, model_config, cached_response)
+
+        # Cache the result if enabled.
+        if use_cache:
+            await self.cache_storage.aput(cache_key, result)
+
+        return result
+
     async def infer_many(self, prompt_items: List[dict], model_config: dict, use_cache: bool = True) -> AsyncGenerator[dict, None]:
         """
         Performs asynchronous inference on a batch of prompt_items.
         Each result includes a 'custom_id' corresponding to the input's custom_id.
 
+        When caching is enabled, all the cached results are fetched in one bulk lookup
+        and yielded first, then only the remaining prompts are sent to the API,
+        identical prompts only once.
+
         Args:
             prompt_items (List[dict]): A list of dictionaries, each with keys 'custom_id' and 'prompt'.
             model_config (dict): A dictionary containing model parameters and settings.
@@ -142,12 +278,49 @@ class BaseAsyncBackend(BaseBackend, LoggingMixin, ABC):
         Yields:
             dict: Inference results for each prompt, with an added 'custom_id' key.
         """
-        async def wrap(item: dict) -> dict:
-            # Await the inference result and create a shallow copy to avoid shared mutation.
-            result = dict(await self.infer_one(item['prompt'], model_config, use_cache=use_cache))
+        def with_custom_id(item: dict, result: dict) -> dict:
+            # Create a shallow copy to avoid shared mutation.
+            result = dict(result)
             result['custom_id'] = item['custom_id']
             return result
 
-        tasks = [asyncio.create_task(wrap(item)) for item in prompt_items]
+        async def wrap(item: dict, inference: Awaitable[dict]) -> dict:
+            return with_custom_id(item, await inference)
+
+        if not use_cache or self.cache_storage is None:
+            tasks = [
+                asyncio.create_task(wrap(item, self.infer_one(item['prompt'], model_config, use_cache=False)))
+                for item in prompt_items
+            ]
+            for completed in asyncio.as_completed(tasks):
+                yield await completed
+            return
+
+        cache_keys = {}
+        for item in prompt_items:
+            if item['prompt'] not in cache_keys:
+                cache_keys[item['prompt']] = self.cache_key_builder.build(item['prompt'], model_config)
+        cached_values = await self.cache_storage.aget_many(list(cache_keys.values()))
+        cached_responses = dict(zip(cache_keys, cached_values))
+        self.logger.info(f"Found {sum(value is not None for value in cached_values)}/{len(cache_keys)} prompts in cache")
+
+        async def infer_miss(prompt: str) -> dict:
+            result = await self._complete(prompt, model_config, cached_responses[prompt])
+            await self.cache_storage.aput(cache_keys[prompt], result)
+            return result
+
+        # Requests with the same prompt share one inference task.
+        inferences = {}
+        tasks = []
+        for item in prompt_items:
+            prompt = item['prompt']
+            cached_response = cached_responses[prompt]
+            if cached_response is not None and self._is_final(cached_response):
+                yield with_custom_id(item, cached_response)
+                continue
+            if prompt not in inferences:
+                inferences[prompt] = asyncio.create_task(infer_miss(prompt))
+            tasks.append(asyncio.create_task(wrap(item, inferences[prompt])))
+
         for completed in asyncio.as_completed(tasks):
             yield await completed
@@ -1,26 +1,39 @@
-from typing import Optional
+from typing import List, Optional
 
 import asyncio
 from mistralai import Mistral
 
 from llm_inference.backends.base_async import RateLimiter
 from llm_inference.cache.base import AbstractCacheStorage
+from llm_inference.cache.keys import CacheKeyBuilder
 from llm_inference.backends.mistral_base import MistralAsyncBaseBackend
+from llm_inference.schema import OutputSchema
+from llm_inference.token_budget import CompletionLengthTracker
 
 
 class MistralAsyncBackend(MistralAsyncBaseBackend):
     """
     Asynchronous backend implementation using the Mistral API for inference.
     """
-    def __init__(self, api_key: str, cache_storage: Optional["AbstractCacheStorage"] = None):
+    def __init__(
+        self,
+        api_key: str,
+        cache_storage: Optional["AbstractCacheStorage"] = None,
+        output_schema: Optional["OutputSchema"] = None,
+        token_budget: Optional["CompletionLengthTracker"] = None,
+        cache_key_builder: Optional["CacheKeyBuilder"] = None,
+    ):
         """
         Initializes the AsyncMistralBackend with API key and optional cache storage.
         
         Args:
             api_key (str): API key for authenticating with the Mistral API.
             cache_storage (AbstractCacheStorage, optional): A cache storage implementation.
+            output_schema (OutputSchema, optional): Schema the parsed responses must follow.
+            token_budget (CompletionLengthTracker, optional): Tunes `max_tokens` per request.
+            cache_key_builder (CacheKeyBuilder, optional): Builds the cache keys (default: `CacheKeyBuilder()`).
         """
-        super().__init__(cache_storage)
+        super().__init__(cache_storage, output_schema, token_budget, cache_key_builder)
         self.client = Mistral(api_key=api_key)
         self.rate_limiter = RateLimiter(rate=6, per=1.0)  # Adjust rate as needed.
         self.max_retries = 5
@@ -40,7 +53,19 @@ class MistralAsyncBackend(MistralAsyncBaseBackend):
             "role": "user",
             "content": prompt,
         }]
+        return await self._call_api_with_messages(messages, model_config)
 
+    async def _call_api_with_messages(self, messages: List[dict], model_config: dict) -> dict:
+        """
+        Performs an asynchronous chat completion call with the given messages.
+
+        Args:
+            messages (List[dict]): The chat messages.
+            model_config (dict): A dictionary containing model parameters and settings.
+
+        Returns:
+            dict: The API response.
+        """
         # Run the blocking API call in a separate thread.
         response = await asyncio.to_thread(
             self.client.chat.complete,
@@ -34,6 +34,44 @@ class MistralBaseBackend(BaseBackend, ABC):
         parsed_content = json.loads(content)
         return parsed_content
 
+    def _get_response_content(self, response: dict) -> str:
+        """Returns the content of the first choice of a chat completion response."""
+        return response["choices"][0]["message"]["content"]
+
+    def _set_response_content(self, response: dict, content: str) -> dict:
+        """Replaces the content of the first choice of a chat completion response."""
+        response["choices"][0]["message"]["content"] = content
+        return response
+
+    def _is_truncated(self, response: dict) -> bool:
+        """Checks the finish reason of the first choice of a chat completion response."""
+        choices = response.get("choices") or []
+        return bool(choices) and isinstance(choices[0], dict) and choices[0].get("finish_reason") == "length"
+
+    def _merge_continuation(self, response: dict, continuation: dict) -> dict:
+        """
+        Appends the content of a continuation to the truncated response.
+
+        The continuation content may or may not repeat the assistant prefix, both are handled.
+        Token usage of both calls is summed.
+        """
+        partial = self._get_response_content(response)
+        content = self._get_response_content(continuation) or ""
+        if not content.startswith(partial):
+            content = partial + content
+
+        merged = dict(response)
+        merged["choices"] = [dict(choice) for choice in response["choices"]]
+        merged["choices"][0]["message"] = dict(response["choices"][0]["message"], content=content)
+        merged["choices"][0]["finish_reason"] = continuation["choices"][0].get("finish_reason")
+
+        usage = dict(response.get("usage") or {})
+        for key, value in (continuation.get("usage") or {}).items():
+            if isinstance(value, int) and isinstance(usage.get(key, 0), int):
+                usage[key] = usage.get(key, 0) + value
+        merged["usage"] = usage
+        return merged
+
 
 class MistralAsyncBaseBackend(MistralBaseBackend, BaseAsyncBackend, ABC):
     @abstractmethod
@@ -5,7 +5,9 @@ from typing import List, Union, Generator, Optional
 
 from mistralai import Mistral
 from llm_inference.cache.base import AbstractCacheStorage
+from llm_inference.cache.keys import CacheKeyBuilder
 from llm_inference.backends.mistral_base import MistralBatchBaseBackend
+from llm_inference.token_budget import CompletionLengthTracker
 
 
 def map_batch_results(batch_result):
@@ -22,16 +24,24 @@ class MistralBatchBackend(MistralBatchBaseBackend):
     This class performs inference in batches using the Mistral API and supports caching.
     """
 
-    def __init__(self, api_key: str, cache_storage: Optional[AbstractCacheStorage] = None):
+    def __init__(
+        self,
+        api_key: str,
+        cache_storage: Optional[AbstractCacheStorage] = None,
+        token_budget: Optional[CompletionLengthTracker] = None,
+        cache_key_builder: Optional[CacheKeyBuilder] = None,
+    ):
         """
         Initializes the MistralBatchBackend.
 
         Args:
             api_key (str): API key for authenticating with the Mistral service.
             cache_storage (AbstractCacheStorage, optional): A cache storage implementation.
+            token_budget (CompletionLengthTracker, optional): Tunes `max_tokens` per request.
+            cache_key_builder (CacheKeyBuilder, optional): Builds the cache keys (default: `CacheKeyBuilder()`).
         """
+        super().__init__(cache_storage, token_budget=token_budget, cache_key_builder=cache_key_builder)
         self.client = Mistral(api_key=api_key)
-        self.cache_storage = cache_storage
         self.logger.info("MistralBatchBackend initialized.")
 
     def _make_batch_data_from_prompts(
@@ -50,7 +60,7 @@ class MistralBatchBackend(MistralBatchBaseBackend):
         Returns:
             List[dict]: A list of dictionaries representing the batch data.
         """
-        self.logger.info("Creating batch data from prompts.")
+        self.logger.debug("Creating batch data from prompts.")
         batch_data = []
         for i, prompt in enumerate(prompts):
             if isinstance(prompt, dict):
@@ -73,7 +83,7 @@ class MistralBatchBackend(MistralBatchBaseBackend):
                     }],
                 },
             })
-        self.logger.info(f"Created batch data for {len(batch_data)} prompts.")
+        self.logger.info("Created batch data for %d prompts.", len(batch_data))
         return batch_data
 
     def _upload_batch_file(self, batch_data: List[dict]):
@@ -163,6 +173,98 @@ class MistralBatchBackend(MistralBatchBaseBackend):
         self.logger.info("Batch job completed successfully.")
         return retrieved_job
     
+    def _tune_batch_data(self, batch_data: List[dict], model_config: dict) -> List[dict]:
+        """
+        Sets a tuned `max_tokens` on each request of the batch.
+
+        Args:
+            batch_data (List[dict]): The batch data.
+            model_config (dict): A dictionary containing model parameters and settings.
+
+        Returns:
+            List[dict]: The batch data with tuned request bodies.
+        """
+        tuned_batch_data = []
+        for item in batch_data:
+            template_key = self.token_budget.template_key(item["body"]["messages"][0]["content"])
+            tuned_config = self.token_budget.tune(template_key, model_config)
+            tuned_batch_data.append(dict(item, body=dict(item["body"], max_tokens=tuned_config["max_tokens"])))
+        return tuned_batch_data
+
+    def _observe_batch_results(self, raw_results: List[dict], batch_data: List[dict], model_config: dict):
+        """Records the completion lengths of the batch results in the token budget."""
+        prompts_by_id = {item["custom_id"]: item["body"]["messages"][0]["content"] for item in batch_data}
+        for result in raw_results:
+            prompt = prompts_by_id.get(result["custom_id"])
+            if prompt is not None:
+                template_key = self.token_budget.template_key(prompt)
+                self.token_budget.observe(template_key, model_config, result["response"]["body"])
+
+    def _run_batch(self, batch_data: List[dict], model_config: dict) -> List[dict]:
+        """
+        Uploads the batch data, executes the batch job and downloads its raw results.
+
+        Args:
+            batch_data (List[dict]): The batch data to process.
+            model_config (dict): A dictionary containing model parameters and settings.
+
+        Returns:
+            List[dict]: The raw batch results.
+        """
+        batch_file = self._upload_batch_file(batch_data)
+        job = self._execute_batch_job(batch_file.id, model_config)
+        return self._get_batch_results(job.output_file)
+
+    def _continue_truncated_results(
+        self, raw_results: List[dict], batch_data: List[dict], model_config: dict
+    ) -> List[dict]:
+        """
+        Continues results truncated by `max_tokens` with a follow-up batch job.
+
+        Each truncated answer is sent back as an assistant prefix and the generated
+        continuation is appended to it, so truncated items are not re-run from scratch.
+
+        Args:
+            raw_results (List[dict]): The raw batch results.
+            batch_data (List[dict]): The batch data the results were produced from.
+            model_config (dict): A dictionary containing model parameters and settings.
+
+        Returns:
+            List[dict]: The raw batch results with truncated items completed.
+        """
+        requests_by_id = {item["custom_id"]: item for item in batch_data}
+        results_by_id = {result["custom_id"]: result for result in raw_results}
+
+        for attempt in range(self.max_continuations):
+            truncated_ids = [
+                custom_id for custom_id, result in results_by_id.items()
+                if custom_id in requests_by_id and self._is_truncated(result["response"]["body"])
+            ]
+            if not truncated_ids:
+                break
+
+            self.logger.info(f"Continuing {len(truncated_ids)} truncated results (attempt {attempt + 1}).")
+            continuation_data = []
+            for custom_id in truncated_ids:
+                body = requests_by_id[custom_id]["body"]
+                partial = self._get_response_content(results_by_id[custom_id]["response"]["body"])
+                messages = self._make_continuation_messages(body["messages"][0]["content"], partial)
+                # Continuations use the configured max_tokens, the higher cap for tuned requests.
+                continuation_data.append({
+                    "custom_id": custom_id,
+                    "body": dict(body, messages=messages, max_tokens=model_config["max_tokens"]),
+                })
+
+            for continuation in self._run_batch(continuation_data, model_config):
+                result = results_by_id.get(continuation["custom_id"])
+                if result is None:
+                    continue
+                body = self._merge_continuation(result["response"]["body"], continuation["response"]["body"])
+                body["continuations"] = body.get("continuations", 0) + 1
+                result["response"]["body"] = body
+
+        return raw_results
+
     def postprocess(self, raw_results):
         results = map(map_batch_results, raw_results)
         return results
@@ -176,9 +278,8 @@ class MistralBatchBackend(MistralBatchBaseBackend):
         """
         Performs batch inference on a list of prompts.
 
-        This method calculates a cache key based on the batch data by converting
-        it to a stable JSON string and then calling the cache storage's _generate_hash.
-        If the result is cached, it yields the cached results; otherwise, it executes
+        This method calculates a canonical cache key covering the batch data and
+        the model configuration. If the result is cached, it yields the cached results; otherwise, it executes
         the batch job, caches the result, and yields the results.
 
         Args:
@@ -192,10 +293,8 @@ class MistralBatchBackend(MistralBatchBaseBackend):
         self.logger.info("Starting batch inference.")
         batch_data = self._make_batch_data_from_prompts(prompts, model_config)
 
-        # Use a stable JSON string representation for hashing.
         if self.cache_storage is not None:
-            batch_data_str = json.dumps(batch_data, sort_keys=True)
-            cache_key = f"mistral_batch_{self.cache_storage._generate_hash(batch_data_str)}"
+            cache_key = self.cache_key_builder.build_batch(batch_data, model_config)
 
         if use_cache and self.cache_storage is not None:
             cached_result = self.cache_storage.get(cache_key)
@@ -207,9 +306,12 @@ class MistralBatchBackend(MistralBatchBaseBackend):
                 return
 
         self.logger.info("No cached result found, executing batch job.")
-        batch_file = self._upload_batch_file(batch_data)
-        job = self._execute_batch_job(batch_file.id, model_config)
-        raw_results = self._get_batch_results(job.output_file)
+        if self.token_budget is not None:
+            batch_data = self._tune_batch_data(batch_data, model_config)
+        raw_results = self._run_batch(batch_data, model_config)
+        raw_results = self._continue_truncated_results(raw_results, batch_data, model_config)
+        if self.token_budget is not None:
+            self._observe_batch_results(raw_results, batch_data, model_config)
         self.logger.info("Batch inference completed.")
         
         if use_cache and self.cache_storage is not None:
@@ -1,16 +1,26 @@
-from typing import Optional
+from typing import List, Optional
 
 from mistralai import Mistral
 
 from llm_inference.cache.base import AbstractCacheStorage
+from llm_inference.cache.keys import CacheKeyBuilder
 from llm_inference.backends.mistral_base import MistralBaseBackend
+from llm_inference.schema import OutputSchema
+from llm_inference.token_budget import CompletionLengthTracker
 
 
 class MistralBackend(MistralBaseBackend):
     """Backend implementation using the Mistral API for inference."""
 
-    def __init__(self, api_key: str, cache_storage: Optional["AbstractCacheStorage"] = None):
-        super().__init__(cache_storage)
+    def __init__(
+        self,
+        api_key: str,
+        cache_storage: Optional["AbstractCacheStorage"] = None,
+        output_schema: Optional["OutputSchema"] = None,
+        token_budget: Optional["CompletionLengthTracker"] = None,
+        cache_key_builder: Optional["CacheKeyBuilder"] = None,
+    ):
+        super().__init__(cache_storage, output_schema, token_budget, cache_key_builder)
         self.client = Mistral(api_key=api_key)
 
     def _call_api(self, prompt: str, model_config: dict) -> dict:
@@ -28,7 +38,19 @@ class MistralBackend(MistralBaseBackend):
             "role": "user",
             "content": prompt,
         }]
+        return self._call_api_with_messages(messages, model_config)
 
+    def _call_api_with_messages(self, messages: List[dict], model_config: dict) -> dict:
+        """
+        Performs a chat completion call to the Mistral API with the given messages.
+
+        Args:
+            messages (List[dict]): The chat messages.
+            model_config (dict): A dictionary containing model parameters and settings.
+
+        Returns:
+            dict: The API response.
+        """
         response = self.client.chat.complete(
             model=model_config["model"],
             messages=messages,
@@ -1,4 +1,29 @@
-from .disk import DiskCacheStorage
-from .tmp import TmpCacheStorage
+# Storages are imported on first use (PEP 562), so that importing the package does
+# not load the optional dependencies of every storage.
+import importlib
 
-__all__ = ['DiskCacheStorage', 'TmpCacheStorage']
\ No newline at end of file
+_STORAGE_MODULES = {
+    "DiskCacheStorage": ".disk",
+    "TmpCacheStorage": ".tmp",
+    "SqliteCacheStorage": ".sqlite",
+    "LmdbCacheStorage": ".lmdb",
+    "TieredCacheStorage": ".tiered",
+    "WriteBehindCacheStorage": ".write_behind",
+    "PackCacheStorage": ".pack",
+    "RemoteCacheStorage": ".remote",
+}
+
+__all__ = ['DiskCacheStorage', 'TmpCacheStorage', 'SqliteCacheStorage', 'LmdbCacheStorage', 'TieredCacheStorage', 'WriteBehindCacheStorage', 'PackCacheStorage', 'RemoteCacheStorage']
+
+
+def __getattr__(name):
+    module_name = _STORAGE_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
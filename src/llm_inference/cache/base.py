@@ -1,28 +1,87 @@
 from abc import ABC, abstractmethod
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import hashlib
-from typing import Any
+import json
+import threading
+from typing import Any, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
 
+from llm_inference.cache.codec import ValueCodec, decode_value
+from llm_inference.cache.hashing import hash_json
+from llm_inference.cache.keys import CacheKey
 from llm_inference.logger_mixin import LoggingMixin
 
+CACHE_IO_THREADS = 4
+
+_cache_executor = None
+_cache_executor_lock = threading.Lock()
+
+
+def get_cache_executor() -> ThreadPoolExecutor:
+    """
+    Returns the thread pool running the blocking cache I/O of async callers.
+
+    It is separate from the default executor of the event loop, so that cache reads
+    and writes never wait behind, nor delay, the threads of API calls.
+    """
+    global _cache_executor
+    if _cache_executor is None:
+        with _cache_executor_lock:
+            if _cache_executor is None:
+                _cache_executor = ThreadPoolExecutor(max_workers=CACHE_IO_THREADS, thread_name_prefix="llm-cache")
+    return _cache_executor
+
+
+class CacheEntry(NamedTuple):
+    """Metadata of a stored cache entry."""
+    hashed_key: str
+    size: int
+    created_at: float
+    accessed_at: float
+
+
 class AbstractCacheStorage(ABC, LoggingMixin):
     """
     Abstract base class for cache storage implementations.
     This class defines the interface for caching operations using a hashable key.
-    It also provides helper methods to generate a consistent hash for any given key.
+    It also provides helper methods to generate a consistent hash for any given key,
+    and to serialize values with an optional `ValueCodec`.
     """
 
+    codec: Optional[ValueCodec] = None
+
+    def _encode_value(self, value: Any) -> bytes:
+        """
+        Serialize a value with the codec of the storage, as JSON if it has none.
+        """
+        if self.codec is None:
+            return json.dumps(value).encode("utf-8")
+        return self.codec.encode(value)
+
+    def _decode_value(self, data: Union[bytes, str]) -> Any:
+        """
+        Deserialize stored data, whatever codec it was written with.
+        """
+        if self.codec is None:
+            return decode_value(data)
+        return self.codec.decode(data)
+
     def _generate_hash(self, data: Any) -> str:
         """
         Generate a SHA-256 hash for the given data.
         
+        Strings are hashed as is, other data through its canonical JSON serialization
+        so that equal dictionaries always give the same hash.
+
         Args:
             data (Any): A hashable object.
             
         Returns:
             str: The SHA-256 hash of the string representation of the data.
         """
-        data_str = str(data)
-        return hashlib.sha256(data_str.encode("utf-8")).hexdigest()
+        if isinstance(data, str):
+            return hashlib.sha256(data.encode("utf-8")).hexdigest()
+        return hash_json(data)
 
     def _get_hashed_key(self, key: Any) -> str:
         """
@@ -34,6 +93,8 @@ class AbstractCacheStorage(ABC, LoggingMixin):
         Returns:
             str: The hashed key.
         """
+        if isinstance(key, CacheKey):
+            return key.hashed
         return self._generate_hash(key)
 
     @abstractmethod
@@ -59,3 +120,59 @@ class AbstractCacheStorage(ABC, LoggingMixin):
             value: The value to cache.
         """
         raise NotImplementedError
+
+    def get_many(self, keys: Sequence[Any]) -> List[Any]:
+        """
+        Retrieve the cached values of several keys at once.
+        Storages override it with a bulk lookup, this default looks keys up one by one.
+
+        Args:
+            keys (Sequence[Any]): Hashable objects used as keys.
+
+        Returns:
+            List[Any]: The cached value of each key, or None where it is missing.
+        """
+        return [self.get(key) for key in keys]
+
+    def put_many(self, items: Iterable[Tuple[Any, Any]]):
+        """
+        Store several values at once.
+        Storages override it with a bulk write, this default stores items one by one.
+
+        Args:
+            items (Iterable[Tuple[Any, Any]]): Pairs of key and value to cache.
+        """
+        for key, value in items:
+            self.put(key, value)
+
+    async def _run_io(self, func, *args):
+        """
+        Runs a blocking cache method in the cache thread pool.
+        """
+        return await asyncio.get_running_loop().run_in_executor(get_cache_executor(), func, *args)
+
+    async def aget(self, key: Any):
+        """
+        Asynchronously retrieve a cached value, see `get`.
+        Storages that can answer without blocking override it, this default runs `get`
+        in the cache thread pool.
+        """
+        return await self._run_io(self.get, key)
+
+    async def aget_many(self, keys: Sequence[Any]) -> List[Any]:
+        """
+        Asynchronously retrieve several cached values, see `get_many`.
+        """
+        return await self._run_io(self.get_many, keys)
+
+    async def aput(self, key: Any, value):
+        """
+        Asynchronously store a value, see `put`.
+        """
+        await self._run_io(self.put, key, value)
+
+    async def aput_many(self, items: Iterable[Tuple[Any, Any]]):
+        """
+        Asynchronously store several values, see `put_many`.
+        """
+        await self._run_io(self.put_many, list(items))
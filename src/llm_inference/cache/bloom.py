@@ -0,0 +1,270 @@
+import hashlib
+import math
+import os
+import struct
+import threading
+import time
+from typing import Callable, Iterable, Optional, Tuple
+
+from llm_inference.cache.locking import LOCK_FILE_NAME, atomic_write, file_lock
+from llm_inference.logger_mixin import LoggingMixin
+
+BLOOM_MAGIC = b"LLMBLOOM"
+BLOOM_HEADER = struct.Struct("<8sQIQQ")  # magic, number of bits, number of hashes, capacity, number of keys
+BLOOM_FILE_NAME = ".bloom"
+BLOOM_JOURNAL_FILE_NAME = ".bloom.journal"
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter of strings.
+
+    `might_contain` has no false negatives, and false positives at about `error_rate`
+    as long as fewer than `capacity` keys were added.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        """
+        Args:
+            capacity (int): The number of keys the filter is sized for (default: 1M).
+            error_rate (float): The false positive rate at capacity (default: 1%).
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def might_contain(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    __contains__ = might_contain
+
+    def to_bytes(self) -> bytes:
+        header = BLOOM_HEADER.pack(BLOOM_MAGIC, self.num_bits, self.num_hashes, self.capacity, self.count)
+        return header + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        magic, num_bits, num_hashes, capacity, count = BLOOM_HEADER.unpack_from(data)
+        if magic != BLOOM_MAGIC or len(data) != BLOOM_HEADER.size + (num_bits + 7) // 8:
+            raise ValueError("Not a Bloom filter file")
+        bloom_filter = cls.__new__(cls)
+        bloom_filter.num_bits = num_bits
+        bloom_filter.num_hashes = num_hashes
+        bloom_filter.capacity = capacity
+        bloom_filter.error_rate = math.exp(-num_bits / capacity * math.log(2) ** 2)
+        bloom_filter.bits = bytearray(data[BLOOM_HEADER.size:])
+        bloom_filter.count = count
+        return bloom_filter
+
+
+class CacheKeyFilter(LoggingMixin):
+    """
+    Persistent Bloom filter of the hashed keys present in a cache directory.
+
+    The filter is a snapshot file, built by scanning the cache once, plus an append-only
+    journal of the keys written since then, by any process. A key the filter does not
+    hold costs one `stat` of the journal: if another process appended to it since the
+    last replay, the new keys are replayed before answering, so keys written by other
+    processes are never reported as misses. The snapshot itself is checked for a
+    compaction by another process at most every `refresh_interval` seconds.
+
+    The journal is merged into the snapshot by `compact`, automatically once it grows
+    beyond `max_journal_bytes`.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        list_keys: Callable[[], Iterable[str]],
+        capacity: int = 1_000_000,
+        error_rate: float = 0.01,
+        refresh_interval: float = 5.0,
+        max_journal_bytes: int = 8 * 1024 * 1024,
+    ):
+        """
+        Args:
+            cache_dir (str): The cache directory, holding the filter files.
+            list_keys (Callable): Lists the hashed keys present in the cache, used to build the snapshot.
+            capacity (int): Minimum number of keys the filter is sized for, grown as needed (default: 1M).
+            error_rate (float): The false positive rate at capacity (default: 1%).
+            refresh_interval (float): Minimum seconds between two checks of the snapshot (default: 5).
+            max_journal_bytes (int): Size of the journal above which it is compacted (default: 8 MiB).
+        """
+        self.snapshot_path = os.path.join(cache_dir, BLOOM_FILE_NAME)
+        self.journal_path = os.path.join(cache_dir, BLOOM_JOURNAL_FILE_NAME)
+        self.lock_path = os.path.join(cache_dir, LOCK_FILE_NAME)
+        self.list_keys = list_keys
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.max_journal_bytes = max_journal_bytes
+
+        self._filter: Optional[BloomFilter] = None
+        self._journal_offset = 0
+        self._journal_stat = None
+        self._snapshot_mtime = None
+        self._refreshed_at = 0.0
+        self._lock = threading.RLock()
+
+    def _load(self):
+        """Loads the snapshot, building it first if needed, and replays the whole journal."""
+        bloom_filter = self._read_snapshot()
+        if bloom_filter is None:
+            self.rebuild()
+            return
+        self._filter = bloom_filter
+        self._snapshot_mtime = os.stat(self.snapshot_path).st_mtime_ns
+        self._journal_offset = 0
+        self._replay_journal()
+
+    def _stat_journal(self) -> Optional[Tuple[int, int]]:
+        """The size and modification time of the journal, None if there is none."""
+        try:
+            stat = os.stat(self.journal_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _replay_journal(self):
+        """Adds the keys appended to the journal since the last replay."""
+        try:
+            with open(self.journal_path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                f.seek(self._journal_offset)
+                data = f.read()
+        except FileNotFoundError:
+            self._journal_stat = None
+            self._refreshed_at = time.monotonic()
+            return
+        self._journal_stat = (stat.st_size, stat.st_mtime_ns)
+        # A line being appended by another process is read at the next replay.
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            self._filter.add(line.decode("utf-8"))
+        self._journal_offset += end
+        self._refreshed_at = time.monotonic()
+
+    def _refresh(self):
+        """Replays the journal, or reloads everything if another process compacted it."""
+        try:
+            snapshot_mtime = os.stat(self.snapshot_path).st_mtime_ns
+        except FileNotFoundError:
+            snapshot_mtime = None
+        if snapshot_mtime != self._snapshot_mtime:
+            self._load()
+        else:
+            self._replay_journal()
+
+    def might_contain(self, hashed_key: str) -> bool:
+        """
+        Whether the key may be in the cache, False means it definitely is not.
+        """
+        if self._filter is None:
+            with self._lock:
+                if self._filter is None:
+                    self._load()
+        if self._filter.might_contain(hashed_key):
+            return True
+        if time.monotonic() - self._refreshed_at >= self.refresh_interval:
+            with self._lock:
+                self._refresh()
+            return self._filter.might_contain(hashed_key)
+        if self._stat_journal() != self._journal_stat:
+            # Another process wrote keys since the last replay.
+            with self._lock:
+                self._replay_journal()
+            return self._filter.might_contain(hashed_key)
+        return False
+
+    def add(self, hashed_key: str):
+        """
+        Records a key written to the cache.
+        """
+        with self._lock:
+            if self._filter is None:
+                self._load()
+            self._filter.add(hashed_key)
+            with open(self.journal_path, "ab") as f:
+                f.write(f"{hashed_key}\n".encode("utf-8"))
+                journal_size = f.tell()
+            if self._filter.count > self._filter.capacity:
+                self.rebuild()
+            elif journal_size > self.max_journal_bytes:
+                self.compact()
+
+    def _save(self, bloom_filter: BloomFilter):
+        atomic_write(self.snapshot_path, bloom_filter.to_bytes())
+        self._filter = bloom_filter
+        self._journal_offset = 0
+        self._journal_stat = None
+        self._snapshot_mtime = os.stat(self.snapshot_path).st_mtime_ns
+        self._refreshed_at = time.monotonic()
+
+    def _read_snapshot(self) -> Optional[BloomFilter]:
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                return BloomFilter.from_bytes(f.read())
+        except (FileNotFoundError, ValueError, struct.error, ZeroDivisionError):
+            return None
+
+    def _detach_journal(self) -> Optional[str]:
+        """Moves the journal aside, new keys go to a new journal."""
+        old_journal_path = f"{self.journal_path}.old"
+        try:
+            os.replace(self.journal_path, old_journal_path)
+        except FileNotFoundError:
+            return None
+        return old_journal_path
+
+    def rebuild(self):
+        """
+        Builds the snapshot from a scan of the cache directory.
+        """
+        with self._lock, file_lock(self.lock_path):
+            # Keys journaled before the journal is moved aside were written before,
+            # so the scan sees them.
+            old_journal_path = self._detach_journal()
+            keys = list(self.list_keys())
+            bloom_filter = BloomFilter(max(self.capacity, 2 * len(keys)), self.error_rate)
+            for key in keys:
+                bloom_filter.add(key)
+            self._save(bloom_filter)
+            if old_journal_path is not None:
+                os.remove(old_journal_path)
+        self.logger.info(f"Built the Bloom filter of {len(keys)} cache keys in {self.snapshot_path}")
+
+    def compact(self):
+        """
+        Merges the journal into the snapshot, or rebuilds the snapshot if it is full.
+        """
+        with self._lock, file_lock(self.lock_path):
+            bloom_filter = self._read_snapshot()
+            if bloom_filter is not None:
+                old_journal_path = self._detach_journal()
+                if old_journal_path is not None:
+                    with open(old_journal_path, "rb") as f:
+                        for line in f.read().splitlines():
+                            bloom_filter.add(line.decode("utf-8"))
+                if bloom_filter.count <= bloom_filter.capacity:
+                    self._save(bloom_filter)
+                    if old_journal_path is not None:
+                        os.remove(old_journal_path)
+                    return
+                if old_journal_path is not None:
+                    # The keys of the old journal are in the cache, the scan will see them.
+                    os.remove(old_journal_path)
+        self.rebuild()
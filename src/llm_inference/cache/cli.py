@@ -0,0 +1,426 @@
+"""
+Administration of the LLM response caches: `llm-cache {stats,prune,verify,export,import,copy,pack,serve}`.
+
+Storages are given as `disk:<dir>`, `sqlite:<file>`, `lmdb:<dir>` or `pack:<file>`, or as
+a plain path whose type is detected (a `.sqlite3`/`.db` file, a `.pack`/`.idx` file,
+a directory holding `data.mdb`, or any other directory). Packs are read-only.
+"""
+import argparse
+import contextlib
+import gzip
+import json
+import logging
+import math
+import os
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from llm_inference.cache.base import AbstractCacheStorage, CacheEntry
+from llm_inference.cache.codec import ValueCodec, ZstdDictionaryError, decode_value
+from llm_inference.cache.disk import DiskCacheStorage
+from llm_inference.cache.eviction import EvictionPolicy
+from llm_inference.cache.hashing import validate_hashed_key
+from llm_inference.cache.locking import LOCK_FILE_NAME, file_lock
+from llm_inference.cache.pack import INDEX_SUFFIX, PACK_SUFFIX, PackCacheStorage, write_pack
+from llm_inference.cache.sqlite import SqliteCacheStorage
+
+logger = logging.getLogger(__name__)
+
+NAMESPACED_KEY_PATTERN = re.compile(r"^([A-Za-z0-9_.]+)-v(\d+)-")
+LEGACY_NAMESPACE = "<legacy>"
+AGE_BUCKETS = [("< 1 day", 1), ("< 1 week", 7), ("< 1 month", 30), ("< 3 months", 90), ("< 1 year", 365)]
+SIZE_BUCKETS = [("< 1 KiB", 1024), ("< 4 KiB", 4096), ("< 16 KiB", 16384), ("< 64 KiB", 65536)]
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+DAY = 24 * 3600
+VERIFY_BATCH_SIZE = 10_000
+
+
+def open_storage(spec: str, codec: Optional[ValueCodec] = None) -> AbstractCacheStorage:
+    """
+    Opens a cache storage from its command-line specification.
+
+    Args:
+        spec (str): `disk:<dir>`, `sqlite:<file>`, `lmdb:<dir>`, `pack:<file>`, or a plain path.
+        codec (ValueCodec, optional): The codec of the storage.
+
+    Returns:
+        AbstractCacheStorage: The storage.
+    """
+    kind, _, path = spec.partition(":")
+    if kind not in ("disk", "sqlite", "lmdb", "pack") or not path:
+        kind, path = None, spec
+    if kind is None:
+        if path.endswith((".sqlite3", ".sqlite", ".db")):
+            kind = "sqlite"
+        elif path.endswith((PACK_SUFFIX, INDEX_SUFFIX)):
+            kind = "pack"
+        elif os.path.exists(os.path.join(path, "data.mdb")):
+            kind = "lmdb"
+        else:
+            kind = "disk"
+
+    if kind == "sqlite":
+        return SqliteCacheStorage(db_path=path, codec=codec)
+    if kind == "pack":
+        return PackCacheStorage([path], codec=codec)
+    if kind == "lmdb":
+        from llm_inference.cache.lmdb import LmdbCacheStorage
+        return LmdbCacheStorage(path=path, codec=codec)
+    return DiskCacheStorage(cache_dir=path, codec=codec, pin_current_run=False)
+
+
+def get_namespace(hashed_key: str) -> str:
+    """
+    Returns the namespace of a hashed key, see `CacheKeyBuilder`.
+    Keys hashed before namespaces were introduced belong to `<legacy>`.
+    """
+    match = NAMESPACED_KEY_PATTERN.match(hashed_key)
+    return match.group(1) if match else LEGACY_NAMESPACE
+
+
+def parse_size(size: str) -> int:
+    """Parses a size such as `500M` or `2G` into bytes."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*", size, re.IGNORECASE)
+    if match is None:
+        raise argparse.ArgumentTypeError(f"Invalid size '{size}', expected e.g. 500M or 2G")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+def format_size(size: float) -> str:
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+def histogram(values: Iterable[float], buckets: List[Tuple[str, float]], last_label: str) -> Counter:
+    counts = Counter({label: 0 for label, _ in buckets})
+    counts[last_label] = 0
+    for value in values:
+        label = next((label for label, limit in buckets if value < limit), last_label)
+        counts[label] += 1
+    return counts
+
+
+def compute_stats(entries: Iterable[CacheEntry], now: Optional[float] = None) -> dict:
+    """
+    Summarizes the entries of a storage.
+
+    Args:
+        entries (Iterable[CacheEntry]): The entries.
+        now (float, optional): The current time (default: time.time()).
+
+    Returns:
+        dict: Entry count, total bytes, and histograms by age, size and namespace.
+    """
+    now = time.time() if now is None else now
+    entries = list(entries)
+    ages = [(now - entry.created_at) / DAY for entry in entries if not math.isnan(entry.created_at)]
+    return {
+        "entries": len(entries),
+        "bytes": sum(entry.size for entry in entries),
+        "oldest_days": max(ages, default=None),
+        "newest_days": min(ages, default=None),
+        "age_histogram": dict(histogram(ages, AGE_BUCKETS, ">= 1 year")),
+        "size_histogram": dict(histogram((entry.size for entry in entries), SIZE_BUCKETS, ">= 64 KiB")),
+        "namespaces": dict(Counter(get_namespace(entry.hashed_key) for entry in entries).most_common()),
+    }
+
+
+def select_prunable(
+    entries: Iterable[CacheEntry],
+    older_than: Optional[float] = None,
+    max_bytes: Optional[int] = None,
+    namespaces: Iterable[str] = (),
+    now: Optional[float] = None,
+) -> List[CacheEntry]:
+    """
+    Selects the entries to prune: the entries of the given namespaces, the entries older
+    than `older_than` days, then the least recently used ones until the rest fits in `max_bytes`.
+    """
+    namespaces = set(namespaces)
+    kept = []
+    pruned = []
+    for entry in entries:
+        (pruned if get_namespace(entry.hashed_key) in namespaces else kept).append(entry)
+    if older_than is not None or max_bytes is not None:
+        policy = EvictionPolicy(
+            max_bytes=max_bytes,
+            ttl=older_than * DAY if older_than is not None else None,
+            low_watermark=1.0,
+        )
+        pruned.extend(policy.select(kept, now=now))
+    return pruned
+
+
+def _check_entry(item: Tuple[str, bytes, Optional[bytes]]) -> Optional[Tuple[str, str]]:
+    """
+    Decodes one entry, returns the error if it is corrupted. Runs in worker processes.
+    A missing zstd dictionary raises `ZstdDictionaryError`: the entry is not corrupted.
+    """
+    hashed_key, data, zstd_dictionary = item
+    try:
+        decode_value(data, zstd_dictionary)
+    except ValueError as e:
+        return hashed_key, str(e)
+    return None
+
+
+def verify(
+    storage: AbstractCacheStorage,
+    workers: Optional[int] = None,
+    zstd_dictionary: Optional[bytes] = None,
+) -> List[Tuple[str, str]]:
+    """
+    Decodes every entry of a storage in parallel.
+
+    Args:
+        storage (AbstractCacheStorage): The storage to check.
+        workers (int, optional): Number of worker processes (default: one per CPU).
+        zstd_dictionary (bytes, optional): The dictionary of zstd-compressed entries.
+
+    Returns:
+        List[Tuple[str, str]]: The hashed key and the error of each corrupted entry.
+    """
+    items = ((hashed_key, data, zstd_dictionary) for hashed_key, data in storage._iter_hashed())
+    errors = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Batches bound the number of entries held in memory at once.
+        for batch in _batched(items, VERIFY_BATCH_SIZE):
+            errors.extend(error for error in executor.map(_check_entry, batch, chunksize=256) if error is not None)
+    return errors
+
+
+def iter_decoded(storage: AbstractCacheStorage) -> Iterator[Tuple[str, object]]:
+    """Iterates over the hashed keys and values of a storage, skipping corrupted entries."""
+    for hashed_key, data in storage._iter_hashed():
+        try:
+            yield hashed_key, storage._decode_value(data)
+        except ValueError as e:
+            logger.warning(f"Skipping corrupted cache entry {hashed_key}: {e}")
+
+
+def export_entries(storage: AbstractCacheStorage, path: str) -> int:
+    """
+    Exports the entries of a storage to a JSON-lines file (gzipped if it ends with `.gz`),
+    one `{"key": <hashed key>, "value": <value>}` object per line.
+
+    Returns:
+        int: The number of exported entries.
+    """
+    exported = 0
+    with (gzip.open(path, "wt") if path.endswith(".gz") else open(path, "w")) as f:
+        for hashed_key, value in iter_decoded(storage):
+            f.write(json.dumps({"key": hashed_key, "value": value}) + "\n")
+            exported += 1
+    return exported
+
+
+def _batched(items: Iterable, batch_size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_entries(path: str, storage: AbstractCacheStorage, batch_size: int = 1000) -> int:
+    """
+    Imports a JSON-lines export into a storage, encoded with the codec of the storage.
+
+    Returns:
+        int: The number of imported entries.
+    """
+    def iter_lines():
+        with (gzip.open(path, "rt") if path.endswith(".gz") else open(path, "r")) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield validate_hashed_key(record["key"]), storage._encode_value(record["value"])
+
+    imported = 0
+    for batch in _batched(iter_lines(), batch_size):
+        imported += storage._put_many_hashed(batch)
+    return imported
+
+
+def copy_entries(source: AbstractCacheStorage, destination: AbstractCacheStorage, batch_size: int = 1000, reencode: bool = False) -> int:
+    """
+    Copies all the entries of a storage into another one, as stored or re-encoded
+    with the codec of the destination.
+
+    Returns:
+        int: The number of copied entries.
+    """
+    if reencode:
+        items = ((hashed_key, destination._encode_value(value)) for hashed_key, value in iter_decoded(source))
+    else:
+        items = source._iter_hashed()
+    copied = 0
+    for batch in _batched(items, batch_size):
+        copied += destination._put_many_hashed(batch)
+        logger.info(f"Copied {copied} cache entries")
+    return copied
+
+
+def _print_stats(stats: dict):
+    print(f"Entries: {stats['entries']}")
+    print(f"Size: {format_size(stats['bytes'])}")
+    if stats["oldest_days"] is not None:
+        print(f"Age: {stats['newest_days']:.1f} to {stats['oldest_days']:.1f} days")
+    for title, key in [("Age", "age_histogram"), ("Entry size", "size_histogram"), ("Namespace", "namespaces")]:
+        print(f"\n{title}:")
+        for label, count in stats[key].items():
+            print(f"  {label:<12} {count:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="llm-cache", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--zstd_dictionary", help="zstd dictionary of the compressed entries")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log progress")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stats_parser = commands.add_parser("stats", help="Entry count, size, age and namespace histograms")
+    stats_parser.add_argument("storage", help="The cache storage")
+    stats_parser.add_argument("--json", action="store_true", help="Print the statistics as JSON")
+
+    prune_parser = commands.add_parser("prune", help="Delete entries by age, size or namespace")
+    prune_parser.add_argument("storage", help="The cache storage")
+    prune_parser.add_argument("--older_than", type=float, help="Delete entries written more than this many days ago")
+    prune_parser.add_argument("--max_size", type=parse_size, help="Delete the least recently used entries above this size, e.g. 2G")
+    prune_parser.add_argument("--namespace", action="append", default=[], help="Delete the entries of this namespace (repeatable)")
+    prune_parser.add_argument("--dry_run", action="store_true", help="Only report what would be deleted")
+
+    verify_parser = commands.add_parser("verify", help="Check that every entry decodes, in parallel")
+    verify_parser.add_argument("storage", help="The cache storage")
+    verify_parser.add_argument("--workers", type=int, help="Number of worker processes (default: one per CPU)")
+    verify_parser.add_argument("--delete", action="store_true", help="Delete the corrupted entries")
+
+    export_parser = commands.add_parser("export", help="Export the entries to a JSON-lines file")
+    export_parser.add_argument("storage", help="The cache storage")
+    export_parser.add_argument("output", help="The JSON-lines file, gzipped if it ends with .gz")
+
+    import_parser = commands.add_parser("import", help="Import the entries of a JSON-lines export")
+    import_parser.add_argument("input", help="The JSON-lines file")
+    import_parser.add_argument("storage", help="The cache storage")
+    import_parser.add_argument("--compression", choices=["zstd", "zlib"], help="Compress the imported entries")
+
+    copy_parser = commands.add_parser("copy", help="Copy the entries of a storage into another one")
+    copy_parser.add_argument("source", help="The source cache storage")
+    copy_parser.add_argument("destination", help="The destination cache storage")
+    copy_parser.add_argument("--compression", choices=["zstd", "zlib"], help="Re-encode the entries with this compression")
+
+    pack_parser = commands.add_parser("pack", help="Append the entries of a storage to a pack, e.g. to share it with DVC")
+    pack_parser.add_argument("storage", help="The cache storage")
+    pack_parser.add_argument("pack", help="The pack, created if needed")
+
+    serve_parser = commands.add_parser("serve", help="Share the storage with RemoteCacheStorage clients over HTTP")
+    serve_parser.add_argument("storage", help="The cache storage")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="The interface to listen on, 0.0.0.0 for all (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8765, help="The port to listen on (default: 8765)")
+    serve_parser.add_argument("--token", default=os.getenv("LLM_CACHE_TOKEN"), help="The token clients must send (default: the LLM_CACHE_TOKEN environment variable)")
+    serve_parser.add_argument("--allow_unauthenticated", action="store_true", help="Listen on other interfaces than loopback without a token")
+    serve_parser.add_argument("--max_body_size", type=parse_size, default="256M", help="Largest accepted request body, e.g. 64M (default: 256M)")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    zstd_dictionary = None
+    if args.zstd_dictionary:
+        with open(args.zstd_dictionary, "rb") as f:
+            zstd_dictionary = f.read()
+    codec = ValueCodec(compression=None, zstd_dictionary=zstd_dictionary)
+
+    if args.command == "stats":
+        stats = compute_stats(open_storage(args.storage, codec).iter_entries())
+        if args.json:
+            print(json.dumps(stats, indent=2))
+        else:
+            _print_stats(stats)
+
+    elif args.command == "prune":
+        if args.older_than is None and args.max_size is None and not args.namespace:
+            parser.error("prune needs --older_than, --max_size or --namespace")
+        storage = open_storage(args.storage, codec)
+        if not args.dry_run and not hasattr(storage, "_delete_many_hashed"):
+            parser.error(f"{args.storage} is read-only, its entries cannot be pruned (packs are rewritten with `llm-cache pack`)")
+        is_disk = isinstance(storage, DiskCacheStorage)
+        with file_lock(os.path.join(storage.cache_dir, LOCK_FILE_NAME)) if is_disk else contextlib.nullcontext():
+            pruned = select_prunable(storage.iter_entries(), args.older_than, args.max_size, args.namespace)
+            if not args.dry_run:
+                storage._delete_many_hashed(entry.hashed_key for entry in pruned)
+        verb = "Would delete" if args.dry_run else "Deleted"
+        print(f"{verb} {len(pruned)} entries ({format_size(sum(entry.size for entry in pruned))})")
+
+    elif args.command == "verify":
+        storage = open_storage(args.storage, codec)
+        if args.delete and not hasattr(storage, "_delete_many_hashed"):
+            parser.error(f"{args.storage} is read-only, its entries cannot be deleted")
+        try:
+            errors = verify(storage, workers=args.workers, zstd_dictionary=zstd_dictionary)
+        except ZstdDictionaryError as e:
+            parser.error(f"{e}, pass the dictionary of the entries with --zstd_dictionary")
+        for hashed_key, error in errors:
+            print(f"{hashed_key}: {error}")
+        if errors and args.delete:
+            storage._delete_many_hashed(hashed_key for hashed_key, _ in errors)
+        print(f"{len(errors)} corrupted entries" + (" deleted" if errors and args.delete else ""))
+        if errors and not args.delete:
+            sys.exit(1)
+
+    elif args.command == "export":
+        exported = export_entries(open_storage(args.storage, codec), args.output)
+        print(f"Exported {exported} entries to {args.output}")
+
+    elif args.command == "import":
+        destination = open_storage(args.storage, _make_codec(args.compression, zstd_dictionary))
+        imported = import_entries(args.input, destination)
+        _close(destination)
+        print(f"Imported {imported} entries into {args.storage}")
+
+    elif args.command == "copy":
+        source = open_storage(args.source, codec)
+        destination = open_storage(args.destination, _make_codec(args.compression, zstd_dictionary))
+        copied = copy_entries(source, destination, reencode=args.compression is not None)
+        _close(destination)
+        print(f"Copied {copied} entries into {args.destination}")
+
+    elif args.command == "pack":
+        packed = write_pack(open_storage(args.storage, codec)._iter_hashed(), args.pack)
+        print(f"Packed {packed} new entries into {args.pack}")
+
+    elif args.command == "serve":
+        from llm_inference.cache.server import is_loopback, serve
+        if args.token is None and not args.allow_unauthenticated and not is_loopback(args.host):
+            parser.error(f"serving on {args.host} needs --token (or LLM_CACHE_TOKEN), or --allow_unauthenticated")
+        serve(
+            open_storage(args.storage, codec),
+            host=args.host,
+            port=args.port,
+            token=args.token,
+            allow_unauthenticated=args.allow_unauthenticated,
+            max_body_size=args.max_body_size,
+        )
+
+
+def _make_codec(compression: Optional[str], zstd_dictionary: Optional[bytes]) -> Optional[ValueCodec]:
+    if compression is None:
+        return None
+    return ValueCodec(compression=compression, zstd_dictionary=zstd_dictionary if compression == "zstd" else None)
+
+
+def _close(storage: AbstractCacheStorage):
+    if hasattr(storage, "close"):
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
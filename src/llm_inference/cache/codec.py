@@ -0,0 +1,217 @@
+import json
+import logging
+import zlib
+from typing import Any, Iterable, List, Optional, Sequence, Union
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+ZLIB_MAGIC = 0x78  # First byte of a zlib stream with the default window, never the start of a JSON text.
+COMPRESSIONS = ("zstd", "zlib", None)
+WILDCARD = "*"
+
+# Fields of a Mistral chat completion that the backends never read back from the cache.
+MISTRAL_UNUSED_FIELDS = (
+    "id",
+    "object",
+    "created",
+    "choices.*.index",
+    "choices.*.message.tool_calls",
+    "choices.*.message.prefix",
+)
+
+
+def project(value: Any, drop_fields: Iterable[str]) -> Any:
+    """
+    Returns a copy of a JSON value without the given fields.
+
+    Fields are dotted paths, where `*` matches every item of a list or every value of
+    a dictionary (e.g. "choices.*.message.tool_calls"). Missing fields are ignored.
+
+    Args:
+        value (Any): A JSON value.
+        drop_fields (Iterable[str]): The dotted paths of the fields to remove.
+
+    Returns:
+        Any: The projected value, the input is left untouched.
+    """
+    paths = [path.split(".") for path in drop_fields]
+    return _project(value, paths) if paths else value
+
+
+def _project(value: Any, paths: List[List[str]]) -> Any:
+    if isinstance(value, list):
+        item_paths = [path[1:] for path in paths if path[0] == WILDCARD]
+        if not item_paths:
+            return value
+        dropped = [path for path in item_paths if not path]
+        if dropped:
+            return []
+        return [_project(item, item_paths) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    projected = {}
+    for name, item in value.items():
+        item_paths = [path[1:] for path in paths if path[0] in (name, WILDCARD)]
+        if any(not path for path in item_paths):
+            continue
+        projected[name] = _project(item, item_paths) if item_paths else item
+    return projected
+
+
+class ZstdDictionaryError(LookupError):
+    """
+    Raised when zstd data was compressed with a dictionary that was not given, or with
+    another one. The entry is valid: it must not be treated as corrupted.
+    """
+
+
+def is_compressed(data: bytes) -> bool:
+    """Whether stored cache data is compressed rather than plain JSON."""
+    return data[:4] == ZSTD_MAGIC or (len(data) > 0 and data[0] == ZLIB_MAGIC)
+
+
+def decode_value(data: Union[bytes, memoryview, str], zstd_dictionary: Optional[bytes] = None) -> Any:
+    """
+    Decodes stored cache data, whether it is plain JSON, zlib or zstd compressed.
+
+    Args:
+        data (bytes | memoryview | str): The stored data, e.g. a buffer into a memory map.
+        zstd_dictionary (bytes, optional): The dictionary the zstd data was compressed with.
+
+    Returns:
+        Any: The cached value.
+
+    Raises:
+        ValueError: If the data is corrupted.
+        ZstdDictionaryError: If the zstd data needs another dictionary.
+    """
+    if isinstance(data, str):
+        return json.loads(data)
+    if data[:4] == ZSTD_MAGIC:
+        if zstandard is None:
+            raise ImportError("Reading zstd-compressed cache entries requires the 'zstandard' package: pip install zstandard")
+        try:
+            frame_dict_id = zstandard.get_frame_parameters(data).dict_id
+        except zstandard.ZstdError as e:
+            raise ValueError(f"Corrupted zstd data: {e}") from e
+        dict_data = zstandard.ZstdCompressionDict(zstd_dictionary) if zstd_dictionary else None
+        if frame_dict_id and (dict_data is None or dict_data.dict_id() != frame_dict_id):
+            raise ZstdDictionaryError(
+                f"zstd data compressed with dictionary {frame_dict_id}, "
+                + ("no dictionary was given" if dict_data is None else f"got dictionary {dict_data.dict_id()}")
+            )
+        decompressor = zstandard.ZstdDecompressor(dict_data=dict_data)
+        try:
+            data = decompressor.decompress(data)
+        except zstandard.ZstdError as e:
+            raise ValueError(f"Corrupted zstd data: {e}") from e
+    elif data[:1] == bytes([ZLIB_MAGIC]):
+        try:
+            data = zlib.decompress(data)
+        except zlib.error as e:
+            raise ValueError(f"Corrupted zlib data: {e}") from e
+    if isinstance(data, memoryview):
+        # Decoded straight from the buffer, without an intermediate copy.
+        data = str(data, "utf-8")
+    return json.loads(data)
+
+
+class ValueCodec:
+    """
+    Serializes cache values into compact bytes.
+
+    Values are projected on the fields that are read back, serialized as compact JSON
+    and compressed with zstd (optional `zstandard` package, with an optional trained
+    dictionary) or zlib. Decoding detects the format from the data itself, so entries
+    written without a codec, or with another compression, keep being readable.
+    """
+
+    def __init__(
+        self,
+        drop_fields: Sequence[str] = (),
+        compression: Optional[str] = "zstd",
+        level: int = 3,
+        zstd_dictionary: Union[bytes, str, None] = None,
+    ):
+        """
+        Initialize the ValueCodec.
+
+        Args:
+            drop_fields (Sequence[str]): Dotted paths of the fields never read back, see `project`.
+            compression (str, optional): "zstd", "zlib" or None (default: "zstd").
+                Falls back to "zlib" when `zstandard` is not installed.
+            level (int): The compression level (default: 3).
+            zstd_dictionary (bytes | str, optional): A dictionary trained with `train_zstd_dictionary`,
+                or the path of a file holding it.
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression '{compression}', expected one of {COMPRESSIONS}")
+        if compression == "zstd" and zstandard is None:
+            logger.warning("The 'zstandard' package is not installed, cache values are compressed with zlib")
+            compression = "zlib"
+        if isinstance(zstd_dictionary, str):
+            with open(zstd_dictionary, "rb") as f:
+                zstd_dictionary = f.read()
+
+        self.drop_fields = tuple(drop_fields)
+        self.compression = compression
+        self.level = level
+        self.zstd_dictionary = zstd_dictionary
+        self._compressor = None
+        if compression == "zstd":
+            dict_data = zstandard.ZstdCompressionDict(zstd_dictionary) if zstd_dictionary else None
+            self._compressor = zstandard.ZstdCompressor(level=level, dict_data=dict_data)
+
+    def encode(self, value: Any) -> bytes:
+        """
+        Serializes a value.
+
+        Args:
+            value (Any): A JSON value.
+
+        Returns:
+            bytes: The stored data.
+        """
+        data = json.dumps(project(value, self.drop_fields), separators=(",", ":")).encode("utf-8")
+        if self.compression == "zstd":
+            return self._compressor.compress(data)
+        if self.compression == "zlib":
+            return zlib.compress(data, self.level)
+        return data
+
+    def decode(self, data: Union[bytes, memoryview, str]) -> Any:
+        """
+        Deserializes stored data, see `decode_value`.
+        """
+        return decode_value(data, self.zstd_dictionary)
+
+
+def train_zstd_dictionary(samples: Iterable[Any], dict_size: int = 112_640, drop_fields: Sequence[str] = ()) -> bytes:
+    """
+    Trains a zstd dictionary on sample cache values.
+
+    Near-identical responses share most of their bytes, a dictionary trained on a few
+    thousand of them makes each compressed entry much smaller.
+
+    Args:
+        samples (Iterable[Any]): Sample cache values.
+        dict_size (int): Maximum size of the dictionary in bytes (default: 110 KiB).
+        drop_fields (Sequence[str]): The fields dropped by the codec that will use the dictionary.
+
+    Returns:
+        bytes: The dictionary, to save and pass to `ValueCodec`.
+    """
+    if zstandard is None:
+        raise ImportError("Training a zstd dictionary requires the 'zstandard' package: pip install zstandard")
+    data = [
+        json.dumps(project(sample, drop_fields), separators=(",", ":")).encode("utf-8")
+        for sample in samples
+    ]
+    return zstandard.train_dictionary(dict_size, data).as_bytes()
@@ -1,60 +1,470 @@
 import os
 import json
-from typing import Any
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from llm_inference.cache.base import AbstractCacheStorage
+from llm_inference.cache.base import AbstractCacheStorage, CacheEntry
+from llm_inference.cache.bloom import CacheKeyFilter
+from llm_inference.cache.codec import ValueCodec, ZstdDictionaryError
+from llm_inference.cache.eviction import EvictionPolicy
+from llm_inference.cache.hashing import validate_hashed_key
+from llm_inference.cache.locking import LOCK_FILE_NAME, atomic_write, file_lock
 from llm_inference.settings import CACHE_DIR
 
+CACHE_FILE_SUFFIX = ".cache"
+ACCESS_COUNTS_FILE_NAME = ".access_counts.json"
+QUARANTINE_DIR_NAME = ".quarantine"
+
+
+def iter_cache_files(cache_dir: str) -> Iterator[os.DirEntry]:
+    """
+    Iterates over the cache files of a directory, in the flat and in the sharded layout.
+    Hidden files and directories (temporary files, quarantine) are skipped.
+
+    Args:
+        cache_dir (str): The cache directory.
+
+    Yields:
+        os.DirEntry: The directory entry of each cache file.
+    """
+    with os.scandir(cache_dir) as dir_entries:
+        for dir_entry in dir_entries:
+            if dir_entry.name.startswith("."):
+                continue
+            if dir_entry.is_dir(follow_symlinks=False):
+                yield from iter_cache_files(dir_entry.path)
+            elif dir_entry.name.endswith(CACHE_FILE_SUFFIX):
+                yield dir_entry
+
+
 class DiskCacheStorage(AbstractCacheStorage):
     """
     Disk-based cache storage implementation.
     Stores cached values in JSON files on disk.
+
+    Files are sharded in nested subdirectories named after the first characters of
+    the key digest (e.g. `ab/cd/<hashed_key>.cache`), so that no directory grows to
+    hundreds of thousands of files. Entries of the former flat layout stay readable
+    and are moved to their shard when read, or all at once with `migrate_flat_layout`.
+
+    Several processes can share a cache directory: entries are written to a temporary
+    file renamed over the final one, so readers never see a partial write, and compound
+    operations (eviction, migration) hold an advisory lock on the directory. Corrupted
+    entries are moved to a quarantine directory and treated as misses; entries that
+    need a zstd dictionary the codec does not have raise `ZstdDictionaryError` and stay.
+
+    With `bloom_filter`, an in-memory Bloom filter of the stored keys answers definite
+    misses without touching the filesystem, see `CacheKeyFilter`.
+
+    With an eviction policy, the cache is kept under size, entry count and age limits.
+    The modification time of a file is its write time and its access time is updated on
+    each hit. Keys read or written by this process are pinned and never evicted by it.
     """
 
-    def __init__(self, subdir: str=None):
+    def __init__(
+        self,
+        subdir: str=None,
+        eviction_policy: Optional[EvictionPolicy] = None,
+        pin_current_run: bool = True,
+        codec: Optional[ValueCodec] = None,
+        cache_dir: str = None,
+        shard_depth: int = 2,
+        shard_width: int = 2,
+        migrate_on_read: bool = True,
+        fsync: bool = False,
+        bloom_filter: bool = False,
+        bloom_capacity: int = 1_000_000,
+    ):
         """
         Initialize the DiskCacheStorage with a given directory for cache files.
+
+        Args:
+            subdir (str, optional): Subdirectory of CACHE_DIR holding the cache files.
+            eviction_policy (EvictionPolicy, optional): Limits enforced on the cache.
+            pin_current_run (bool): Never evict the entries used by this process (default: True).
+            codec (ValueCodec, optional): Projects and compresses the stored values.
+            cache_dir (str, optional): Explicit directory of the cache files, overrides `subdir`.
+            shard_depth (int): Number of nested shard directories, 0 for the flat layout (default: 2).
+            shard_width (int): Number of digest characters naming each shard directory (default: 2).
+            migrate_on_read (bool): Move flat entries to their shard when they are read (default: True).
+            fsync (bool): Flush each entry to the disk before it becomes visible (default: False).
+            bloom_filter (bool): Skip the filesystem on definite misses with a Bloom filter of the keys (default: False).
+            bloom_capacity (int): Minimum number of keys the Bloom filter is sized for (default: 1M).
         """
-        if subdir:
-            self.cache_dir = os.path.join(CACHE_DIR, subdir)
+        if cache_dir is None:
+            cache_dir = os.path.join(CACHE_DIR, subdir) if subdir else CACHE_DIR
+        self.cache_dir = cache_dir
+        self.codec = codec
+        self.shard_depth = shard_depth
+        self.shard_width = shard_width
+        self.migrate_on_read = migrate_on_read
+        self.fsync = fsync
+        self.lock_path = os.path.join(self.cache_dir, LOCK_FILE_NAME)
+        self.quarantine_dir = os.path.join(self.cache_dir, QUARANTINE_DIR_NAME)
+        self.key_filter = None
+        if bloom_filter:
+            self.key_filter = CacheKeyFilter(self.cache_dir, self._list_hashed_keys, capacity=bloom_capacity)
         os.makedirs(self.cache_dir, exist_ok=True)
 
+        self.eviction_policy = eviction_policy
+        self.pin_current_run = pin_current_run
+        self._pinned = set()
+        self._access_counts: Dict[str, int] = {}
+        self._access_lock = threading.Lock()  # Guards _pinned and _access_counts, updated by readers and the eviction thread.
+        self._puts_since_eviction = 0
+        self._eviction_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._eviction_thread = None
+        if eviction_policy is not None and eviction_policy.interval:
+            self._eviction_thread = threading.Thread(target=self._evict_periodically, daemon=True)
+            self._eviction_thread.start()
+
     def _cache_path(self, hashed_key: str) -> str:
         """
         Generate the full file path for a given hashed key.
         """
-        return os.path.join(self.cache_dir, f"{hashed_key}.cache")
+        validate_hashed_key(hashed_key)
+        # Namespaced keys ("ns-v1-<digest>") are sharded on their digest.
+        digest = hashed_key.rsplit("-", 1)[-1]
+        shards = [
+            digest[i * self.shard_width:(i + 1) * self.shard_width]
+            for i in range(self.shard_depth)
+        ]
+        return os.path.join(self.cache_dir, *shards, f"{hashed_key}{CACHE_FILE_SUFFIX}")
+
+    def _flat_cache_path(self, hashed_key: str) -> str:
+        """
+        Generate the file path of a given hashed key in the flat layout.
+        """
+        validate_hashed_key(hashed_key)
+        return os.path.join(self.cache_dir, f"{hashed_key}{CACHE_FILE_SUFFIX}")
+
+    def _find_path(self, hashed_key: str) -> Optional[str]:
+        """
+        Find the file of a given hashed key, in its shard or in the flat layout.
+        """
+        file_path = self._cache_path(hashed_key)
+        if os.path.exists(file_path):
+            return file_path
+        if self.shard_depth == 0:
+            return None
+
+        flat_path = self._flat_cache_path(hashed_key)
+        if os.path.exists(flat_path):
+            if not self.migrate_on_read:
+                return flat_path
+            if self._move_to_shard(flat_path, file_path):
+                return file_path
+        # Another process may have migrated the entry in the meantime.
+        return file_path if os.path.exists(file_path) else None
+
+    def _move_to_shard(self, flat_path: str, file_path: str) -> bool:
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            os.replace(flat_path, file_path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def migrate_flat_layout(self) -> int:
+        """
+        Move all the entries of the flat layout to their shard.
+        Safe to run while other processes read and write the cache.
+
+        Returns:
+            int: The number of moved entries.
+        """
+        if self.shard_depth == 0:
+            return 0
+        moved = 0
+        with file_lock(self.lock_path):
+            with os.scandir(self.cache_dir) as dir_entries:
+                flat_entries = [
+                    dir_entry for dir_entry in dir_entries
+                    if dir_entry.is_file() and dir_entry.name.endswith(CACHE_FILE_SUFFIX)
+                ]
+            for dir_entry in flat_entries:
+                hashed_key = dir_entry.name[:-len(CACHE_FILE_SUFFIX)]
+                if self._move_to_shard(dir_entry.path, self._cache_path(hashed_key)):
+                    moved += 1
+        self.logger.info(f"Moved {moved} cache entries of {self.cache_dir} to the sharded layout")
+        return moved
+
+    def _list_hashed_keys(self) -> Iterator[str]:
+        for dir_entry in iter_cache_files(self.cache_dir):
+            yield dir_entry.name[:-len(CACHE_FILE_SUFFIX)]
+
+    def _track_access(self, hashed_key: str, file_path: str):
+        """
+        Pin the key for the current run and record the access for LRU/LFU eviction.
+        """
+        with self._access_lock:
+            if self.pin_current_run:
+                self._pinned.add(hashed_key)
+            if self.eviction_policy is None:
+                return
+            self._access_counts[hashed_key] = self._access_counts.get(hashed_key, 0) + 1
+        try:
+            # Keep the modification time as write time, only the access time changes.
+            os.utime(file_path, (time.time(), os.stat(file_path).st_mtime))
+        except OSError:
+            pass
+
+    def _read_hashed(self, hashed_key: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """
+        Reads the stored data of a hashed key, and the path it was read from.
+        """
+        if self.key_filter is not None and not self.key_filter.might_contain(hashed_key):
+            return None, None
+        file_path = self._find_path(hashed_key)
+        if file_path is None:
+            return None, None
+        try:
+            with open(file_path, "rb") as f:
+                return f.read(), file_path
+        except FileNotFoundError:
+            pass
+        # Moved to its shard, or evicted, by another process in the meantime.
+        file_path = self._cache_path(hashed_key)
+        try:
+            with open(file_path, "rb") as f:
+                return f.read(), file_path
+        except FileNotFoundError:
+            return None, None
 
     def get(self, key: Any):
         """
         Retrieve a cached value using the given key.
         """
         hashed_key = self._get_hashed_key(key)
-        self.logger.debug(f"Attempting to retrieve cache for key: {hashed_key}")
-        file_path = self._cache_path(hashed_key)
-        if not os.path.exists(file_path):
-            self.logger.debug(f"Cache file not found for key: {hashed_key}")
-            return None
+        self.logger.debug("Attempting to retrieve cache for key: %s", hashed_key)
+        file_path = None
         try:
-            with open(file_path, "r") as f:
-                value = json.load(f)
-            self.logger.info(f"Cache hit for key: {hashed_key}")
-            return value
+            data, file_path = self._read_hashed(hashed_key)
+            if data is None:
+                self.logger.debug("Cache file not found for key: %s", hashed_key)
+                return None
+            value = self._decode_value(data)
+        except ZstdDictionaryError as e:
+            # A valid entry read without its dictionary is never quarantined.
+            self.logger.error(f"Cannot decode cache entry {hashed_key}, check the zstd dictionary of the codec: {e}")
+            raise
+        except ValueError as e:
+            if file_path is None:
+                # An invalid key, not a corrupted entry.
+                raise
+            self.logger.warning(f"Corrupted cache entry for key {hashed_key}, moving it to quarantine: {e}")
+            self._quarantine(file_path)
+            return None
         except Exception as e:
             self.logger.error(f"Error retrieving cache for key {hashed_key}: {e}")
             raise e
+        self.logger.debug("Cache hit for key: %s", hashed_key)
+        self._track_access(hashed_key, file_path)
+        return value
+
+    def _get_many_hashed(self, hashed_keys: Iterable[str]) -> List[Optional[bytes]]:
+        """
+        Reads the stored data of several hashed keys, None where they are missing.
+        """
+        found = []
+        for hashed_key in hashed_keys:
+            data, file_path = self._read_hashed(hashed_key)
+            if data is not None:
+                self._track_access(hashed_key, file_path)
+            found.append(data)
+        return found
+
+    def _quarantine(self, file_path: str):
+        """
+        Move a corrupted entry out of the cache, keeping it for inspection.
+        """
+        os.makedirs(self.quarantine_dir, exist_ok=True)
+        quarantine_path = os.path.join(self.quarantine_dir, f"{os.path.basename(file_path)}.{int(time.time())}")
+        try:
+            os.replace(file_path, quarantine_path)
+        except FileNotFoundError:
+            pass
 
     def put(self, key: Any, value):
         """
         Store a value in the cache with the given key.
         """
         hashed_key = self._get_hashed_key(key)
-        self.logger.debug(f"Storing cache for key: {hashed_key}")
+        self.logger.debug("Storing cache for key: %s", hashed_key)
         file_path = self._cache_path(hashed_key)
         try:
-            with open(file_path, "w") as f:
-                json.dump(value, f)
-            self.logger.debug(f"Cache stored successfully for key: {hashed_key}")
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            atomic_write(file_path, self._encode_value(value), fsync=self.fsync)
+            self.logger.debug("Cache stored successfully for key: %s", hashed_key)
         except Exception as e:
             self.logger.error(f"Error storing cache for key {hashed_key}: {e}")
             raise e
+
+        if self.key_filter is not None:
+            self.key_filter.add(hashed_key)
+        if self.pin_current_run:
+            with self._access_lock:
+                self._pinned.add(hashed_key)
+        if self.eviction_policy is not None and self.eviction_policy.check_every:
+            self._puts_since_eviction += 1
+            if self._puts_since_eviction >= self.eviction_policy.check_every:
+                self.evict()
+
+    def delete(self, key: Any) -> bool:
+        """
+        Remove the entry of the given key.
+
+        Returns:
+            bool: Whether an entry was removed.
+        """
+        return self._delete_hashed(self._get_hashed_key(key))
+
+    def _delete_hashed(self, hashed_key: str) -> bool:
+        deleted = False
+        for file_path in {self._cache_path(hashed_key), self._flat_cache_path(hashed_key)}:
+            try:
+                os.remove(file_path)
+                deleted = True
+            except FileNotFoundError:
+                pass
+        with self._access_lock:
+            self._access_counts.pop(hashed_key, None)
+        return deleted
+
+    def _put_many_hashed(self, items: Iterable[Tuple[str, Union[bytes, str]]]) -> int:
+        """
+        Writes already hashed and serialized entries.
+
+        Returns:
+            int: The number of written entries.
+        """
+        written = 0
+        for hashed_key, data in items:
+            file_path = self._cache_path(hashed_key)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            atomic_write(file_path, data.encode("utf-8") if isinstance(data, str) else data, fsync=self.fsync)
+            if self.key_filter is not None:
+                self.key_filter.add(hashed_key)
+            written += 1
+        return written
+
+    def _delete_many_hashed(self, hashed_keys: Iterable[str]) -> int:
+        """
+        Deletes entries by hashed key.
+
+        Returns:
+            int: The number of deleted entries.
+        """
+        return sum(self._delete_hashed(hashed_key) for hashed_key in hashed_keys)
+
+    def _iter_hashed(self) -> Iterator[Tuple[str, bytes]]:
+        """
+        Iterates over the hashed keys and stored data of all the entries.
+        """
+        for dir_entry in iter_cache_files(self.cache_dir):
+            try:
+                with open(dir_entry.path, "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                continue
+            yield dir_entry.name[:-len(CACHE_FILE_SUFFIX)], data
+
+    def pin(self, key: Any):
+        """
+        Protect the entry of the given key from eviction by this process.
+        """
+        hashed_key = self._get_hashed_key(key)
+        with self._access_lock:
+            self._pinned.add(hashed_key)
+
+    def iter_entries(self) -> Iterator[CacheEntry]:
+        """
+        Iterate over the metadata of the stored entries.
+        """
+        for dir_entry in iter_cache_files(self.cache_dir):
+            try:
+                stat = dir_entry.stat()
+            except FileNotFoundError:
+                continue
+            yield CacheEntry(
+                hashed_key=dir_entry.name[:-len(CACHE_FILE_SUFFIX)],
+                size=stat.st_size,
+                created_at=stat.st_mtime,
+                accessed_at=max(stat.st_atime, stat.st_mtime),
+            )
+
+    def _load_access_counts(self) -> Dict[str, int]:
+        """
+        Merge the hit counts of this process with the ones saved by previous evictions.
+
+        The counts of this process are taken out under the lock, so the hits recorded
+        while the eviction runs are kept for the next one.
+        """
+        counts_path = os.path.join(self.cache_dir, ACCESS_COUNTS_FILE_NAME)
+        counts = {}
+        if os.path.exists(counts_path):
+            try:
+                with open(counts_path, "r") as f:
+                    counts = json.load(f)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Ignoring unreadable access counts {counts_path}: {e}")
+        with self._access_lock:
+            recent_counts, self._access_counts = self._access_counts, {}
+        for hashed_key, count in recent_counts.items():
+            counts[hashed_key] = counts.get(hashed_key, 0) + count
+        return counts
+
+    def _save_access_counts(self, counts: Dict[str, int]):
+        counts_path = os.path.join(self.cache_dir, ACCESS_COUNTS_FILE_NAME)
+        atomic_write(counts_path, json.dumps(counts).encode("utf-8"))
+
+    def evict(self) -> int:
+        """
+        Apply the eviction policy now.
+
+        Returns:
+            int: The number of evicted entries.
+        """
+        if self.eviction_policy is None:
+            return 0
+        with self._eviction_lock, file_lock(self.lock_path, blocking=False) as locked:
+            self._puts_since_eviction = 0
+            if not locked:
+                self.logger.debug(f"Another process is evicting entries of {self.cache_dir}")
+                return 0
+            use_counts = self.eviction_policy.strategy == "lfu"
+            counts = self._load_access_counts() if use_counts else None
+
+            with self._access_lock:
+                pinned = set(self._pinned)
+            evicted = self.eviction_policy.select(self.iter_entries(), pinned=pinned, access_counts=counts)
+            removed = 0
+            for entry in evicted:
+                if self._delete_hashed(entry.hashed_key):
+                    removed += 1
+                if counts is not None:
+                    counts.pop(entry.hashed_key, None)
+
+            if counts is not None:
+                self._save_access_counts(counts)
+        if removed:
+            self.logger.info(f"Evicted {removed} cache entries from {self.cache_dir}")
+        return removed
+
+    def _evict_periodically(self):
+        while not self._stop_event.wait(self.eviction_policy.interval):
+            try:
+                self.evict()
+            except Exception as e:
+                self.logger.error(f"Error evicting cache entries: {e}")
+
+    def close(self):
+        """
+        Stop the background eviction thread.
+        """
+        self._stop_event.set()
+        if self._eviction_thread is not None:
+            self._eviction_thread.join()
+            self._eviction_thread = None
@@ -0,0 +1,104 @@
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from llm_inference.cache.base import CacheEntry
+
+EVICTION_STRATEGIES = ("lru", "lfu")
+
+
+class EvictionPolicy:
+    """
+    Size and age limits of a cache, and the order in which entries are evicted to meet them.
+
+    Expired entries (older than `ttl`) are removed first. If the cache is still over
+    `max_bytes` or `max_entries`, the least recently used ("lru") or least frequently
+    used ("lfu") entries are removed until it is back under `low_watermark` of the limits.
+    Pinned entries are never evicted.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+        strategy: str = "lru",
+        check_every: Optional[int] = 1000,
+        interval: Optional[float] = None,
+        low_watermark: float = 0.9,
+    ):
+        """
+        Args:
+            max_bytes (int, optional): Maximum total size of the entries in bytes.
+            max_entries (int, optional): Maximum number of entries.
+            ttl (float, optional): Maximum age of an entry in seconds, since it was written.
+            strategy (str): "lru" or "lfu" (default: "lru").
+            check_every (int, optional): Run the eviction every `check_every` puts (default: 1000).
+            interval (float, optional): Also run the eviction in a background thread every
+                `interval` seconds.
+            low_watermark (float): Fraction of the limits to go down to when evicting (default: 0.9).
+        """
+        if strategy not in EVICTION_STRATEGIES:
+            raise ValueError(f"Unknown eviction strategy '{strategy}', expected one of {EVICTION_STRATEGIES}")
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.strategy = strategy
+        self.check_every = check_every
+        self.interval = interval
+        self.low_watermark = low_watermark
+
+    def select(
+        self,
+        entries: Iterable[CacheEntry],
+        pinned: Set[str] = frozenset(),
+        access_counts: Optional[Dict[str, int]] = None,
+        now: Optional[float] = None,
+    ) -> List[CacheEntry]:
+        """
+        Selects the entries to evict.
+
+        Args:
+            entries (Iterable[CacheEntry]): The entries of the cache.
+            pinned (Set[str]): Hashed keys that must be kept.
+            access_counts (Dict[str, int], optional): Hit counts per hashed key, used by "lfu".
+            now (float, optional): The current time (default: time.time()).
+
+        Returns:
+            List[CacheEntry]: The entries to delete.
+        """
+        now = time.time() if now is None else now
+        access_counts = access_counts or {}
+
+        evicted = []
+        kept = []
+        for entry in entries:
+            if self.ttl is not None and now - entry.created_at > self.ttl and entry.hashed_key not in pinned:
+                evicted.append(entry)
+            else:
+                kept.append(entry)
+
+        total_bytes = sum(entry.size for entry in kept)
+        total_entries = len(kept)
+        over_bytes = self.max_bytes is not None and total_bytes > self.max_bytes
+        over_entries = self.max_entries is not None and total_entries > self.max_entries
+        if not over_bytes and not over_entries:
+            return evicted
+
+        target_bytes = self.max_bytes * self.low_watermark if self.max_bytes is not None else None
+        target_entries = int(self.max_entries * self.low_watermark) if self.max_entries is not None else None
+
+        if self.strategy == "lfu":
+            order = lambda entry: (access_counts.get(entry.hashed_key, 0), entry.accessed_at)
+        else:
+            order = lambda entry: entry.accessed_at
+        candidates = sorted((entry for entry in kept if entry.hashed_key not in pinned), key=order)
+
+        for entry in candidates:
+            bytes_ok = target_bytes is None or total_bytes <= target_bytes
+            entries_ok = target_entries is None or total_entries <= target_entries
+            if bytes_ok and entries_ok:
+                break
+            evicted.append(entry)
+            total_bytes -= entry.size
+            total_entries -= 1
+        return evicted
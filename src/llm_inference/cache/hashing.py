@@ -0,0 +1,109 @@
+import hashlib
+import json
+import re
+from typing import Any, Iterable
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - optional dependency
+    xxhash = None
+
+# Tag prepended to the digests of each algorithm. SHA-256 digests are untagged, as in
+# keys built before other algorithms were supported, so existing entries keep matching.
+DIGEST_TAGS = {"sha256": "", "blake2b": "b2", "xxh3": "x3"}
+HASH_ALGORITHMS = tuple(DIGEST_TAGS)
+
+# Characters of hashed keys (digests, "ns-v1-" namespaces, "b2-"/"x3-" tags), which are
+# also file names of the disk storage.
+HASHED_KEY_PATTERN = re.compile(r"[A-Za-z0-9_.-]+")
+
+
+def canonical_json(data: Any) -> str:
+    """
+    Serializes data to a stable JSON string: sorted keys, no whitespace, unicode kept as is.
+
+    Args:
+        data (Any): JSON-serializable data.
+
+    Returns:
+        str: The canonical JSON string.
+    """
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class StreamingHasher:
+    """
+    Hashes canonical JSON fragment by fragment.
+
+    Large payloads (e.g. every request of a batch) are fed one item at a time, so no
+    serialization of the whole payload is ever held in memory. Feeding a list item by
+    item gives the same digest as hashing its canonical JSON at once.
+    """
+
+    def __init__(self, algorithm: str = "sha256"):
+        """
+        Args:
+            algorithm (str): "sha256", "blake2b" (128-bit) or "xxh3" (128-bit, optional `xxhash`
+                package, non-cryptographic and fastest) (default: "sha256").
+        """
+        if algorithm not in DIGEST_TAGS:
+            raise ValueError(f"Unknown hash algorithm '{algorithm}', expected one of {HASH_ALGORITHMS}")
+        if algorithm == "sha256":
+            self._hash = hashlib.sha256()
+        elif algorithm == "blake2b":
+            self._hash = hashlib.blake2b(digest_size=16)
+        else:
+            if xxhash is None:
+                raise ImportError("The 'xxh3' cache key hash requires the 'xxhash' package: pip install xxhash")
+            self._hash = xxhash.xxh3_128()
+        self.algorithm = algorithm
+
+    def update(self, text: str) -> "StreamingHasher":
+        """Feeds raw text, e.g. JSON punctuation between fragments."""
+        self._hash.update(text.encode("utf-8"))
+        return self
+
+    def update_json(self, data: Any) -> "StreamingHasher":
+        """Feeds the canonical JSON of a value."""
+        return self.update(canonical_json(data))
+
+    def update_json_list(self, items: Iterable[Any]) -> "StreamingHasher":
+        """Feeds the canonical JSON of a list, one item at a time."""
+        self.update("[")
+        for index, item in enumerate(items):
+            if index:
+                self.update(",")
+            self.update_json(item)
+        return self.update("]")
+
+    def hexdigest(self) -> str:
+        """Returns the digest, tagged with the algorithm unless it is SHA-256."""
+        tag = DIGEST_TAGS[self.algorithm]
+        digest = self._hash.hexdigest()
+        return f"{tag}-{digest}" if tag else digest
+
+
+def hash_json(data: Any, algorithm: str = "sha256") -> str:
+    """
+    Hashes the canonical JSON of a value, see `StreamingHasher`.
+    """
+    return StreamingHasher(algorithm).update_json(data).hexdigest()
+
+
+def validate_hashed_key(hashed_key: str) -> str:
+    """
+    Checks that a hashed key received from outside (the cache server, an import) is
+    a plain file name, so that it cannot point outside a cache directory.
+
+    Args:
+        hashed_key (str): The hashed key.
+
+    Returns:
+        str: The hashed key.
+
+    Raises:
+        ValueError: If the key holds other characters than letters, digits, "_", "." and "-", or "..".
+    """
+    if not isinstance(hashed_key, str) or not HASHED_KEY_PATTERN.fullmatch(hashed_key) or ".." in hashed_key:
+        raise ValueError(f"Invalid hashed cache key: {hashed_key!r}")
+    return hashed_key
@@ -0,0 +1,107 @@
+import re
+from typing import Iterable, List
+
+from llm_inference.cache.hashing import HASH_ALGORITHMS, StreamingHasher
+
+# Bump to invalidate every entry built with a previous key scheme.
+KEY_SCHEME_VERSION = 1
+
+NAMESPACE_PATTERN = re.compile(r"^[A-Za-z0-9_.]+$")
+
+
+class CacheKey(str):
+    """
+    A canonical cache key of the form "<namespace>:v<version>:<digest>".
+
+    Cache storages use `hashed` directly instead of hashing the key again, which keeps
+    the namespace and version readable in stored entries (e.g. for pruning).
+    """
+
+    def __new__(cls, namespace: str, version: int, digest: str):
+        key = super().__new__(cls, f"{namespace}:v{version}:{digest}")
+        key.namespace = namespace
+        key.version = version
+        key.digest = digest
+        return key
+
+    def __reduce__(self):
+        return CacheKey, (self.namespace, self.version, self.digest)
+
+    @property
+    def hashed(self) -> str:
+        """The file-name safe form of the key used by cache storages."""
+        return f"{self.namespace}-v{self.version}-{self.digest}"
+
+
+class CacheKeyBuilder:
+    """
+    Builds canonical cache keys covering the prompt, the model and its sampling parameters.
+
+    Two requests share a key only if the prompt and every model parameter are equal,
+    so one cache can safely serve several models and configurations.
+    """
+
+    def __init__(
+        self,
+        namespace: str = "llm",
+        version: int = KEY_SCHEME_VERSION,
+        ignored_params: Iterable[str] = (),
+        hash_algorithm: str = "sha256",
+    ):
+        """
+        Args:
+            namespace (str): Prefix of the keys, e.g. a project or a rule name (default: "llm").
+            version (int): Version of the keys, bump it to invalidate previous entries.
+            ignored_params (Iterable[str]): Model configuration keys that do not change the
+                response and must not be part of the key.
+            hash_algorithm (str): "sha256", "blake2b" or "xxh3", see `StreamingHasher` (default: "sha256").
+                The digests of other algorithms than SHA-256 are tagged, keys never collide across algorithms.
+        """
+        if not NAMESPACE_PATTERN.match(namespace):
+            raise ValueError(f"Invalid cache namespace '{namespace}', expected letters, digits, '_' or '.'")
+        if hash_algorithm not in HASH_ALGORITHMS:
+            raise ValueError(f"Unknown hash algorithm '{hash_algorithm}', expected one of {HASH_ALGORITHMS}")
+        self.namespace = namespace
+        self.version = version
+        self.ignored_params = set(ignored_params)
+        self.hash_algorithm = hash_algorithm
+
+    def _key_params(self, model_config: dict) -> dict:
+        return {key: value for key, value in model_config.items() if key not in self.ignored_params}
+
+    def _make_key(self, hasher: StreamingHasher) -> CacheKey:
+        return CacheKey(self.namespace, self.version, hasher.hexdigest())
+
+    def build(self, prompt: str, model_config: dict) -> CacheKey:
+        """
+        Builds the key of a single request.
+
+        Args:
+            prompt (str): The input prompt.
+            model_config (dict): A dictionary containing model parameters and settings.
+
+        Returns:
+            CacheKey: The cache key.
+        """
+        hasher = StreamingHasher(self.hash_algorithm)
+        hasher.update_json({"model_config": self._key_params(model_config), "prompt": prompt})
+        return self._make_key(hasher)
+
+    def build_batch(self, batch_data: List[dict], model_config: dict) -> CacheKey:
+        """
+        Builds the key of a whole batch job.
+
+        Requests are hashed one at a time, as fragments of the canonical JSON of
+        `{"batch": batch_data, "model_config": ...}`, without serializing the batch.
+
+        Args:
+            batch_data (List[dict]): The batch requests.
+            model_config (dict): A dictionary containing model parameters and settings.
+
+        Returns:
+            CacheKey: The cache key.
+        """
+        hasher = StreamingHasher(self.hash_algorithm)
+        hasher.update('{"batch":').update_json_list(batch_data)
+        hasher.update(',"model_config":').update_json(self._key_params(model_config)).update("}")
+        return self._make_key(hasher)
@@ -0,0 +1,270 @@
+import contextlib
+import math
+import os
+import threading
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import lmdb
+except ImportError:  # pragma: no cover - optional dependency
+    lmdb = None
+
+from llm_inference.cache.base import AbstractCacheStorage, CacheEntry
+from llm_inference.cache.codec import ValueCodec
+from llm_inference.settings import CACHE_DIR
+
+DEFAULT_MAP_SIZE = 8 * 1024 ** 3  # 8 GiB, the file grows sparsely up to this size.
+
+
+class _ResizeLock:
+    """
+    Read/write lock between the transactions of a process and the resizes of the map.
+
+    Transactions run concurrently, a resize waits until none is active and blocks new
+    ones while it runs: LMDB requires that no transaction of the process is active when
+    the map size changes.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._transactions = 0
+        self._resizing = False
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self._condition:
+            while self._resizing:
+                self._condition.wait()
+            self._transactions += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._transactions -= 1
+                if not self._transactions:
+                    self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def resize(self) -> Iterator[None]:
+        with self._condition:
+            while self._resizing or self._transactions:
+                self._condition.wait()
+            self._resizing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._resizing = False
+                self._condition.notify_all()
+
+
+class LmdbCacheStorage(AbstractCacheStorage):
+    """
+    Memory-mapped cache storage implementation backed by LMDB.
+
+    Reads are served from the shared memory map without filesystem calls, so many
+    processes (e.g. Snakemake workers) can read the same cache concurrently; values are
+    decoded straight from the map, without copying them first. LMDB allows a single
+    writer at a time, other writers wait for its transaction to end. A map grown by
+    another process is adopted at the next transaction. The map is only resized once
+    the transactions of the other threads ended.
+
+    Requires the optional `lmdb` package.
+    """
+
+    def __init__(
+        self,
+        subdir: str = None,
+        path: str = None,
+        map_size: int = DEFAULT_MAP_SIZE,
+        readonly: bool = False,
+        max_readers: int = 256,
+        codec: Optional[ValueCodec] = None,
+    ):
+        """
+        Initialize the LmdbCacheStorage.
+
+        Args:
+            subdir (str, optional): Subdirectory of CACHE_DIR holding the LMDB environment.
+            path (str, optional): Explicit directory of the LMDB environment, overrides `subdir`.
+            map_size (int): Maximum size of the memory map in bytes, doubled when full.
+            readonly (bool): Open the environment read-only (default: False).
+            max_readers (int): Maximum number of concurrent read transactions (default: 256).
+            codec (ValueCodec, optional): Projects and compresses the stored values.
+        """
+        if lmdb is None:
+            raise ImportError("LmdbCacheStorage requires the 'lmdb' package: pip install lmdb")
+
+        self.path = path or os.path.join(CACHE_DIR, subdir or "", "lmdb")
+        self.map_size = map_size
+        self.readonly = readonly
+        self.max_readers = max_readers
+        self.codec = codec
+        if not readonly:
+            os.makedirs(self.path, exist_ok=True)
+
+        self._env = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._resize_lock = _ResizeLock()
+
+    @property
+    def env(self) -> "lmdb.Environment":
+        """The LMDB environment, reopened after a fork since it cannot be shared across processes."""
+        if self._env is None or self._pid != os.getpid():
+            with self._lock:
+                if self._env is None or self._pid != os.getpid():
+                    self._env = lmdb.open(
+                        self.path,
+                        map_size=self.map_size,
+                        readonly=self.readonly,
+                        max_readers=self.max_readers,
+                        readahead=False,
+                        metasync=False,
+                        lock=True,
+                    )
+                    self._pid = os.getpid()
+        return self._env
+
+    @contextlib.contextmanager
+    def _begin(self, write: bool = False, buffers: bool = False) -> Iterator["lmdb.Transaction"]:
+        """
+        Runs a transaction, adopting the map size first if another process grew the map.
+        """
+        while True:
+            with self._resize_lock.transaction():
+                try:
+                    txn = self.env.begin(write=write, buffers=buffers)
+                except lmdb.MapResizedError:
+                    pass
+                else:
+                    with txn:
+                        yield txn
+                    return
+            with self._resize_lock.resize():
+                self.env.set_mapsize(0)
+
+    def get(self, key: Any):
+        """
+        Retrieve a cached value using the given key.
+        """
+        hashed_key = self._get_hashed_key(key)
+        # The buffer points into the map, it is only valid until the transaction ends.
+        with self._begin(buffers=True) as txn:
+            buffer = txn.get(hashed_key.encode("utf-8"))
+            if buffer is None:
+                return None
+            return self._decode_value(buffer)
+
+    def _get_many_hashed(self, hashed_keys: Iterable[str]) -> List[Optional[bytes]]:
+        """
+        Reads the stored data of several hashed keys in a single read transaction, None where they are missing.
+        """
+        with self._begin() as txn:
+            return [txn.get(hashed_key.encode("utf-8")) for hashed_key in hashed_keys]
+
+    def get_many(self, keys: Sequence[Any]) -> List[Any]:
+        """
+        Retrieve the cached values of several keys in a single read transaction.
+        """
+        hashed_keys = [self._get_hashed_key(key).encode("utf-8") for key in keys]
+        with self._begin(buffers=True) as txn:
+            buffers = (txn.get(hashed_key) for hashed_key in hashed_keys)
+            return [self._decode_value(buffer) if buffer is not None else None for buffer in buffers]
+
+    def put(self, key: Any, value):
+        """
+        Store a value in the cache with the given key.
+        """
+        hashed_key = self._get_hashed_key(key)
+        self.logger.debug("Storing cache for key: %s", hashed_key)
+        value_bytes = self._encode_value(value)
+        try:
+            self._write(hashed_key.encode("utf-8"), value_bytes)
+        except Exception as e:
+            self.logger.error(f"Error storing cache for key {hashed_key}: {e}")
+            raise e
+
+    def put_many(self, items: Iterable[Tuple[Any, Any]]):
+        """
+        Store several values in a single write transaction.
+        """
+        rows = [(self._get_hashed_key(key).encode("utf-8"), self._encode_value(value)) for key, value in items]
+        try:
+            self._write_many(rows)
+        except Exception as e:
+            self.logger.error(f"Error storing {len(rows)} cache entries: {e}")
+            raise e
+
+    def _write(self, key_bytes: bytes, value_bytes: bytes):
+        self._write_many([(key_bytes, value_bytes)])
+
+    def _write_many(self, rows: List[Tuple[bytes, bytes]]):
+        try:
+            with self._begin(write=True) as txn:
+                for key_bytes, value_bytes in rows:
+                    txn.put(key_bytes, value_bytes)
+        except lmdb.MapFullError:
+            full_map_size = self.env.info()["map_size"]
+            with self._resize_lock.resize():
+                # Another thread may have grown the map while this one waited.
+                if self.env.info()["map_size"] == full_map_size:
+                    self.logger.info(f"LMDB map full, growing it to {full_map_size * 2} bytes")
+                    self.env.set_mapsize(full_map_size * 2)
+            self._write_many(rows)
+
+    def _put_many_hashed(self, items: Iterable[Tuple[str, bytes]]) -> int:
+        """
+        Writes already hashed and serialized entries in a single transaction.
+
+        Returns:
+            int: The number of written entries.
+        """
+        rows = [(hashed_key.encode("utf-8"), bytes(data)) for hashed_key, data in items]
+        if rows:
+            self._write_many(rows)
+        return len(rows)
+
+    def _delete_many_hashed(self, hashed_keys: Iterable[str]) -> int:
+        """
+        Deletes entries by hashed key.
+
+        Returns:
+            int: The number of deleted entries.
+        """
+        with self._begin(write=True) as txn:
+            return sum(txn.delete(hashed_key.encode("utf-8")) for hashed_key in hashed_keys)
+
+    def _iter_hashed(self) -> Iterator[Tuple[str, bytes]]:
+        """
+        Iterates over the hashed keys and stored data of all the entries.
+        """
+        with self._begin() as txn:
+            for key_bytes, value_bytes in txn.cursor():
+                yield key_bytes.decode("utf-8"), bytes(value_bytes)
+
+    def iter_entries(self) -> Iterator[CacheEntry]:
+        """
+        Iterate over the metadata of the stored entries.
+        LMDB does not record when entries were written, their times are NaN.
+        """
+        with self._begin() as txn:
+            for key_bytes, value_bytes in txn.cursor():
+                yield CacheEntry(hashed_key=key_bytes.decode("utf-8"), size=len(value_bytes), created_at=math.nan, accessed_at=math.nan)
+
+    def __len__(self) -> int:
+        return self.env.stat()["entries"]
+
+    def close(self):
+        """
+        Close the LMDB environment.
+        """
+        if self._env is not None:
+            self._env.close()
+            self._env = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
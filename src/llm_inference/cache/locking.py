@@ -0,0 +1,71 @@
+import contextlib
+import os
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+LOCK_FILE_NAME = ".lock"
+
+
+@contextlib.contextmanager
+def file_lock(lock_path: str, blocking: bool = True) -> Iterator[bool]:
+    """
+    Holds an exclusive advisory lock on a file, shared by all the processes using it.
+
+    Only cooperating processes are excluded: plain reads and atomic writes of cache
+    entries do not take the lock, compound operations (eviction, migration, updates of
+    shared metadata files) do. On platforms without `fcntl` the lock is a no-op.
+
+    Args:
+        lock_path (str): The lock file, created if needed.
+        blocking (bool): Wait for the lock, otherwise give up if another process holds it.
+
+    Yields:
+        bool: Whether the lock is held.
+    """
+    if fcntl is None:
+        yield True
+        return
+
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(file_path: str, data: bytes, fsync: bool = False):
+    """
+    Writes a file atomically: readers see either the previous content or the new one,
+    never a partial write, even if the writer is killed or another process writes
+    the same file concurrently.
+
+    Args:
+        file_path (str): The destination file.
+        data (bytes): The content to write.
+        fsync (bool): Flush the data to the disk before renaming (default: False).
+    """
+    directory, name = os.path.split(file_path)
+    tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.{os.urandom(4).hex()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,80 @@
+import argparse
+import logging
+from typing import Iterator, Tuple
+
+from llm_inference.cache.codec import decode_value, is_compressed
+from llm_inference.cache.disk import CACHE_FILE_SUFFIX, iter_cache_files
+from llm_inference.cache.sqlite import SqliteCacheStorage
+
+logger = logging.getLogger(__name__)
+
+
+def iter_disk_cache_entries(cache_dir: str) -> Iterator[Tuple[str, bytes]]:
+    """
+    Iterates over the entries of a file-based cache directory (`DiskCacheStorage`, `TmpCacheStorage`),
+    in the flat or in the sharded layout.
+
+    Corrupted entries are skipped with a warning. Compressed entries are passed through
+    as is, since they may need the dictionary of their codec to be decoded.
+
+    Args:
+        cache_dir (str): The cache directory.
+
+    Yields:
+        Tuple[str, bytes]: The hashed key and the stored data of each entry.
+    """
+    for entry in iter_cache_files(cache_dir):
+        hashed_key = entry.name[:-len(CACHE_FILE_SUFFIX)]
+        try:
+            with open(entry.path, "rb") as f:
+                data = f.read()
+            if not is_compressed(data):
+                decode_value(data)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping corrupted cache entry {entry.path}: {e}")
+            continue
+        yield hashed_key, data
+
+
+def import_disk_cache(cache_dir: str, storage: SqliteCacheStorage, batch_size: int = 1000) -> int:
+    """
+    Imports the entries of a file-based cache directory into a SQLite cache storage.
+
+    Hashed keys are kept as is, so lookups with the original keys keep hitting.
+
+    Args:
+        cache_dir (str): The cache directory to import.
+        storage (SqliteCacheStorage): The destination storage.
+        batch_size (int): Number of entries written per transaction (default: 1000).
+
+    Returns:
+        int: The number of imported entries.
+    """
+    imported = 0
+    batch = []
+    for item in iter_disk_cache_entries(cache_dir):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            imported += storage._put_many_hashed(batch)
+            batch = []
+            logger.info(f"Imported {imported} cache entries")
+    imported += storage._put_many_hashed(batch)
+    logger.info(f"Imported {imported} cache entries from {cache_dir} into {storage.db_path}")
+    return imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import a .cache directory into a SQLite cache database.")
+    parser.add_argument("cache_dir", help="Directory holding <hash>.cache files")
+    parser.add_argument("db_path", help="Path of the SQLite database file")
+    parser.add_argument("--batch_size", type=int, default=1000, help="Entries written per transaction")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    with SqliteCacheStorage(db_path=args.db_path) as storage:
+        imported = import_disk_cache(args.cache_dir, storage, batch_size=args.batch_size)
+    print(f"Imported {imported} cache entries into {args.db_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from llm_inference.cache.base import AbstractCacheStorage, CacheEntry
+from llm_inference.cache.codec import ValueCodec
+from llm_inference.cache.locking import atomic_write
+
+PACK_MAGIC = b"LLMPACK1"
+INDEX_MAGIC = b"LLMIDX01"
+PACK_SUFFIX = ".pack"
+INDEX_SUFFIX = ".idx"
+DIGEST_SIZE = 32
+INDEX_HEADER = struct.Struct("<8sQ")  # magic, number of entries
+FANOUT = struct.Struct("<256Q")  # number of entries whose digest starts with a byte <= i
+INDEX_RECORD = struct.Struct(f"<{DIGEST_SIZE}sQI")  # digest of the hashed key, offset, length
+ENTRY_HEADER = struct.Struct("<H")  # length of the hashed key, followed by the key and the stored data
+INDEX_RECORDS_START = INDEX_HEADER.size + FANOUT.size
+
+
+def key_digest(hashed_key: str) -> bytes:
+    """The content address of an entry: the SHA-256 digest of its hashed key."""
+    return hashlib.sha256(hashed_key.encode("utf-8")).digest()
+
+
+def pack_paths(path: str) -> Tuple[str, str]:
+    """Returns the data and index files of a pack, given either of them or their common stem."""
+    for suffix in (PACK_SUFFIX, INDEX_SUFFIX):
+        if path.endswith(suffix):
+            path = path[:-len(suffix)]
+    return f"{path}{PACK_SUFFIX}", f"{path}{INDEX_SUFFIX}"
+
+
+class PackReader:
+    """
+    Read-only, memory-mapped access to a pack.
+
+    A pack is an append-only data file of entries (hashed key and stored data), and an
+    index of fixed-size records sorted by key digest, with a 256-entry fan-out table to
+    start the binary search. Lookups read a few index pages and one entry from the page
+    cache, whatever the number of entries.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): The pack, as its data file, its index file or their common stem.
+        """
+        self.data_path, self.index_path = pack_paths(path)
+        with open(self.index_path, "rb") as f:
+            self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(self.data_path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count = INDEX_HEADER.unpack_from(self._index)
+        if magic != INDEX_MAGIC or self._data[:len(PACK_MAGIC)] != PACK_MAGIC:
+            raise ValueError(f"Not a cache pack: {path}")
+        self._fanout = FANOUT.unpack_from(self._index, INDEX_HEADER.size)
+
+    def _record(self, position: int) -> Tuple[bytes, int, int]:
+        return INDEX_RECORD.unpack_from(self._index, INDEX_RECORDS_START + position * INDEX_RECORD.size)
+
+    def _digest_at(self, position: int) -> bytes:
+        start = INDEX_RECORDS_START + position * INDEX_RECORD.size
+        return self._index[start:start + DIGEST_SIZE]
+
+    def _read_entry(self, offset: int, length: int) -> Tuple[str, bytes]:
+        (key_length,) = ENTRY_HEADER.unpack_from(self._data, offset)
+        start = offset + ENTRY_HEADER.size
+        hashed_key = self._data[start:start + key_length].decode("utf-8")
+        return hashed_key, self._data[start + key_length:offset + length]
+
+    def find(self, hashed_key: str) -> Optional[bytes]:
+        """
+        Returns the stored data of a hashed key, or None if the pack does not hold it.
+        """
+        digest = key_digest(hashed_key)
+        low = self._fanout[digest[0] - 1] if digest[0] else 0
+        high = self._fanout[digest[0]]
+        while low < high:
+            middle = (low + high) // 2
+            if self._digest_at(middle) < digest:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._fanout[digest[0]] and self._digest_at(low) == digest:
+            _, offset, length = self._record(low)
+            stored_key, data = self._read_entry(offset, length)
+            if stored_key == hashed_key:
+                return data
+        return None
+
+    def __contains__(self, hashed_key: str) -> bool:
+        return self.find(hashed_key) is not None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def iter_records(self) -> Iterator[Tuple[bytes, int, int]]:
+        """Iterates over the (digest, offset, length) index records, sorted by digest."""
+        for position in range(self.count):
+            yield self._record(position)
+
+    def iter_entries(self) -> Iterator[Tuple[str, bytes]]:
+        """Iterates over the (hashed key, stored data) entries, sorted by digest."""
+        for _, offset, length in self.iter_records():
+            yield self._read_entry(offset, length)
+
+    def iter_keys(self) -> Iterator[Tuple[str, int]]:
+        """Iterates over the (hashed key, entry length) pairs, without reading the stored data."""
+        for _, offset, length in self.iter_records():
+            (key_length,) = ENTRY_HEADER.unpack_from(self._data, offset)
+            start = offset + ENTRY_HEADER.size
+            yield self._data[start:start + key_length].decode("utf-8"), length
+
+    def close(self):
+        self._index.close()
+        self._data.close()
+
+
+class PackWriter:
+    """
+    Writes entries to a pack, appending to it if it exists.
+
+    Entries are identified by the digest of their hashed key: an entry already in the
+    pack is not written again. The data is appended first and the index is replaced
+    atomically by `close`, so readers of the previous index keep working meanwhile.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): The pack, as its data file, its index file or their common stem.
+        """
+        self.data_path, self.index_path = pack_paths(path)
+        self._records: Dict[bytes, Tuple[int, int]] = {}
+        if os.path.exists(self.index_path) and os.path.exists(self.data_path):
+            reader = PackReader(self.data_path)
+            self._records = {digest: (offset, length) for digest, offset, length in reader.iter_records()}
+            data_size = max((offset + length for offset, length in self._records.values()), default=len(PACK_MAGIC))
+            reader.close()
+            self._file = open(self.data_path, "r+b")
+            # Drop the data of an interrupted append, never referenced by the index.
+            self._file.truncate(data_size)
+            self._file.seek(data_size)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(self.data_path)), exist_ok=True)
+            self._file = open(self.data_path, "wb")
+            self._file.write(PACK_MAGIC)
+        self.added = 0
+
+    def add(self, hashed_key: str, data: Union[bytes, str]) -> bool:
+        """
+        Appends an entry, unless the pack already holds its key.
+
+        Returns:
+            bool: Whether the entry was added.
+        """
+        digest = key_digest(hashed_key)
+        if digest in self._records:
+            return False
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        encoded_key = hashed_key.encode("utf-8")
+        entry = ENTRY_HEADER.pack(len(encoded_key)) + encoded_key + data
+        offset = self._file.tell()
+        self._file.write(entry)
+        self._records[digest] = (offset, len(entry))
+        self.added += 1
+        return True
+
+    def close(self):
+        """
+        Flushes the data and writes the sorted index.
+        """
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+        digests = sorted(self._records)
+        fanout = [0] * 256
+        for digest in digests:
+            fanout[digest[0]] += 1
+        for i in range(1, 256):
+            fanout[i] += fanout[i - 1]
+        parts = [INDEX_HEADER.pack(INDEX_MAGIC, len(digests)), FANOUT.pack(*fanout)]
+        parts.extend(INDEX_RECORD.pack(digest, *self._records[digest]) for digest in digests)
+        atomic_write(self.index_path, b"".join(parts), fsync=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def write_pack(items: Iterable[Tuple[str, Union[bytes, str]]], path: str) -> int:
+    """
+    Writes stored entries to a pack, appending to it if it exists.
+
+    Args:
+        items (Iterable[Tuple[str, bytes | str]]): Pairs of hashed key and stored data,
+            e.g. `storage._iter_hashed()` of another storage.
+        path (str): The pack.
+
+    Returns:
+        int: The number of added entries.
+    """
+    with PackWriter(path) as writer:
+        for hashed_key, data in items:
+            writer.add(hashed_key, data)
+    return writer.added
+
+
+class PackCacheStorage(AbstractCacheStorage):
+    """
+    Cache storage serving read-only packs, next to a writable local storage.
+
+    Lookups check the memory-mapped packs first, then the local storage; writes go to
+    the local storage. Packs are single files that can be versioned with DVC and shared
+    across machines, so a run starts with a warm cache without unpacking anything.
+    """
+
+    def __init__(
+        self,
+        packs: Sequence[str],
+        local_storage: Optional[AbstractCacheStorage] = None,
+        codec: Optional[ValueCodec] = None,
+    ):
+        """
+        Initialize the PackCacheStorage.
+
+        Args:
+            packs (Sequence[str]): The packs, as data files, index files or common stems.
+                Missing packs (e.g. not pulled yet) are skipped with a warning.
+            local_storage (AbstractCacheStorage, optional): The storage of new entries,
+                without it the storage is read-only.
+            codec (ValueCodec, optional): Decodes the packed entries (e.g. with a zstd dictionary).
+        """
+        self.local_storage = local_storage
+        self.codec = codec
+        self.readers: List[PackReader] = []
+        for path in packs:
+            if not os.path.exists(pack_paths(path)[1]):
+                self.logger.warning(f"Cache pack {path} not found, skipping it")
+                continue
+            self.readers.append(PackReader(path))
+
+    def _find(self, hashed_key: str) -> Optional[bytes]:
+        for reader in self.readers:
+            data = reader.find(hashed_key)
+            if data is not None:
+                return data
+        return None
+
+    def get(self, key: Any):
+        """
+        Retrieve a cached value from the packs, or from the local storage.
+        """
+        data = self._find(self._get_hashed_key(key))
+        if data is not None:
+            return self._decode_value(data)
+        if self.local_storage is not None:
+            return self.local_storage.get(key)
+        return None
+
+    def get_many(self, keys: Sequence[Any]) -> List[Any]:
+        """
+        Retrieve several cached values, the packs misses in one local bulk lookup.
+        """
+        values = [None] * len(keys)
+        missing = []
+        for index, key in enumerate(keys):
+            data = self._find(self._get_hashed_key(key))
+            if data is None:
+                missing.append(index)
+            else:
+                values[index] = self._decode_value(data)
+        if missing and self.local_storage is not None:
+            for index, value in zip(missing, self.local_storage.get_many([keys[index] for index in missing])):
+                values[index] = value
+        return values
+
+    def _get_many_hashed(self, hashed_keys: Iterable[str]) -> List[Optional[bytes]]:
+        """
+        Reads the stored data of several hashed keys from the packs, or from the local storage.
+        """
+        hashed_keys = list(hashed_keys)
+        found = [self._find(hashed_key) for hashed_key in hashed_keys]
+        missing = [index for index, data in enumerate(found) if data is None]
+        if missing and hasattr(self.local_storage, "_get_many_hashed"):
+            local_found = self.local_storage._get_many_hashed([hashed_keys[index] for index in missing])
+            for index, data in zip(missing, local_found):
+                found[index] = data
+        return found
+
+    def put(self, key: Any, value):
+        """
+        Store a value in the local storage.
+        """
+        if self.local_storage is None:
+            raise RuntimeError("PackCacheStorage without a local storage is read-only")
+        self.local_storage.put(key, value)
+
+    def put_many(self, items: Iterable[Tuple[Any, Any]]):
+        """
+        Store several values in the local storage.
+        """
+        if self.local_storage is None:
+            raise RuntimeError("PackCacheStorage without a local storage is read-only")
+        self.local_storage.put_many(items)
+
+    def _put_many_hashed(self, items: Iterable[Tuple[str, Union[bytes, str]]]) -> int:
+        """
+        Writes already hashed and serialized entries to the local storage.
+
+        Returns:
+            int: The number of written entries.
+        """
+        if not hasattr(self.local_storage, "_put_many_hashed"):
+            raise RuntimeError("PackCacheStorage without a local storage is read-only")
+        return self.local_storage._put_many_hashed(items)
+
+    def _iter_hashed(self) -> Iterator[Tuple[str, Any]]:
+        """Iterates over the stored entries of the packs, then of the local storage."""
+        seen = set()
+        for reader in self.readers:
+            for hashed_key, data in reader.iter_entries():
+                if hashed_key not in seen:
+                    seen.add(hashed_key)
+                    yield hashed_key, data
+        if hasattr(self.local_storage, "_iter_hashed"):
+            for hashed_key, data in self.local_storage._iter_hashed():
+                if hashed_key not in seen:
+                    yield hashed_key, data
+
+    def iter_entries(self) -> Iterator[CacheEntry]:
+        """
+        Iterate over the metadata of the entries of the packs, then of the local storage.
+        Packs do not record when entries were written, their times are NaN.
+        """
+        seen = set()
+        for reader in self.readers:
+            for hashed_key, length in reader.iter_keys():
+                if hashed_key not in seen:
+                    seen.add(hashed_key)
+                    yield CacheEntry(hashed_key=hashed_key, size=length, created_at=math.nan, accessed_at=math.nan)
+        if hasattr(self.local_storage, "iter_entries"):
+            for entry in self.local_storage.iter_entries():
+                if entry.hashed_key not in seen:
+                    yield entry
+
+    def flush(self):
+        if hasattr(self.local_storage, "flush"):
+            self.local_storage.flush()
+
+    def close(self):
+        """
+        Unmap the packs and close the local storage.
+        """
+        for reader in self.readers:
+            reader.close()
+        self.readers = []
+        if hasattr(self.local_storage, "close"):
+            self.local_storage.close()
@@ -0,0 +1,257 @@
+import http.client
+import os
+import struct
+import threading
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlsplit
+
+from llm_inference.cache.base import AbstractCacheStorage
+from llm_inference.cache.codec import ValueCodec
+
+# Wire format shared with `llm_inference.cache.server`.
+# POST /get: the hashed keys, one per line; the response holds a value frame per key.
+# POST /put: an entry frame per entry; the response is the number of written entries.
+VALUE_LENGTH = struct.Struct("<I")
+MISSING_VALUE = 0xFFFFFFFF
+KEY_LENGTH = struct.Struct("<H")
+
+
+def encode_values(values: Iterable[Union[bytes, str, None]]) -> bytes:
+    """Frames stored data, or None for missing entries, as length-prefixed values."""
+    parts = []
+    for data in values:
+        if data is None:
+            parts.append(VALUE_LENGTH.pack(MISSING_VALUE))
+            continue
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        parts.append(VALUE_LENGTH.pack(len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def _read_frame(body: bytes, offset: int, length_struct: struct.Struct) -> Tuple[Optional[bytes], int]:
+    """Reads one length-prefixed frame, raising ValueError if the body is truncated."""
+    if offset + length_struct.size > len(body):
+        raise ValueError(f"Truncated frame length at byte {offset}")
+    (length,) = length_struct.unpack_from(body, offset)
+    offset += length_struct.size
+    if length_struct is VALUE_LENGTH and length == MISSING_VALUE:
+        return None, offset
+    if offset + length > len(body):
+        raise ValueError(f"Truncated frame at byte {offset}, expected {length} bytes")
+    return body[offset:offset + length], offset + length
+
+
+def decode_values(body: bytes) -> List[Optional[bytes]]:
+    """Reads the values framed by `encode_values`, raising ValueError on a malformed body."""
+    values = []
+    offset = 0
+    while offset < len(body):
+        data, offset = _read_frame(body, offset, VALUE_LENGTH)
+        values.append(data)
+    return values
+
+
+def encode_entries(items: Iterable[Tuple[str, Union[bytes, str]]]) -> bytes:
+    """Frames pairs of hashed key and stored data."""
+    parts = []
+    for hashed_key, data in items:
+        encoded_key = hashed_key.encode("utf-8")
+        parts.append(KEY_LENGTH.pack(len(encoded_key)))
+        parts.append(encoded_key)
+        parts.append(encode_values([data]))
+    return b"".join(parts)
+
+
+def decode_entries(body: bytes) -> List[Tuple[str, bytes]]:
+    """Reads the entries framed by `encode_entries`, raising ValueError on a malformed body."""
+    entries = []
+    offset = 0
+    while offset < len(body):
+        encoded_key, offset = _read_frame(body, offset, KEY_LENGTH)
+        data, offset = _read_frame(body, offset, VALUE_LENGTH)
+        if data is None:
+            raise ValueError(f"Missing value for the entry ending at byte {offset}")
+        entries.append((encoded_key.decode("utf-8"), data))
+    return entries
+
+
+class RemoteCacheStorage(AbstractCacheStorage):
+    """
+    Client of a shared cache server (see `llm_inference.cache.server`).
+
+    Several workers or nodes pointing at the same server share their entries, so a
+    prompt answered by one of them is never sent to the API again. Lookups and writes
+    are batched, each thread keeps its HTTP connection open, and an optional local
+    storage serves as a read-through tier: it is checked first, and remote hits and
+    new entries are written to it.
+
+    The cache is an optimization: when the server is unreachable, lookups are misses
+    and writes only reach the local storage, with a warning.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        local_storage: Optional[AbstractCacheStorage] = None,
+        codec: Optional[ValueCodec] = None,
+        timeout: float = 30.0,
+        batch_size: int = 500,
+        token: Optional[str] = None,
+    ):
+        """
+        Initialize the RemoteCacheStorage.
+
+        Args:
+            url (str): The URL of the cache server, e.g. "http://cache-node:8765".
+            local_storage (AbstractCacheStorage, optional): The read-through local tier.
+            codec (ValueCodec, optional): Projects and compresses the values sent to the server.
+            timeout (float): Seconds to wait for the server (default: 30).
+            batch_size (int): Maximum number of entries per request (default: 500).
+            token (str, optional): The token of the server (default: the LLM_CACHE_TOKEN environment variable).
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Invalid cache server URL: {url}")
+        self.url = url
+        self.local_storage = local_storage
+        self.codec = codec
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self._headers = {"Content-Type": "application/octet-stream"}
+        token = token if token is not None else os.getenv("LLM_CACHE_TOKEN")
+        if token:
+            self._headers["Authorization"] = f"Bearer {token}"
+        self._scheme = parts.scheme
+        self._host = parts.hostname
+        self._port = parts.port
+        self._path = parts.path.rstrip("/")
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection_class = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+            connection = connection_class(self._host, self._port, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+    def _close_connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _request(self, path: str, body: bytes) -> bytes:
+        """
+        Sends a POST request on the connection of the thread, reconnecting once if the
+        server closed it in the meantime.
+        """
+        for attempt in range(2):
+            try:
+                connection = self._connection()
+                connection.request("POST", f"{self._path}{path}", body=body, headers=self._headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, ConnectionError):
+                self._close_connection()
+                if attempt:
+                    raise
+                continue
+            if response.status != 200:
+                raise http.client.HTTPException(f"Cache server error {response.status}: {data[:200]!r}")
+            return data
+
+    def _get_many_hashed(self, hashed_keys: Sequence[str]) -> List[Optional[bytes]]:
+        """
+        Reads the stored data of several hashed keys from the server, in batches.
+        """
+        found = []
+        for start in range(0, len(hashed_keys), self.batch_size):
+            chunk = hashed_keys[start:start + self.batch_size]
+            found.extend(decode_values(self._request("/get", "\n".join(chunk).encode("utf-8"))))
+        return found
+
+    def _put_many_hashed(self, items: Iterable[Tuple[str, Union[bytes, str]]]) -> int:
+        """
+        Writes already hashed and serialized entries to the server, in batches.
+
+        Returns:
+            int: The number of written entries.
+        """
+        items = list(items)
+        written = 0
+        for start in range(0, len(items), self.batch_size):
+            written += int(self._request("/put", encode_entries(items[start:start + self.batch_size])))
+        return written
+
+    def get(self, key: Any):
+        """
+        Retrieve a cached value from the local tier, or from the server.
+        """
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Sequence[Any]) -> List[Any]:
+        """
+        Retrieve several cached values, the local misses in batched server requests.
+        """
+        if self.local_storage is not None:
+            values = self.local_storage.get_many(keys)
+        else:
+            values = [None] * len(keys)
+        missing = [index for index, value in enumerate(values) if value is None]
+        if not missing:
+            return values
+
+        hashed_keys = [self._get_hashed_key(keys[index]) for index in missing]
+        try:
+            found = self._get_many_hashed(hashed_keys)
+        except (http.client.HTTPException, OSError) as e:
+            self.logger.warning(f"Cache server {self.url} unavailable, treating {len(missing)} lookups as misses: {e}")
+            return values
+
+        remote_hits = []
+        for index, data in zip(missing, found):
+            if data is None:
+                continue
+            try:
+                values[index] = self._decode_value(data)
+            except ValueError as e:
+                self.logger.warning(f"Corrupted cache entry from {self.url}, ignoring it: {e}")
+                continue
+            remote_hits.append((keys[index], values[index]))
+        self.logger.debug("Found %d/%d keys on %s", len(remote_hits), len(missing), self.url)
+        if remote_hits and self.local_storage is not None:
+            self.local_storage.put_many(remote_hits)
+        return values
+
+    def put(self, key: Any, value):
+        """
+        Store a value on the server and in the local tier.
+        """
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[Any, Any]]):
+        """
+        Store several values on the server, in batches, and in the local tier.
+        """
+        items = list(items)
+        if self.local_storage is not None:
+            self.local_storage.put_many(items)
+        try:
+            self._put_many_hashed([(self._get_hashed_key(key), self._encode_value(value)) for key, value in items])
+        except (http.client.HTTPException, OSError) as e:
+            self.logger.warning(f"Cache server {self.url} unavailable, {len(items)} entries not shared: {e}")
+
+    def flush(self):
+        if hasattr(self.local_storage, "flush"):
+            self.local_storage.flush()
+
+    def close(self):
+        """
+        Close the connection of this thread and the local tier.
+        """
+        self._close_connection()
+        if hasattr(self.local_storage, "close"):
+            self.local_storage.close()
@@ -0,0 +1,178 @@
+"""
+Shared cache server, the counterpart of `RemoteCacheStorage`.
+
+It serves any storage that reads and writes entries by hashed key (disk, SQLite,
+LMDB, packs, which are read-only without a local storage), e.g.
+`llm-cache serve data/cache/llm --port 8765` on one node and
+`RemoteCacheStorage("http://<node>:8765")` on the workers.
+
+With a token, requests must send it as `Authorization: Bearer <token>`. Without one,
+the server only listens on a loopback interface, unless `allow_unauthenticated` is set.
+Request bodies are only read once authorized, and up to `max_body_size` bytes.
+"""
+import hmac
+import ipaddress
+import json
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+from llm_inference.cache.base import AbstractCacheStorage
+from llm_inference.cache.hashing import validate_hashed_key
+from llm_inference.cache.remote import decode_entries, encode_values
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BODY_SIZE = 256 * 1024 ** 2  # 256 MiB, well above a batch of 500 responses.
+
+
+class CacheRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive: workers reuse their connection.
+    server: "CacheServer"
+
+    def _reply(self, body: bytes, status: int = 200, content_type: str = "application/octet-stream"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/health"):
+            self._reply(json.dumps({"status": "ok"}).encode("utf-8"), content_type="application/json")
+        else:
+            self._reply(b"Not found", status=404, content_type="text/plain")
+
+    def _is_authorized(self) -> bool:
+        token = self.server.token
+        if token is None:
+            return True
+        return hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {token}")
+
+    def _reject(self, body: bytes, status: int):
+        """Replies with an error without reading the request body, so the connection is closed."""
+        self.close_connection = True
+        self._reply(body, status=status, content_type="text/plain")
+
+    def do_POST(self):
+        if not self._is_authorized():
+            self._reject(b"Unauthorized", 401)
+            return
+        try:
+            content_length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            content_length = -1
+        if content_length < 0:
+            self._reject(b"Invalid Content-Length", 400)
+            return
+        if content_length > self.server.max_body_size:
+            self._reject(f"Request body larger than {self.server.max_body_size} bytes".encode("utf-8"), 413)
+            return
+        body = self.rfile.read(content_length)
+        storage = self.server.storage
+        try:
+            if self.path.endswith("/get"):
+                hashed_keys = body.decode("utf-8").split("\n") if body else []
+                for hashed_key in hashed_keys:
+                    validate_hashed_key(hashed_key)
+                self._reply(encode_values(storage._get_many_hashed(hashed_keys)))
+            elif self.path.endswith("/put"):
+                entries = decode_entries(body)
+                for hashed_key, _ in entries:
+                    validate_hashed_key(hashed_key)
+                written = storage._put_many_hashed(entries)
+                self._reply(str(written).encode("utf-8"), content_type="text/plain")
+            else:
+                self._reply(b"Not found", status=404, content_type="text/plain")
+        except ValueError as e:
+            self._reply(str(e).encode("utf-8"), status=400, content_type="text/plain")
+        except Exception as e:
+            logger.error(f"Error handling {self.path}: {e}")
+            self._reply(str(e).encode("utf-8"), status=500, content_type="text/plain")
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class CacheServer(ThreadingHTTPServer):
+    """
+    HTTP server sharing a cache storage, one thread per connection.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        storage: AbstractCacheStorage,
+        address: Tuple[str, int] = ("127.0.0.1", DEFAULT_PORT),
+        token: Optional[str] = None,
+        allow_unauthenticated: bool = False,
+        max_body_size: int = DEFAULT_MAX_BODY_SIZE,
+    ):
+        """
+        Args:
+            storage (AbstractCacheStorage): The served storage, with `_get_many_hashed` and `_put_many_hashed`.
+            address (Tuple[str, int]): The host and port to listen on, port 0 picks a free one.
+            token (str, optional): The token clients must send, see `RemoteCacheStorage`.
+            allow_unauthenticated (bool): Listen on other interfaces than loopback without a token (default: False).
+            max_body_size (int): Largest accepted request body in bytes (default: 256 MiB).
+        """
+        if not (hasattr(storage, "_get_many_hashed") and hasattr(storage, "_put_many_hashed")):
+            raise TypeError(f"{type(storage).__name__} cannot be served, it does not read and write by hashed key")
+        if token is None and not allow_unauthenticated and not is_loopback(address[0]):
+            raise ValueError(
+                f"Refusing to serve the cache on {address[0]} without a token, "
+                "set a token or explicitly allow unauthenticated access"
+            )
+        self.storage = storage
+        self.token = token
+        self.max_body_size = max_body_size
+        super().__init__(address, CacheRequestHandler)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def server_close(self):
+        super().server_close()
+        if hasattr(self.storage, "close"):
+            self.storage.close()
+
+
+def is_loopback(host: str) -> bool:
+    """Whether a host name or address only accepts connections from this machine."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def serve(
+    storage: AbstractCacheStorage,
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    token: Optional[str] = None,
+    allow_unauthenticated: bool = False,
+    max_body_size: int = DEFAULT_MAX_BODY_SIZE,
+):
+    """
+    Serves a storage until interrupted, then closes it, see `CacheServer`.
+    """
+    server = CacheServer(
+        storage,
+        (host, port),
+        token=token,
+        allow_unauthenticated=allow_unauthenticated,
+        max_body_size=max_body_size,
+    )
+    logger.info(f"Serving the cache on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
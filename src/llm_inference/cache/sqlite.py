@@ -0,0 +1,256 @@
+import atexit
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from llm_inference.cache.base import AbstractCacheStorage, CacheEntry
+from llm_inference.cache.codec import ValueCodec
+from llm_inference.settings import CACHE_DIR
+
+SQLITE_FILE_NAME = "cache.sqlite3"
+MAX_QUERY_PARAMETERS = 500  # Below the limit of 999 variables of older SQLite builds.
+
+# Storages flushed at interpreter exit, without keeping them alive.
+_live_storages: "weakref.WeakSet[SqliteCacheStorage]" = weakref.WeakSet()
+
+
+class SqliteCacheStorage(AbstractCacheStorage):
+    """
+    SQLite-based cache storage implementation.
+    Stores cached values as JSON text (or as bytes encoded by a `ValueCodec`) in a single database file in WAL mode, indexed
+    by hashed key. Several processes can read concurrently while one of them writes.
+
+    Writes are buffered and committed in batched transactions; call `flush` or `close`
+    to commit the remaining ones (also done when the storage is garbage-collected, and
+    at interpreter exit).
+    """
+
+    def __init__(
+        self,
+        subdir: str = None,
+        db_path: str = None,
+        batch_size: int = 64,
+        timeout: float = 30.0,
+        codec: Optional[ValueCodec] = None,
+    ):
+        """
+        Initialize the SqliteCacheStorage.
+
+        Args:
+            subdir (str, optional): Subdirectory of CACHE_DIR holding the database file.
+            db_path (str, optional): Explicit path of the database file, overrides `subdir`.
+            batch_size (int): Number of buffered writes committed in one transaction (default: 64).
+            timeout (float): Seconds to wait for a lock held by another process (default: 30).
+            codec (ValueCodec, optional): Projects and compresses the stored values.
+        """
+        if db_path is None:
+            db_path = os.path.join(CACHE_DIR, subdir or "", SQLITE_FILE_NAME)
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.codec = codec
+
+        self._local = threading.local()
+        self._pending: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # Commits batches in the order their entries were put.
+
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+        _live_storages.add(self)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Returns the connection of the current thread, opening it if needed."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=self.timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _get_hashed(self, hashed_key: str) -> Union[bytes, str, None]:
+        with self._lock:
+            value_str = self._pending.get(hashed_key)
+        if value_str is not None:
+            return value_str
+        row = self._connection().execute("SELECT value FROM cache WHERE key = ?", (hashed_key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def _put_many_hashed(self, items: Iterable[Tuple[str, Union[bytes, str]]]) -> int:
+        """
+        Writes already hashed and serialized entries in a single transaction.
+
+        Args:
+            items (Iterable[Tuple[str, bytes | str]]): Pairs of hashed key and stored data.
+
+        Returns:
+            int: The number of written entries.
+        """
+        now = time.time()
+        rows = [(hashed_key, value_str, now) for hashed_key, value_str in items]
+        if rows:
+            with self._connection() as connection:
+                connection.executemany("INSERT OR REPLACE INTO cache (key, value, created_at) VALUES (?, ?, ?)", rows)
+        return len(rows)
+
+    def _delete_many_hashed(self, hashed_keys: Iterable[str]) -> int:
+        """
+        Deletes entries by hashed key.
+
+        Returns:
+            int: The number of deleted entries.
+        """
+        self.flush()
+        hashed_keys = list(hashed_keys)
+        deleted = 0
+        with self._connection() as connection:
+            for start in range(0, len(hashed_keys), MAX_QUERY_PARAMETERS):
+                chunk = hashed_keys[start:start + MAX_QUERY_PARAMETERS]
+                placeholders = ", ".join("?" * len(chunk))
+                deleted += connection.execute(f"DELETE FROM cache WHERE key IN ({placeholders})", chunk).rowcount
+        return deleted
+
+    def _iter_hashed(self) -> Iterator[Tuple[str, Union[bytes, str]]]:
+        """
+        Iterates over the hashed keys and stored data of all the entries.
+        """
+        self.flush()
+        yield from self._connection().execute("SELECT key, value FROM cache")
+
+    def iter_entries(self) -> Iterator[CacheEntry]:
+        """
+        Iterate over the metadata of the stored entries.
+        Entries do not record their reads, their access time is their write time.
+        """
+        self.flush()
+        rows = self._connection().execute("SELECT key, length(CAST(value AS BLOB)), created_at FROM cache")
+        for hashed_key, size, created_at in rows:
+            yield CacheEntry(hashed_key=hashed_key, size=size, created_at=created_at, accessed_at=created_at)
+
+    def get(self, key: Any):
+        """
+        Retrieve a cached value using the given key.
+        """
+        hashed_key = self._get_hashed_key(key)
+        self.logger.debug("Attempting to retrieve cache for key: %s", hashed_key)
+        value_str = self._get_hashed(hashed_key)
+        if value_str is None:
+            self.logger.debug("Cache entry not found for key: %s", hashed_key)
+            return None
+        self.logger.debug("Cache hit for key: %s", hashed_key)
+        return self._decode_value(value_str)
+
+    def _get_many_hashed(self, hashed_keys: Iterable[str]) -> List[Union[bytes, str, None]]:
+        """
+        Reads the stored data of several hashed keys with a few `IN` queries, None where they are missing.
+        """
+        hashed_keys = list(hashed_keys)
+        with self._lock:
+            found = {hashed_key: self._pending[hashed_key] for hashed_key in hashed_keys if hashed_key in self._pending}
+        missing = list(dict.fromkeys(hashed_key for hashed_key in hashed_keys if hashed_key not in found))
+        connection = self._connection()
+        for start in range(0, len(missing), MAX_QUERY_PARAMETERS):
+            chunk = missing[start:start + MAX_QUERY_PARAMETERS]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = connection.execute(f"SELECT key, value FROM cache WHERE key IN ({placeholders})", chunk)
+            found.update(rows)
+        self.logger.debug("Found %d/%d keys in cache", len(found), len(set(hashed_keys)))
+        return [found.get(hashed_key) for hashed_key in hashed_keys]
+
+    def get_many(self, keys: Sequence[Any]) -> List[Any]:
+        """
+        Retrieve the cached values of several keys with a few `IN` queries.
+        """
+        found = self._get_many_hashed(self._get_hashed_key(key) for key in keys)
+        return [self._decode_value(data) if data is not None else None for data in found]
+
+    def put(self, key: Any, value):
+        """
+        Store a value in the cache with the given key.
+        The write is committed with the next batch.
+        """
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[Any, Any]]):
+        """
+        Store several values, committed with the next batch.
+        """
+        encoded = {self._get_hashed_key(key): self._encode_value(value) for key, value in items}
+        self.logger.debug("Storing %d cache entries", len(encoded))
+        with self._lock:
+            self._pending.update(encoded)
+            should_flush = len(self._pending) >= self.batch_size
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """
+        Commit the buffered writes.
+
+        Entries stay readable from the buffer until their transaction is committed.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending = dict(self._pending)
+            if not pending:
+                return
+            try:
+                self._put_many_hashed(pending.items())
+            except Exception as e:
+                self.logger.error(f"Error storing {len(pending)} cache entries: {e}")
+                raise e
+            with self._lock:
+                for hashed_key, value_str in pending.items():
+                    # Keep the entries put again in the meantime for the next batch.
+                    if self._pending.get(hashed_key) is value_str:
+                        del self._pending[hashed_key]
+            self.logger.debug(f"Committed {len(pending)} cache entries")
+
+    def close(self):
+        """
+        Commit the buffered writes and close the connection of the current thread.
+        """
+        self.flush()
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def __del__(self):
+        try:
+            self.flush()
+        except Exception:
+            pass
+
+    def __len__(self) -> int:
+        self.flush()
+        return self._connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def flush_sqlite_storages():
+    """
+    Commits the buffered writes of the live SQLite storages.
+    """
+    for storage in list(_live_storages):
+        try:
+            storage.flush()
+        except Exception:
+            pass  # Logged by flush.
+
+
+atexit.register(flush_sqlite_storages)
@@ -0,0 +1,192 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from llm_inference.cache.base import AbstractCacheStorage
+
+
+class TieredCacheStorage(AbstractCacheStorage):
+    """
+    Two-tier cache storage: a bounded in-memory LRU tier in front of any persistent storage.
+
+    Hot keys are served from memory while the wrapped storage stays the source of truth:
+    every put is written through to it, and memory misses are read from it.
+    Values are kept in memory as JSON text, which gives their approximate size and
+    returns an independent copy on each hit.
+    """
+
+    def __init__(self, storage: AbstractCacheStorage, max_entries: int = 10_000, max_bytes: int = 256 * 1024 ** 2):
+        """
+        Initialize the TieredCacheStorage.
+
+        Args:
+            storage (AbstractCacheStorage): The persistent storage.
+            max_entries (int): Maximum number of entries kept in memory (default: 10000).
+            max_bytes (int): Approximate maximum size of the memory tier in bytes (default: 256 MiB).
+        """
+        self.storage = storage
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.storage_hits = 0
+        self.misses = 0
+
+    def _remember(self, hashed_key: str, value_str: str):
+        """Inserts an entry in the memory tier, evicting the least recently used ones."""
+        if len(value_str) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(hashed_key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._memory[hashed_key] = value_str
+            self._memory_bytes += len(value_str)
+            while len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _recall(self, hashed_key: str) -> Optional[str]:
+        """Reads an entry of the memory tier, counting the hit."""
+        with self._lock:
+            value_str = self._memory.get(hashed_key)
+            if value_str is not None:
+                self._memory.move_to_end(hashed_key)
+                self.memory_hits += 1
+            return value_str
+
+    def _count(self, storage_hits: int = 0, misses: int = 0):
+        """Counts lookups answered by the persistent storage, which may run in several threads."""
+        with self._lock:
+            self.storage_hits += storage_hits
+            self.misses += misses
+
+    def get(self, key: Any):
+        """
+        Retrieve a cached value, from memory if possible.
+        """
+        hashed_key = self._get_hashed_key(key)
+        value_str = self._recall(hashed_key)
+        if value_str is not None:
+            return json.loads(value_str)
+
+        value = self.storage.get(key)
+        if value is None:
+            self._count(misses=1)
+            return None
+
+        self._count(storage_hits=1)
+        self._remember(hashed_key, json.dumps(value))
+        return value
+
+    def put(self, key: Any, value):
+        """
+        Store a value in the persistent storage and in memory.
+        """
+        self.storage.put(key, value)
+        self._remember(self._get_hashed_key(key), json.dumps(value))
+
+    def get_many(self, keys: Sequence[Any]) -> List[Any]:
+        """
+        Retrieve several cached values, looking up the memory misses in one bulk storage lookup.
+        """
+        values = [None] * len(keys)
+        missing = []
+        for index, key in enumerate(keys):
+            value_str = self._recall(self._get_hashed_key(key))
+            if value_str is None:
+                missing.append(index)
+            else:
+                values[index] = json.loads(value_str)
+
+        stored_values = self.storage.get_many([keys[index] for index in missing]) if missing else []
+        storage_hits = 0
+        for index, value in zip(missing, stored_values):
+            if value is None:
+                continue
+            storage_hits += 1
+            self._remember(self._get_hashed_key(keys[index]), json.dumps(value))
+            values[index] = value
+        self._count(storage_hits=storage_hits, misses=len(missing) - storage_hits)
+        return values
+
+    def put_many(self, items: Iterable[Tuple[Any, Any]]):
+        """
+        Store several values in the persistent storage and in memory.
+        """
+        items = list(items)
+        self.storage.put_many(items)
+        for key, value in items:
+            self._remember(self._get_hashed_key(key), json.dumps(value))
+
+    async def aget(self, key: Any):
+        """
+        Retrieve a cached value, memory hits are served without leaving the event loop.
+        """
+        hashed_key = self._get_hashed_key(key)
+        value_str = self._recall(hashed_key)
+        if value_str is not None:
+            return json.loads(value_str)
+
+        value = await self.storage.aget(key)
+        if value is None:
+            self._count(misses=1)
+            return None
+
+        self._count(storage_hits=1)
+        self._remember(hashed_key, json.dumps(value))
+        return value
+
+    async def aput(self, key: Any, value):
+        """
+        Store a value in memory and asynchronously in the persistent storage.
+        """
+        self._remember(self._get_hashed_key(key), json.dumps(value))
+        await self.storage.aput(key, value)
+
+    def clear_memory(self):
+        """
+        Drop the memory tier, the persistent storage is left untouched.
+        """
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Report the size of the memory tier and the hit ratio of each tier.
+        """
+        with self._lock:
+            memory_hits, storage_hits, misses = self.memory_hits, self.storage_hits, self.misses
+            memory_entries, memory_bytes = len(self._memory), self._memory_bytes
+        lookups = memory_hits + storage_hits + misses
+        return {
+            "lookups": lookups,
+            "memory_hits": memory_hits,
+            "storage_hits": storage_hits,
+            "misses": misses,
+            "memory_hit_ratio": memory_hits / lookups if lookups else 0.0,
+            "storage_hit_ratio": storage_hits / lookups if lookups else 0.0,
+            "hit_ratio": (memory_hits + storage_hits) / lookups if lookups else 0.0,
+            "memory_entries": memory_entries,
+            "memory_bytes": memory_bytes,
+        }
+
+    def flush(self):
+        """
+        Flush the persistent storage if it buffers writes.
+        """
+        if hasattr(self.storage, "flush"):
+            self.storage.flush()
+
+    def close(self):
+        """
+        Close the persistent storage if it holds resources.
+        """
+        if hasattr(self.storage, "close"):
+            self.storage.close()
@@ -0,0 +1,231 @@
+import asyncio
+import atexit
+import threading
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from llm_inference.cache.base import AbstractCacheStorage
+
+# Storages flushed at interpreter exit, without keeping them alive.
+_live_storages: "weakref.WeakSet[WriteBehindCacheStorage]" = weakref.WeakSet()
+
+
+class WriteBehindCacheStorage(AbstractCacheStorage):
+    """
+    Write-behind buffer in front of any cache storage.
+
+    Puts return immediately: entries are kept in memory, where reads already see them,
+    and written to the wrapped storage in batches, by a background task of the event
+    loop for async callers or when the buffer is full. Call `flush`/`aflush` (also done
+    by `close`/`aclose` and at interpreter exit) to write the remaining entries.
+
+    The flush task belongs to the event loop that started it: a storage used by
+    successive event loops (e.g. several `asyncio.run`) starts one in each of them.
+    """
+
+    def __init__(self, storage: AbstractCacheStorage, batch_size: int = 64, flush_interval: float = 1.0):
+        """
+        Initialize the WriteBehindCacheStorage.
+
+        Args:
+            storage (AbstractCacheStorage): The storage the entries are written to.
+            batch_size (int): Number of buffered entries written in one `put_many` (default: 64).
+            flush_interval (float): Maximum seconds an entry stays buffered with async callers (default: 1).
+        """
+        self.storage = storage
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._pending: Dict[str, Tuple[Any, Any]] = {}
+        self._lock = threading.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_wanted: Optional[asyncio.Event] = None
+        self._flush_loop: Optional[asyncio.AbstractEventLoop] = None
+        _live_storages.add(self)
+
+    def _buffer(self, items: Iterable[Tuple[Any, Any]]) -> bool:
+        """Buffers entries and tells whether a batch is ready to be written."""
+        with self._lock:
+            for key, value in items:
+                self._pending[self._get_hashed_key(key)] = (key, value)
+            return len(self._pending) >= self.batch_size
+
+    def _lookup(self, key: Any) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._pending.get(self._get_hashed_key(key))
+        return (True, entry[1]) if entry is not None else (False, None)
+
+    def _take_pending(self) -> List[Tuple[str, Any, Any]]:
+        with self._lock:
+            return [(hashed_key, key, value) for hashed_key, (key, value) in self._pending.items()]
+
+    def _release(self, written: List[Tuple[str, Any, Any]]):
+        """Removes written entries from the buffer, unless they were put again in the meantime."""
+        with self._lock:
+            for hashed_key, _, value in written:
+                entry = self._pending.get(hashed_key)
+                if entry is not None and entry[1] is value:
+                    del self._pending[hashed_key]
+
+    def get(self, key: Any):
+        """
+        Retrieve a cached value, buffered entries included.
+        """
+        found, value = self._lookup(key)
+        return value if found else self.storage.get(key)
+
+    def _split_buffered(self, keys: Sequence[Any]) -> Tuple[List[Any], List[int]]:
+        """Returns the buffered values of the keys and the indices of the keys to look up in the storage."""
+        values = [None] * len(keys)
+        missing = []
+        for index, key in enumerate(keys):
+            found, value = self._lookup(key)
+            if found:
+                values[index] = value
+            else:
+                missing.append(index)
+        return values, missing
+
+    def get_many(self, keys: Sequence[Any]) -> List[Any]:
+        """
+        Retrieve several cached values, buffered entries included.
+        """
+        values, missing = self._split_buffered(keys)
+        if missing:
+            for index, value in zip(missing, self.storage.get_many([keys[index] for index in missing])):
+                values[index] = value
+        return values
+
+    def put(self, key: Any, value):
+        """
+        Buffer a value, the buffer is written once it holds `batch_size` entries.
+        """
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[Any, Any]]):
+        """
+        Buffer several values, the buffer is written once it holds `batch_size` entries.
+        """
+        if self._buffer(items):
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered entries to the wrapped storage.
+        """
+        written = self._take_pending()
+        if written:
+            self.storage.put_many([(key, value) for _, key, value in written])
+            self._release(written)
+            self.logger.debug(f"Wrote {len(written)} buffered cache entries")
+        if hasattr(self.storage, "flush"):
+            self.storage.flush()
+
+    async def aget(self, key: Any):
+        """
+        Retrieve a cached value, buffered entries are served without leaving the event loop.
+        """
+        found, value = self._lookup(key)
+        return value if found else await self.storage.aget(key)
+
+    async def aget_many(self, keys: Sequence[Any]) -> List[Any]:
+        """
+        Retrieve several cached values, buffered entries included.
+        """
+        values, missing = self._split_buffered(keys)
+        if missing:
+            for index, value in zip(missing, await self.storage.aget_many([keys[index] for index in missing])):
+                values[index] = value
+        return values
+
+    async def aput(self, key: Any, value):
+        """
+        Buffer a value, written by the background flush task.
+        """
+        await self.aput_many([(key, value)])
+
+    async def aput_many(self, items: Iterable[Tuple[Any, Any]]):
+        """
+        Buffer several values, written by the background flush task.
+        """
+        batch_ready = self._buffer(items)
+        self._ensure_flush_task()
+        if batch_ready:
+            self._flush_wanted.set()
+
+    def _ensure_flush_task(self):
+        loop = asyncio.get_running_loop()
+        if self._flush_task is None or self._flush_task.done() or self._flush_loop is not loop:
+            # The task and event of a previous loop can neither run nor be awaited here.
+            self._flush_wanted = asyncio.Event()
+            self._flush_loop = loop
+            self._flush_task = loop.create_task(self._flush_periodically(self._flush_wanted))
+
+    async def _flush_periodically(self, flush_wanted: asyncio.Event):
+        while True:
+            try:
+                await asyncio.wait_for(flush_wanted.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            flush_wanted.clear()
+            try:
+                await self.aflush()
+            except Exception as e:
+                self.logger.error(f"Error writing buffered cache entries: {e}")
+            with self._lock:
+                if not self._pending:
+                    return
+
+    async def aflush(self):
+        """
+        Asynchronously write the buffered entries to the wrapped storage.
+        """
+        written = self._take_pending()
+        if written:
+            await self.storage.aput_many([(key, value) for _, key, value in written])
+            self._release(written)
+            self.logger.debug(f"Wrote {len(written)} buffered cache entries")
+
+    async def aclose(self):
+        """
+        Stop the background flush task, write the buffered entries and close the wrapped storage.
+        """
+        if self._flush_task is not None and self._flush_loop is asyncio.get_running_loop():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        self._flush_task = None
+        self._flush_wanted = None
+        self._flush_loop = None
+        await self.aflush()
+        await self._run_io(self.close)
+
+    def close(self):
+        """
+        Write the buffered entries and close the wrapped storage if it holds resources.
+        """
+        self.flush()
+        if hasattr(self.storage, "close"):
+            self.storage.close()
+
+    def __del__(self):
+        try:
+            self.flush()
+        except Exception:
+            pass
+
+
+def flush_write_behind_storages():
+    """
+    Writes the buffered entries of the live write-behind storages.
+    """
+    for storage in list(_live_storages):
+        try:
+            storage.flush()
+        except Exception as e:
+            storage.logger.error(f"Error writing buffered cache entries: {e}")
+
+
+atexit.register(flush_write_behind_storages)
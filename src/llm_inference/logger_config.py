@@ -1,19 +1,161 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
+import time
+from typing import Dict, Optional, TextIO, Tuple
 
 from llm_inference.settings import LOGGING_LEVEL
 
-def configure_logging():
-    # Configure the root logger for console output
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class TextFormatter(logging.Formatter):
+    """
+    Formats records as text lines, telling how many similar records were rate-limited.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{text} ({suppressed} similar messages suppressed)" if suppressed else text
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formats records as JSON lines, for log tooling: time, level, logger, message, the
+    exception if any, and the fields passed with `extra=`.
+    """
+
+    RESERVED_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        for name, value in vars(record).items():
+            if name not in self.RESERVED_ATTRIBUTES and not name.startswith("_"):
+                entry[name] = value
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Rate-limits repetitive records, e.g. one record per cache hit.
+
+    Records are grouped by logger and message template (hence `%`-style arguments
+    rather than f-strings), and at most `max_per_second` records of each group pass
+    per second. The next record passing tells how many were suppressed. Warnings and
+    errors always pass.
+    """
+
+    def __init__(self, max_per_second: float = 10.0):
+        """
+        Args:
+            max_per_second (float): Records of a group passing per second (default: 10).
+        """
+        super().__init__()
+        self.max_per_second = max_per_second
+        self._windows: Dict[Tuple[str, str], list] = {}  # group -> [window start, passed, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        group = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(group)
+            if window is None or now - window[0] >= 1.0:
+                suppressed = window[2] if window is not None else 0
+                window = self._windows[group] = [now, 0, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+            if window[1] >= self.max_per_second:
+                window[2] += 1
+                return False
+            window[1] += 1
+        return True
+
+
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler leaving the formatting to the listener thread.
+
+    The standard handler formats each record before enqueuing it, so that it can be
+    pickled to another process; the queue never leaves this process, so the calling
+    thread only pays for creating the record.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def configure_logging(
+    level=LOGGING_LEVEL,
+    json_lines: bool = False,
+    max_per_second: Optional[float] = None,
+    stream: Optional[TextIO] = None,
+    use_queue: bool = True,
+):
+    """
+    Configures the root logger to write to the console.
+
+    Records are put on an in-memory queue and written by a background listener thread,
+    so that formatting and console I/O never slow down the calling code; the queue is
+    drained at interpreter exit.
+
+    Args:
+        level: The logging level (default: the LOGGING_LEVEL environment variable, or INFO).
+        json_lines (bool): Write JSON lines instead of text (default: False).
+        max_per_second (float, optional): Rate-limit repetitive INFO and DEBUG records, see `RateLimitFilter`.
+        stream (TextIO, optional): The output stream (default: sys.stdout).
+        use_queue (bool): Write from a background thread (default: True).
+    """
+    global _listener
+    stop_logging()
+
     logger = logging.getLogger()
-    logger.setLevel(LOGGING_LEVEL)
+    logger.setLevel(level)
 
     # Clear any existing handlers
     if logger.hasHandlers():
         logger.handlers.clear()
 
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(LOGGING_LEVEL)
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    console_handler = logging.StreamHandler(stream if stream is not None else sys.stdout)
+    console_handler.setLevel(level)
+    console_handler.setFormatter(JsonLinesFormatter() if json_lines else TextFormatter(TEXT_FORMAT))
+
+    if use_queue:
+        handler = _InProcessQueueHandler(queue.SimpleQueue())
+        _listener = logging.handlers.QueueListener(handler.queue, console_handler, respect_handler_level=True)
+        _listener.start()
+    else:
+        handler = console_handler
+    if max_per_second is not None:
+        handler.addFilter(RateLimitFilter(max_per_second))
+    handler.setLevel(level)
+    logger.addHandler(handler)
+
+
+def stop_logging():
+    """
+    Stops the background listener, once every queued record is written.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,254 @@
+import hashlib
+import json
+import re
+from functools import cached_property
+from typing import Any, Dict, List, Optional
+
+from llm_inference.logger_mixin import LoggingMixin
+
+JSON_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "null": (type(None),),
+}
+
+# Key used to mark a response as already checked against an output schema.
+SCHEMA_MARKER_KEY = "output_schema"
+
+# Placeholder field name used when the response could not be parsed at all.
+ROOT_FIELD = "*"
+
+
+class SchemaField:
+    """A single expected key of a JSON answer and the rules its value must follow."""
+
+    def __init__(
+        self,
+        name: str,
+        types: Optional[List[str]] = None,
+        required: bool = True,
+        choices: Optional[List[str]] = None,
+        separator: Optional[str] = None,
+        pattern: Optional[str] = None,
+        description: Optional[str] = None,
+    ):
+        """
+        Args:
+            name (str): The JSON key.
+            types (List[str], optional): Allowed JSON types (default: ["string"]).
+            required (bool): Whether the key must be present (default: True).
+            choices (List[str], optional): Allowed values, compared case-insensitively.
+            separator (str, optional): Regex used to split list-like values before
+                checking each item against `choices`.
+            pattern (str, optional): Regex the string form of the value must match.
+            description (str, optional): Short description repeated in re-ask prompts.
+        """
+        types = types or ["string"]
+        unknown_types = set(types) - set(JSON_TYPES)
+        if unknown_types:
+            raise ValueError(f"Unknown types for field '{name}': {sorted(unknown_types)}")
+
+        self.name = name
+        self.types = list(types)
+        self.required = required
+        self.choices = list(choices) if choices else None
+        self.separator = separator
+        self.pattern = pattern
+        self.description = description
+
+        self._python_types = tuple(t for type_name in self.types for t in JSON_TYPES[type_name])
+        self._choices = {choice.lower() for choice in self.choices} if self.choices else None
+        self._separator = re.compile(separator) if separator else None
+        self._pattern = re.compile(pattern) if pattern else None
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "types": self.types,
+            "required": self.required,
+            "choices": self.choices,
+            "separator": self.separator,
+            "pattern": self.pattern,
+            "description": self.description,
+        }
+
+    def validate(self, value: Any) -> Optional[str]:
+        """
+        Checks a single value.
+
+        Returns:
+            Optional[str]: A human readable error, or None if the value is valid.
+        """
+        # bool is a subclass of int, it is only accepted when explicitly allowed.
+        if isinstance(value, bool) and "boolean" not in self.types:
+            return f"expected {' or '.join(self.types)}, got boolean"
+        if not isinstance(value, self._python_types):
+            return f"expected {' or '.join(self.types)}, got {type(value).__name__}"
+
+        if self._choices is not None and isinstance(value, str):
+            items = self._separator.split(value) if self._separator else [value]
+            invalid = [item.strip() for item in items if item.strip().lower() not in self._choices]
+            if invalid:
+                return f"{invalid!r} not in allowed values: {', '.join(self.choices)}"
+
+        if self._pattern is not None and not self._pattern.search(str(value)):
+            return f"value {value!r} does not match the expected format"
+
+        return None
+
+
+class OutputSchema(LoggingMixin):
+    """
+    Compiled description of the JSON answer expected for a prompt template.
+
+    Backends use it to validate each parsed response and to build a short re-ask
+    prompt listing only the missing or invalid fields.
+    """
+
+    def __init__(
+        self,
+        fields: List[SchemaField],
+        name: Optional[str] = None,
+        stop_when: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Args:
+            fields (List[SchemaField]): The expected fields.
+            name (str, optional): A readable name for the schema (usually the prompt name).
+            stop_when (Dict[str, str], optional): Short-circuit answers. If the response
+                holds one of these key/value pairs (case-insensitive), only that key is
+                required, e.g. {"Registry related": "no"}.
+        """
+        self.fields = {field.name: field for field in fields}
+        self.name = name
+        self.stop_when = {key: value.lower() for key, value in (stop_when or {}).items()}
+
+    @classmethod
+    def from_dict(cls, spec: dict) -> "OutputSchema":
+        """
+        Compiles a schema from its JSON specification.
+
+        Args:
+            spec (dict): A dictionary with a "fields" list and optional "name" and "stop_when".
+
+        Returns:
+            OutputSchema: The compiled schema.
+        """
+        fields = [SchemaField(**field_spec) for field_spec in spec["fields"]]
+        return cls(fields, name=spec.get("name"), stop_when=spec.get("stop_when"))
+
+    @classmethod
+    def from_json(cls, path: str) -> "OutputSchema":
+        """Loads and compiles a schema from a JSON file."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "stop_when": self.stop_when or None,
+            "fields": [field.to_dict() for field in self.fields.values()],
+        }
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """A stable hash of the schema, stored alongside validated responses."""
+        spec_str = json.dumps(self.to_dict(), sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(spec_str.encode("utf-8")).hexdigest()[:16]
+
+    def _is_short_circuit(self, parsed: dict) -> bool:
+        for key, value in self.stop_when.items():
+            answer = parsed.get(key)
+            if isinstance(answer, str) and answer.strip().lower() == value:
+                return True
+        return False
+
+    def validate(self, parsed: Any) -> Dict[str, str]:
+        """
+        Validates a parsed response.
+
+        Args:
+            parsed (Any): The parsed JSON answer (None if it could not be parsed).
+
+        Returns:
+            Dict[str, str]: Errors keyed by field name, empty if the answer is valid.
+        """
+        if not isinstance(parsed, dict):
+            return {ROOT_FIELD: "the answer is not a valid JSON object"}
+
+        if self._is_short_circuit(parsed):
+            fields = [self.fields[key] for key in self.stop_when if key in self.fields]
+        else:
+            fields = self.fields.values()
+
+        errors = {}
+        for field in fields:
+            if field.name not in parsed:
+                if field.required:
+                    errors[field.name] = "missing"
+                continue
+            error = field.validate(parsed[field.name])
+            if error is not None:
+                errors[field.name] = error
+        return errors
+
+    def make_reask_prompt(self, errors: Dict[str, str]) -> str:
+        """
+        Builds a short follow-up prompt asking only for the fields in error.
+
+        Args:
+            errors (Dict[str, str]): Errors returned by `validate`.
+
+        Returns:
+            str: The re-ask prompt.
+        """
+        if ROOT_FIELD in errors:
+            field_names = list(self.fields)
+            lines = [f"Your previous answer is invalid: {errors[ROOT_FIELD]}."]
+        else:
+            field_names = list(errors)
+            lines = ["Some fields of your previous answer are missing or invalid:"]
+            for field_name in field_names:
+                field = self.fields[field_name]
+                line = f'- "{field_name}": {errors[field_name]}'
+                if field.description:
+                    line += f" ({field.description})"
+                lines.append(line)
+
+        keys = ", ".join(f'"{field_name}"' for field_name in field_names)
+        lines.append(f"Answer again with a JSON object containing only these keys: {keys}.")
+        return "\n".join(lines)
+
+    def merge(self, parsed: Any, fixes: Any, errors: Dict[str, str]) -> dict:
+        """
+        Merges the answer to a re-ask into the previously parsed response.
+
+        Only the fields that were in error are taken from `fixes`.
+        """
+        if not isinstance(fixes, dict):
+            return parsed if isinstance(parsed, dict) else {}
+        if ROOT_FIELD in errors or not isinstance(parsed, dict):
+            return fixes
+
+        merged = dict(parsed)
+        for field_name in errors:
+            if field_name in fixes:
+                merged[field_name] = fixes[field_name]
+        return merged
+
+    def mark(self, response: dict, errors: Dict[str, str], reasks: int) -> dict:
+        """Stores the validation outcome in the response so it is never checked again."""
+        response[SCHEMA_MARKER_KEY] = {
+            "name": self.name,
+            "fingerprint": self.fingerprint,
+            "errors": errors,
+            "reasks": reasks,
+        }
+        return response
+
+    def is_validated(self, response: dict) -> bool:
+        """Whether the response was already checked against this schema."""
+        marker = response.get(SCHEMA_MARKER_KEY)
+        return isinstance(marker, dict) and marker.get("fingerprint") == self.fingerprint
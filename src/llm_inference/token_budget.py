@@ -0,0 +1,211 @@
+import atexit
+import hashlib
+import json
+import math
+import os
+import threading
+import weakref
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional, Tuple
+
+from llm_inference.logger_mixin import LoggingMixin
+
+# Trackers saved at interpreter exit, without keeping them alive.
+_live_trackers: "weakref.WeakSet[CompletionLengthTracker]" = weakref.WeakSet()
+
+
+class CompletionLengthTracker(LoggingMixin):
+    """
+    Learns the distribution of `completion_tokens` per prompt template and model,
+    and derives a per-request `max_tokens` from a high percentile plus a margin.
+
+    The configured `max_tokens` stays the ceiling: a tuned request that gets truncated
+    is continued by the backend with the configured value, so the tuned value only
+    shortens reservations for short answers such as "Registry related: no".
+
+    Prompts are grouped by the template registered with `register_template` they start
+    with, or else by their leading characters. Observations not saved yet are saved to
+    `path` by `close`, when the tracker is collected and at interpreter exit.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 99.0,
+        margin: float = 0.2,
+        min_tokens: int = 32,
+        min_samples: int = 50,
+        max_samples: int = 1000,
+        prefix_chars: int = 512,
+        path: Optional[str] = None,
+        save_every: int = 100,
+    ):
+        """
+        Args:
+            percentile (float): Percentile of observed completion lengths to cover (default: 99).
+            margin (float): Relative margin added on top of the percentile (default: 0.2).
+            min_tokens (int): Lower bound of a tuned `max_tokens` (default: 32).
+            min_samples (int): Observations required before tuning a template (default: 50).
+            max_samples (int): Number of most recent observations kept per template (default: 1000).
+            prefix_chars (int): Number of leading prompt characters identifying an unregistered template (default: 512).
+            path (str, optional): JSON file where observations are loaded from and saved to.
+            save_every (int): Save to `path` every `save_every` observations (default: 100).
+        """
+        self.percentile = percentile
+        self.margin = margin
+        self.min_tokens = min_tokens
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.prefix_chars = prefix_chars
+        self.path = path
+        self.save_every = save_every
+
+        self._samples: Dict[str, Deque[int]] = defaultdict(lambda: deque(maxlen=self.max_samples))
+        self._unsaved = 0
+        self._templates: Tuple[Tuple[str, str], ...] = ()
+        self._lock = threading.Lock()
+
+        if path is not None and os.path.exists(path):
+            self.load(path)
+        _live_trackers.add(self)
+
+    def register_template(self, template: str, template_id: Optional[str] = None) -> str:
+        """
+        Registers a prompt template, so that its prompts are identified by an explicit id.
+
+        Templates sharing a long prefix, or too short to leave the record out of the
+        leading characters, are told apart this way.
+
+        Args:
+            template (str): The text all the prompts of the template start with.
+            template_id (str, optional): The id of the template (default: a hash of the template text).
+
+        Returns:
+            str: The template id.
+        """
+        if template_id is None:
+            template_id = hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+        with self._lock:
+            templates = dict(self._templates)
+            templates[template] = template_id
+            # Longest first, so that a template extending another one takes precedence.
+            self._templates = tuple(sorted(templates.items(), key=lambda item: -len(item[0])))
+        return template_id
+
+    def template_key(self, prompt: str) -> str:
+        """
+        Identifies the prompt template of a prompt.
+
+        The id of the longest registered template the prompt starts with is returned.
+        Otherwise, prompts are assumed to be built as "<template>\\n\\n<record>" and the
+        template is identified from the leading characters.
+        """
+        for template, template_id in self._templates:
+            if prompt.startswith(template):
+                return template_id
+        prefix = prompt[:self.prefix_chars]
+        return hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _key(template_key: str, model: str) -> str:
+        return f"{model}:{template_key}"
+
+    def record(self, template_key: str, model: str, completion_tokens: int):
+        """Records the completion length of one response."""
+        with self._lock:
+            self._samples[self._key(template_key, model)].append(int(completion_tokens))
+            self._unsaved += 1
+            should_save = self.path is not None and self._unsaved >= self.save_every
+        if should_save:
+            self.save()
+
+    def observe(self, template_key: str, model_config: dict, response: dict):
+        """Records the completion length reported in the usage of a raw API response."""
+        completion_tokens = (response.get("usage") or {}).get("completion_tokens")
+        if isinstance(completion_tokens, int):
+            self.record(template_key, model_config["model"], completion_tokens)
+
+    def quantile(self, template_key: str, model: str) -> Optional[float]:
+        """Returns the configured percentile of the observations, or None if too few were recorded."""
+        with self._lock:
+            samples = sorted(self._samples.get(self._key(template_key, model), ()))
+        if len(samples) < self.min_samples:
+            return None
+
+        rank = (len(samples) - 1) * self.percentile / 100
+        lower = math.floor(rank)
+        upper = math.ceil(rank)
+        return samples[lower] + (samples[upper] - samples[lower]) * (rank - lower)
+
+    def suggest_max_tokens(self, template_key: str, model: str, max_tokens: int) -> int:
+        """
+        Suggests a `max_tokens` value for a request.
+
+        Args:
+            template_key (str): The prompt template key.
+            model (str): The model name.
+            max_tokens (int): The configured value, used as ceiling and as fallback.
+
+        Returns:
+            int: The tuned value.
+        """
+        quantile = self.quantile(template_key, model)
+        if quantile is None:
+            return max_tokens
+        tuned = math.ceil(quantile * (1 + self.margin))
+        return min(max_tokens, max(self.min_tokens, tuned))
+
+    def tune(self, template_key: str, model_config: dict) -> dict:
+        """Returns a copy of the model configuration with a tuned `max_tokens`."""
+        if "max_tokens" not in model_config:
+            return model_config
+        max_tokens = self.suggest_max_tokens(template_key, model_config["model"], model_config["max_tokens"])
+        return dict(model_config, max_tokens=max_tokens)
+
+    def save(self, path: Optional[str] = None):
+        """Saves the observations as JSON."""
+        path = path or self.path
+        with self._lock:
+            data = {key: list(samples) for key, samples in self._samples.items()}
+            self._unsaved = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+        self.logger.debug(f"Saved completion lengths for {len(data)} templates to {path}")
+
+    def load(self, path: str):
+        """Loads observations previously saved with `save`."""
+        with open(path, "r") as f:
+            data = json.load(f)
+        with self._lock:
+            for key, samples in data.items():
+                self._samples[key].extend(samples)
+        self.logger.debug(f"Loaded completion lengths for {len(data)} templates from {path}")
+
+    def close(self):
+        """Saves the observations not saved yet to `path`."""
+        with self._lock:
+            unsaved = self._unsaved
+        if self.path is not None and unsaved:
+            self.save()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def save_completion_lengths():
+    """
+    Saves the observations of the live trackers that were not saved yet.
+    """
+    for tracker in list(_live_trackers):
+        try:
+            tracker.close()
+        except Exception as e:
+            tracker.logger.error(f"Error saving completion lengths to {tracker.path}: {e}")
+
+
+atexit.register(save_completion_lengths)
@@ -1 +1,17 @@
-from . import vector_store
+# Submodules are imported on first use (PEP 562): rule scripts only pay for the
+# dependencies (weaviate, numpy) of the helpers they use.
+import importlib
+
+_SUBMODULES = {"vector_store", "prefilter", "dedup", "sampling", "export"}
+
+__all__ = sorted(_SUBMODULES)
+
+
+def __getattr__(name):
+    if name not in _SUBMODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return importlib.import_module(f".{name}", __name__)
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES)
@@ -0,0 +1,242 @@
+import hashlib
+import html
+import json
+import re
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Copyright notices appended to abstracts by some sources ("© 2021 Elsevier Ltd. All rights reserved."),
+# only as the final sentence: "(c)" is left alone, it mostly numbers items of a list.
+COPYRIGHT_PATTERN = re.compile(r"(?:©|\bcopyright\b)[^.]*\.?(?:\s*all rights reserved\.?)?\s*$", re.IGNORECASE)
+WORD_PATTERN = re.compile(r"\w+")
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes an abstract before comparison: decodes HTML entities and tags, drops a
+    trailing copyright notice, lowercases and keeps the words only.
+    """
+    text = html.unescape(text or "")
+    text = re.sub(r"<[^>]+>", " ", text)
+    text = COPYRIGHT_PATTERN.sub("", text)
+    return " ".join(WORD_PATTERN.findall(text.lower()))
+
+
+def shingles(text: str, size: int = 3) -> set:
+    """
+    Returns the set of word n-grams of a normalized text, or of its words if it is shorter.
+    """
+    words = text.split()
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def jaccard(a: set, b: set) -> float:
+    """Exact Jaccard similarity of two sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """
+    MinHash signatures, whose agreement rate estimates the Jaccard similarity of the
+    underlying shingle sets.
+    """
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        """
+        Args:
+            num_perm (int): Number of hash permutations, the length of the signatures (default: 128).
+            seed (int): Seed of the permutations, signatures are only comparable with the same seed.
+        """
+        self.num_perm = num_perm
+        rng = np.random.RandomState(seed)
+        # a * hash stays below 2**63 so that the permutations never overflow.
+        self._a = rng.randint(1, 1 << 30, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 30, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set: Iterable[str]) -> np.ndarray:
+        """
+        Args:
+            shingle_set (Iterable[str]): The shingles of a text.
+
+        Returns:
+            np.ndarray: The signature, `num_perm` 32-bit values.
+        """
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little") for shingle in shingle_set),
+            dtype=np.uint64,
+        )
+        if hashes.size == 0:
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint64)
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % np.uint64(MERSENNE_PRIME) & np.uint64(MAX_HASH)
+        return permuted.min(axis=1)
+
+
+def estimate_jaccard(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+    """Estimates the Jaccard similarity of two texts from their MinHash signatures."""
+    return float(np.mean(signature_a == signature_b))
+
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Chooses the number of bands and rows per band of an LSH index, so that pairs around
+    the threshold become candidates with a probability close to 1/2.
+
+    Returns:
+        Tuple[int, int]: The number of bands and of rows per band.
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class LSHIndex:
+    """
+    Locality-sensitive hashing index of MinHash signatures.
+
+    Signatures are split in bands, texts sharing a band bucket are candidate
+    near-duplicates, whose estimated Jaccard similarity is then checked against the
+    threshold. Lookups cost one dictionary access per band, whatever the index size.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128):
+        """
+        Args:
+            threshold (float): Minimum Jaccard similarity of near-duplicates (default: 0.8).
+            num_perm (int): Length of the signatures (default: 128).
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [{} for _ in range(self.bands)]
+        self.signatures: Dict[Hashable, np.ndarray] = {}
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[Tuple[int, bytes]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def candidates(self, signature: np.ndarray) -> set:
+        """
+        Returns the indexed texts sharing a band bucket with a signature.
+        """
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        return candidates
+
+    def query(self, signature: np.ndarray) -> List[Tuple[Hashable, float]]:
+        """
+        Returns the indexed texts similar to a signature, with their estimated similarity.
+        """
+        similar = []
+        for key in self.candidates(signature):
+            similarity = estimate_jaccard(signature, self.signatures[key])
+            if similarity >= self.threshold:
+                similar.append((key, similarity))
+        return sorted(similar, key=lambda item: -item[1])
+
+    def insert(self, key: Hashable, signature: np.ndarray):
+        """Indexes the signature of a text."""
+        self.signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band].setdefault(band_key, []).append(key)
+
+
+class NearDuplicateDetector:
+    """
+    Clusters near-duplicate abstracts, so that only one representative per cluster is
+    annotated and its annotation is reused for the others.
+
+    Texts are processed in order: a text similar to an already indexed one joins the
+    cluster of its most similar match, otherwise it becomes a new representative.
+    The LSH index only proposes candidates, whose exact Jaccard similarity to the text
+    is checked against the threshold, so no pair below it shares an annotation.
+    Texts with fewer than `min_words` words are never clustered.
+    """
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 128, shingle_size: int = 3, min_words: int = 20, seed: int = 1):
+        """
+        Args:
+            threshold (float): Minimum Jaccard similarity of the word shingles of near-duplicates (default: 0.9).
+            num_perm (int): Length of the MinHash signatures (default: 128).
+            shingle_size (int): Number of words per shingle (default: 3).
+            min_words (int): Minimum number of words of a clustered text (default: 20).
+            seed (int): Seed of the MinHash permutations.
+        """
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.min_words = min_words
+        self.hasher = MinHasher(num_perm=num_perm, seed=seed)
+        self.index = LSHIndex(threshold=threshold, num_perm=num_perm)
+        self._shingles: Dict[Hashable, set] = {}
+
+    def add(self, key: Hashable, text: str) -> Tuple[Hashable, float]:
+        """
+        Adds a text and returns its representative.
+
+        Returns:
+            Tuple[Hashable, float]: The key of the representative and the Jaccard
+                similarity to it, (key, 1.0) if the text is a representative itself.
+        """
+        normalized = normalize_text(text)
+        if len(normalized.split()) < self.min_words:
+            return key, 1.0
+        shingle_set = shingles(normalized, self.shingle_size)
+        signature = self.hasher.signature(shingle_set)
+        best = None
+        for candidate in self.index.candidates(signature):
+            similarity = jaccard(shingle_set, self._shingles[candidate])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (candidate, similarity)
+        if best is not None:
+            return best
+        self.index.insert(key, signature)
+        self._shingles[key] = shingle_set
+        return key, 1.0
+
+    def cluster(self, items: Iterable[Tuple[Hashable, str]]) -> Dict[Hashable, Tuple[Hashable, float]]:
+        """
+        Clusters texts.
+
+        Args:
+            items (Iterable[Tuple[Hashable, str]]): Pairs of key and text.
+
+        Returns:
+            Dict[Hashable, Tuple[Hashable, float]]: The representative of each key and the
+                Jaccard similarity to it.
+        """
+        return {key: self.add(key, text) for key, text in items}
+
+
+def write_reuse_audit(representatives: Dict[Hashable, Tuple[Hashable, float]], audit_jsonl: str, threshold: Optional[float] = None) -> int:
+    """
+    Writes the audit trail of reused annotations: one line per duplicate with its
+    representative and their Jaccard similarity.
+
+    Returns:
+        int: The number of duplicates.
+    """
+    duplicates = 0
+    with open(audit_jsonl, "w", encoding="utf-8") as f:
+        for key, (representative, similarity) in representatives.items():
+            if representative == key:
+                continue
+            f.write(json.dumps({
+                "object_id": key,
+                "reused_from": representative,
+                "jaccard": round(similarity, 4),
+                "threshold": threshold,
+            }, ensure_ascii=False) + "\n")
+            duplicates += 1
+    return duplicates
@@ -0,0 +1,247 @@
+import dataclasses
+import gzip
+import json
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pyarrow
+import pyarrow.parquet
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE_NAME = "manifest.json"
+FORMATS = {"parquet": ".parquet", "jsonl": ".jsonl.gz"}
+UUID_SPACE = 1 << 128
+
+# Arrow types of the Weaviate data types. Other types (objects, geo coordinates, phone
+# numbers, blobs) are exported as JSON text.
+ARROW_TYPES = {
+    "text": pyarrow.string(),
+    "int": pyarrow.int64(),
+    "number": pyarrow.float64(),
+    "boolean": pyarrow.bool_(),
+    "date": pyarrow.timestamp("us", tz="UTC"),
+    "uuid": pyarrow.string(),
+}
+
+
+def uuid_ranges(num_ranges: int) -> List[Tuple[Optional[uuid.UUID], Optional[uuid.UUID]]]:
+    """
+    Splits the UUID space into contiguous ranges of equal width.
+
+    Returns:
+        List[Tuple[UUID | None, UUID | None]]: The (after, before) bounds of each range: ids
+            strictly greater than `after` (None for the first range) and strictly lower
+            than `before` (None for the last range).
+    """
+    bounds = [index * UUID_SPACE // num_ranges for index in range(num_ranges + 1)]
+    ranges = []
+    for index in range(num_ranges):
+        after = uuid.UUID(int=bounds[index] - 1) if index else None
+        before = uuid.UUID(int=bounds[index + 1]) if index < num_ranges - 1 else None
+        ranges.append((after, before))
+    return ranges
+
+
+def iter_range(
+    collection,
+    after: Optional[uuid.UUID],
+    before: Optional[uuid.UUID],
+    return_properties: Optional[Sequence[str]] = None,
+    page_size: int = 1000,
+) -> Iterator[Any]:
+    """
+    Iterates over the objects of a collection whose id lies in a range, in id order,
+    with a cursor opened at the start of the range.
+    """
+    cursor = after
+    while True:
+        objects = collection.query.fetch_objects(limit=page_size, after=cursor, return_properties=return_properties).objects
+        for obj in objects:
+            if before is not None and obj.uuid.int >= before.int:
+                return
+            yield obj
+        if len(objects) < page_size:
+            return
+        cursor = objects[-1].uuid
+
+
+def _serialize(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Type {type(obj)} not serializable")
+
+
+def _arrow_type(data_type: str) -> pyarrow.DataType:
+    if data_type.endswith("[]"):
+        return pyarrow.list_(_arrow_type(data_type[:-2]))
+    return ARROW_TYPES.get(data_type, pyarrow.string())
+
+
+def arrow_schema(collection, return_properties: Optional[Sequence[str]] = None) -> pyarrow.Schema:
+    """
+    Returns the Arrow schema of the exported objects, from the property definitions of
+    the collection, so that every shard has the same columns and types, even where a
+    property is missing or null in the whole shard.
+
+    Args:
+        collection: The Weaviate collection (v4 client).
+        return_properties (Sequence[str], optional): The exported properties (default: all).
+
+    Returns:
+        pyarrow.Schema: The `uuid` column, then a column per property.
+    """
+    data_types = {
+        prop.name: getattr(prop.data_type, "value", prop.data_type)
+        for prop in collection.config.get().properties
+    }
+    names = list(return_properties) if return_properties is not None else list(data_types)
+    unknown = [name for name in names if name not in data_types]
+    if unknown:
+        raise ValueError(f"Unknown properties {unknown}, expected some of {list(data_types)}")
+    return pyarrow.schema([("uuid", pyarrow.string())] + [(name, _arrow_type(data_types[name])) for name in names])
+
+
+def _to_arrow_value(value: Any, arrow_type: pyarrow.DataType) -> Any:
+    """Converts a property value to the Arrow type of its column (UUIDs and objects to text)."""
+    if value is None:
+        return None
+    if pyarrow.types.is_list(arrow_type):
+        return [_to_arrow_value(item, arrow_type.value_type) for item in value]
+    if pyarrow.types.is_string(arrow_type) and not isinstance(value, str):
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return json.dumps(value, ensure_ascii=False, default=_serialize)
+    return value
+
+
+def _write_shard(
+    rows: List[Dict[str, Any]],
+    path: str,
+    file_format: str,
+    compression: str,
+    schema: Optional[pyarrow.Schema] = None,
+):
+    """Writes the rows of a shard to a temporary file renamed over `path` once complete."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if file_format == "parquet":
+        rows = [{field.name: _to_arrow_value(row.get(field.name), field.type) for field in schema} for row in rows]
+        table = pyarrow.Table.from_pylist(rows, schema=schema)
+        pyarrow.parquet.write_table(table, tmp_path, compression=compression)
+    else:
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False, default=_serialize) + "\n")
+    os.replace(tmp_path, path)
+
+
+def _load_manifest(manifest_path: str) -> Optional[dict]:
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _save_manifest(manifest: dict, manifest_path: str):
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def export_collection(
+    collection,
+    output_dir: str,
+    num_shards: int = 64,
+    workers: int = 8,
+    return_properties: Optional[Sequence[str]] = None,
+    page_size: int = 1000,
+    file_format: str = "parquet",
+    compression: str = "zstd",
+) -> dict:
+    """
+    Exports a Weaviate collection to shards, one per UUID range, read concurrently.
+
+    Each shard is written to a temporary file renamed once complete, and recorded in
+    `manifest.json` with its range and row count. Running the export again with the same
+    settings only exports the shards missing from the manifest, so an interrupted export
+    resumes where it stopped. Parquet shards share one schema, see `arrow_schema`.
+
+    A shard is held in memory before it is written: raise `num_shards` for collections
+    that do not fit in memory `workers` times over.
+
+    Args:
+        collection: The Weaviate collection (v4 client), e.g. `client.collections.get("Publication_v2")`.
+        output_dir (str): The directory of the shards and the manifest.
+        num_shards (int): Number of UUID ranges (default: 64).
+        workers (int): Number of ranges read concurrently (default: 8).
+        return_properties (Sequence[str], optional): The exported properties (default: all).
+        page_size (int): Number of objects per query (default: 1000).
+        file_format (str): "parquet" or "jsonl" (gzipped JSON lines) (default: "parquet").
+        compression (str): The Parquet compression codec (default: "zstd").
+
+    Returns:
+        dict: The manifest.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format '{file_format}', expected one of {tuple(FORMATS)}")
+    schema = arrow_schema(collection, return_properties) if file_format == "parquet" else None
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE_NAME)
+    settings = {
+        "num_shards": num_shards,
+        "format": file_format,
+        "compression": compression if file_format == "parquet" else None,
+        "properties": list(return_properties) if return_properties is not None else None,
+    }
+    manifest = _load_manifest(manifest_path)
+    if manifest is not None and manifest["settings"] != settings:
+        raise ValueError(f"{manifest_path} was written with other settings {manifest['settings']}, use another output directory")
+    if manifest is None:
+        manifest = {"settings": settings, "shards": {}}
+
+    ranges = uuid_ranges(num_shards)
+    pending = [
+        index for index in range(num_shards)
+        if str(index) not in manifest["shards"]
+        or not os.path.exists(os.path.join(output_dir, manifest["shards"][str(index)]["file"]))
+    ]
+    logger.info("Exporting %d of %d shards to %s", len(pending), num_shards, output_dir)
+
+    def export_shard(index: int) -> dict:
+        after, before = ranges[index]
+        rows = [
+            {"uuid": str(obj.uuid), **obj.properties}
+            for obj in iter_range(collection, after, before, return_properties, page_size)
+        ]
+        file_name = f"shard-{index:05d}-of-{num_shards:05d}{FORMATS[file_format]}"
+        _write_shard(rows, os.path.join(output_dir, file_name), file_format, compression, schema)
+        return {
+            "file": file_name,
+            "after": str(after) if after is not None else None,
+            "before": str(before) if before is not None else None,
+            "rows": len(rows),
+            "exported_at": time.time(),
+        }
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(export_shard, index): index for index in pending}
+        for future in as_completed(futures):
+            manifest["shards"][str(futures[future])] = future.result()
+            _save_manifest(manifest, manifest_path)
+
+    manifest["rows"] = sum(shard["rows"] for shard in manifest["shards"].values())
+    _save_manifest(manifest, manifest_path)
+    logger.info("Exported %d objects in %d shards", manifest["rows"], num_shards)
+    return manifest
@@ -0,0 +1,215 @@
+import json
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Terms ending with "*" match any word starting with them ("regist*" matches "registry",
+# "register", "registered", "registro", ...). Other terms must match whole words.
+DEFAULT_VOCABULARY = [
+    "regist*",
+    "cohort*",
+]
+
+# Registry names in the annotated datasets that do not name a registry.
+NON_REGISTRY_NAMES = {"NONE", "Not specified"}
+
+NEGATIVE_ANNOTATION = {"Registry related": "no"}
+
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher finding all vocabulary terms in a single pass over the text.
+
+    Matching is case-insensitive. Terms ending with "*" are prefix terms, the others
+    only match whole words.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        Args:
+            patterns (Iterable[str]): The terms to search for.
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, int, bool]]] = [[]]
+
+        for pattern in patterns:
+            is_prefix = pattern.endswith("*")
+            term = pattern.rstrip("*").lower()
+            if term:
+                self._add(term, pattern, is_prefix)
+        self._build()
+
+    def _add(self, term: str, pattern: str, is_prefix: bool):
+        state = 0
+        for char in term:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((pattern, len(term), is_prefix))
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Yields the matches found in the text.
+
+        Args:
+            text (str): The text to search.
+
+        Yields:
+            Tuple[int, int, str]: Start offset, end offset and matched pattern.
+        """
+        text = text.lower()
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for pattern, length, is_prefix in self._output[state]:
+                start = index - length + 1
+                end = index + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if not is_prefix and end < len(text) and text[end].isalnum():
+                    continue
+                yield start, end, pattern
+
+    def search(self, text: str) -> Optional[Tuple[int, int, str]]:
+        """Returns the first match in the text, or None."""
+        return next(self.iter_matches(text), None)
+
+
+class RegistryPreFilter:
+    """
+    Keyword pre-filter for the registry extraction prompts.
+
+    Abstracts mentioning none of the registry terms or known registry names are
+    definite negatives: they are labelled "Registry related: no" locally and only the
+    remaining candidates are sent to the LLM.
+    """
+
+    def __init__(self, vocabulary: Iterable[str] = DEFAULT_VOCABULARY, registry_names: Iterable[str] = ()):
+        """
+        Args:
+            vocabulary (Iterable[str]): Registry terms (default: DEFAULT_VOCABULARY).
+            registry_names (Iterable[str]): Known registry names, matched as whole words.
+        """
+        self.vocabulary = list(vocabulary)
+        self.registry_names = sorted({name.strip() for name in registry_names if len(name.strip()) >= 3})
+        self.matcher = AhoCorasick(self.vocabulary + self.registry_names)
+
+    @classmethod
+    def from_registry_names_dataset(cls, registry_names_json: str, vocabulary: Iterable[str] = DEFAULT_VOCABULARY) -> "RegistryPreFilter":
+        """
+        Builds a pre-filter with the registry names of `registry_names_dataset.json`.
+
+        Args:
+            registry_names_json (str): Path to the registry names dataset.
+            vocabulary (Iterable[str]): Registry terms (default: DEFAULT_VOCABULARY).
+
+        Returns:
+            RegistryPreFilter: The pre-filter.
+        """
+        registry_names = [
+            record["registry_name"] for record in load_registry_names_dataset(registry_names_json)
+            if record.get("registry_name") and record["registry_name"] not in NON_REGISTRY_NAMES
+        ]
+        return cls(vocabulary=vocabulary, registry_names=registry_names)
+
+    def matches(self, text: str) -> List[str]:
+        """Returns the distinct patterns found in the text."""
+        return sorted({pattern for _, _, pattern in self.matcher.iter_matches(text)})
+
+    def is_candidate(self, text: str) -> bool:
+        """Whether the text may refer to a patient registry and must be sent to the LLM."""
+        return self.matcher.search(text) is not None
+
+    def evaluate(self, records: Iterable[dict]) -> dict:
+        """
+        Measures the pre-filter against annotated records.
+
+        A record is registry related unless its `registry_name` is "NONE". The positive
+        class is "candidate": recall is the share of registry related records kept for
+        the LLM, and `negative_precision` the share of auto-labelled negatives that are correct.
+
+        Args:
+            records (Iterable[dict]): Records with "title", "abstract" and "registry_name" keys.
+
+        Returns:
+            dict: The metrics.
+        """
+        TP = FP = FN = TN = 0
+        for record in records:
+            y_true = record.get("registry_name") != "NONE"
+            y_pred = self.is_candidate(make_text(record))
+            if y_true and y_pred:
+                TP += 1
+            elif y_pred:
+                FP += 1
+            elif y_true:
+                FN += 1
+            else:
+                TN += 1
+
+        total = TP + FP + FN + TN
+        return {
+            "total": total,
+            "precision": TP / (TP + FP) if TP + FP else None,
+            "recall": TP / (TP + FN) if TP + FN else None,
+            "negative_precision": TN / (TN + FN) if TN + FN else None,
+            "skipped_perc": (TN + FN) / total * 100 if total else None,
+            "TP": TP,
+            "FP": FP,
+            "FN": FN,
+            "TN": TN,
+        }
+
+
+def make_text(record: dict) -> str:
+    """Concatenates the title and abstract of a publication record."""
+    return f"{record.get('title') or ''}\n{record.get('abstract') or ''}"
+
+
+def make_negative_response(model: str = "keyword-prefilter") -> dict:
+    """
+    Builds a chat-completion-like response for a record labelled negative by the pre-filter,
+    so it can be parsed like any LLM response downstream.
+    """
+    return {
+        "id": None,
+        "object": "chat.completion",
+        "model": model,
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        "choices": [
+            {
+                "index": 0,
+                "message": {
+                    "role": "assistant",
+                    "content": json.dumps(NEGATIVE_ANNOTATION),
+                },
+                "finish_reason": "stop",
+            }
+        ],
+        "prefiltered": True,
+    }
+
+
+def load_registry_names_dataset(registry_names_json: str) -> List[dict]:
+    """Loads the records of `registry_names_dataset.json`."""
+    with open(registry_names_json, "r", encoding="utf-8") as f:
+        return json.load(f)
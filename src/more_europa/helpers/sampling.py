@@ -0,0 +1,139 @@
+import itertools
+import math
+import random
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+
+from weaviate.classes.query import Filter
+
+_END = object()
+
+
+def _open_uniform(rng: random.Random) -> float:
+    """Draws from the open interval (0, 1)."""
+    while True:
+        u = rng.random()
+        if u > 0.0:
+            return u
+
+
+def reservoir_sample(items: Iterable[Any], k: int, seed: Optional[int] = None) -> List[Any]:
+    """
+    Draws k items uniformly from a stream in a single pass, with O(k) memory.
+
+    Uses Li's "Algorithm L", which draws how many items to skip instead of one random
+    number per item. The sample only depends on the seed and the order of the stream.
+
+    Args:
+        items (Iterable[Any]): The stream.
+        k (int): The sample size.
+        seed (int, optional): Seed of the draws.
+
+    Returns:
+        List[Any]: The sample, all the items if there are fewer than k.
+    """
+    rng = random.Random(seed)
+    iterator = iter(items)
+    reservoir = list(itertools.islice(iterator, k))
+    if len(reservoir) < k or k == 0:
+        return reservoir
+
+    w = math.exp(math.log(_open_uniform(rng)) / k)
+    while True:
+        skip = math.floor(math.log(_open_uniform(rng)) / math.log(1 - w))
+        item = next(itertools.islice(iterator, skip, skip + 1), _END)
+        if item is _END:
+            return reservoir
+        reservoir[rng.randrange(k)] = item
+        w *= math.exp(math.log(_open_uniform(rng)) / k)
+
+
+def iter_uuids(collection, page_size: int = 1000) -> Iterator[uuid.UUID]:
+    """
+    Iterates over the ids of a collection, without fetching properties nor vectors.
+    """
+    for obj in collection.iterator(return_properties=[], cache_size=page_size):
+        yield obj.uuid
+
+
+def sample_uuids_by_reservoir(collection, n_samples: int, seed: Optional[int] = None, page_size: int = 1000) -> List[uuid.UUID]:
+    """
+    Samples ids uniformly with a single scan of the ids of the collection.
+    """
+    return reservoir_sample(iter_uuids(collection, page_size), n_samples, seed)
+
+
+def sample_uuids_by_cursor(collection, n_samples: int, seed: Optional[int] = None, max_attempts: Optional[int] = None) -> List[uuid.UUID]:
+    """
+    Samples ids without scanning the collection, with cursors opened at random ids.
+
+    Each draw reads the first object after a random UUID in the id order of the
+    collection, wrapping around to the first object at the end. The sample is biased:
+    an object is drawn with a probability proportional to the gap between its id and
+    the previous one, and even with random ids (uuid4) these gaps vary by several times,
+    whatever the sample size. Use it for quick looks at a large collection, and
+    `sample_uuids_by_reservoir` for a uniform sample.
+
+    Args:
+        collection: The Weaviate collection.
+        n_samples (int): The sample size.
+        seed (int, optional): Seed of the draws.
+        max_attempts (int, optional): Maximum number of cursors (default: 10 times the sample size),
+            fewer ids are returned if the collection is too small.
+
+    Returns:
+        List[uuid.UUID]: The distinct sampled ids.
+    """
+    rng = random.Random(seed)
+    max_attempts = max_attempts if max_attempts is not None else 10 * n_samples
+    sampled = {}
+    for _ in range(max_attempts):
+        if len(sampled) >= n_samples:
+            break
+        after = uuid.UUID(int=rng.getrandbits(128))
+        objects = collection.query.fetch_objects(limit=1, after=after, return_properties=[]).objects
+        if not objects:
+            objects = collection.query.fetch_objects(limit=1, return_properties=[]).objects
+            if not objects:
+                break
+        sampled.setdefault(objects[0].uuid, None)
+    return list(sampled)
+
+
+def fetch_objects_by_ids(
+    collection,
+    uuids: Sequence[uuid.UUID],
+    chunk_size: int = 100,
+    workers: int = 4,
+    return_properties: Optional[Sequence[str]] = None,
+) -> List[Any]:
+    """
+    Fetches objects by id in chunks, concurrently.
+
+    Each chunk sets its query limit to its size, so no object is cut off by the default
+    result limit. Objects are returned in the order of `uuids`, whatever the order in
+    which chunks complete; missing ids are skipped.
+
+    Args:
+        collection: The Weaviate collection.
+        uuids (Sequence[uuid.UUID]): The ids to fetch.
+        chunk_size (int): Number of ids per query (default: 100).
+        workers (int): Number of concurrent queries (default: 4).
+        return_properties (Sequence[str], optional): The properties to fetch (default: all).
+
+    Returns:
+        List[Any]: The fetched objects.
+    """
+    chunks = [list(uuids[start:start + chunk_size]) for start in range(0, len(uuids), chunk_size)]
+
+    def fetch(chunk):
+        return collection.query.fetch_objects(
+            filters=Filter.by_id().contains_any(chunk),
+            limit=len(chunk),
+            return_properties=return_properties,
+        ).objects
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        fetched = {str(obj.uuid): obj for objects in executor.map(fetch, chunks) for obj in objects}
+    return [fetched[str(object_id)] for object_id in uuids if str(object_id) in fetched]
@@ -1,12 +1,21 @@
+import atexit
+import asyncio
 import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
 
 import weaviate
 
 from dotenv import load_dotenv
-load_dotenv()
 
 
-def connect_to_weaviate(*args, **kwargs):
+def get_weaviate_config(**kwargs) -> dict:
+    """
+    Returns the connection settings of the Weaviate instance, read from the WEAVIATE__*
+    environment variables (and `.env`), updated with the given keyword arguments.
+    """
+    load_dotenv()
     config = {
         "http_host": os.getenv("WEAVIATE__HTTP_HOST"),
         "http_port": os.getenv("WEAVIATE__HTTP_PORT"),
@@ -17,7 +26,186 @@ def connect_to_weaviate(*args, **kwargs):
         "skip_init_checks": True,
     }
     config.update(kwargs)
+    return config
+
+
+def connect_to_weaviate(*args, **kwargs):
+    """
+    Opens a new Weaviate client, see `get_weaviate_client` to reuse one.
+    """
+    return weaviate.connect_to_custom(**get_weaviate_config(**kwargs))
+
+
+class WeaviateConnectionManager:
+    """
+    Keeps one Weaviate client, and its gRPC channel, open for the whole process.
+
+    `client()` returns the same connected client on every call, checks that the server
+    is still ready at most every `health_check_interval` seconds and reconnects when it
+    is not. A child process (e.g. a multiprocessing worker) gets its own client instead
+    of sharing the channel of its parent. Used as a context manager, the client is
+    closed on exit.
+
+    `aclient()`, `aclose()` and `async with` are the same for the async client. Its
+    connections belong to the event loop that opened them: a manager used by successive
+    event loops (e.g. several `asyncio.run`) connects a new async client in each of them.
+    """
+
+    def __init__(self, health_check_interval: float = 30.0, **kwargs):
+        """
+        Args:
+            health_check_interval (float): Minimum seconds between two readiness checks (default: 30).
+            **kwargs: Connection settings overriding the environment, see `get_weaviate_config`.
+        """
+        self.config = get_weaviate_config(**kwargs)
+        self.health_check_interval = health_check_interval
+        self._client = None
+        self._async_client = None
+        self._pid = None
+        self._async_pid = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._checked_at = 0.0
+        self._async_checked_at = 0.0
+        self._lock = threading.Lock()
+        self._async_lock: Optional[asyncio.Lock] = None
+
+    def _is_healthy(self, client) -> bool:
+        try:
+            return client.is_connected() and client.is_ready()
+        except Exception:
+            return False
+
+    def client(self) -> weaviate.WeaviateClient:
+        """
+        Returns the client of this process, connecting or reconnecting it if needed.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._client is not None and self._pid != os.getpid():
+                # The parent's channel cannot be used from a child process.
+                self._client = None
+            elif self._client is not None and now - self._checked_at >= self.health_check_interval:
+                if not self._is_healthy(self._client):
+                    self._close_quietly(self._client)
+                    self._client = None
+                self._checked_at = now
+            if self._client is None:
+                self._client = weaviate.connect_to_custom(**self.config)
+                self._pid = os.getpid()
+                self._checked_at = now
+            return self._client
+
+    def close(self):
+        """
+        Closes the client of this process.
+        """
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._close_quietly(self._client)
+            self._client = None
+
+    async def aclient(self) -> weaviate.WeaviateAsyncClient:
+        """
+        Returns the async client of this process, connecting or reconnecting it if needed.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            # The lock and the client of a previous loop can neither be awaited nor used here.
+            self._async_lock = asyncio.Lock()
+            self._async_client = None
+            self._async_loop = loop
+        async with self._async_lock:
+            now = time.monotonic()
+            if self._async_client is not None and self._async_pid != os.getpid():
+                self._async_client = None
+            elif self._async_client is not None and now - self._async_checked_at >= self.health_check_interval:
+                try:
+                    healthy = self._async_client.is_connected() and await self._async_client.is_ready()
+                except Exception:
+                    healthy = False
+                if not healthy:
+                    await self._aclose_quietly(self._async_client)
+                    self._async_client = None
+                self._async_checked_at = now
+            if self._async_client is None:
+                client = weaviate.use_async_with_custom(**self.config)
+                await client.connect()
+                self._async_client = client
+                self._async_pid = os.getpid()
+                self._async_checked_at = now
+            return self._async_client
+
+    async def aclose(self):
+        """
+        Closes the async client of this process, if it belongs to the running event loop.
+        """
+        if (
+            self._async_client is not None
+            and self._async_pid == os.getpid()
+            and self._async_loop is asyncio.get_running_loop()
+        ):
+            await self._aclose_quietly(self._async_client)
+        self._async_client = None
+
+    @staticmethod
+    def _close_quietly(client):
+        try:
+            client.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    async def _aclose_quietly(client):
+        try:
+            await client.close()
+        except Exception:
+            pass
+
+    def __enter__(self) -> weaviate.WeaviateClient:
+        return self.client()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    async def __aenter__(self) -> weaviate.WeaviateAsyncClient:
+        return await self.aclient()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+
+_managers: Dict[Tuple, WeaviateConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(**kwargs) -> WeaviateConnectionManager:
+    """
+    Returns the shared connection manager of the given connection settings.
+    """
+    key = tuple(sorted((name, repr(value)) for name, value in kwargs.items()))
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = _managers[key] = WeaviateConnectionManager(**kwargs)
+        return manager
+
+
+def get_weaviate_client(**kwargs) -> weaviate.WeaviateClient:
+    """
+    Returns the shared, connected client of the given connection settings, see
+    `WeaviateConnectionManager`. It is closed at interpreter exit.
+    """
+    return get_connection_manager(**kwargs).client()
+
+
+def close_weaviate_clients():
+    """
+    Closes the shared clients of this process.
+    """
+    with _managers_lock:
+        managers = list(_managers.values())
+    for manager in managers:
+        manager.close()
 
-    weaviate_client = weaviate.connect_to_custom(**config)
 
-    return weaviate_client
+atexit.register(close_weaviate_clients)
@@ -0,0 +1,91 @@
+import json
+import pytest
+from unittest.mock import MagicMock
+
+from llm_inference.backends.mistral_sync import MistralBackend
+from llm_inference.backends.mistral_async import MistralAsyncBackend
+from llm_inference.backends.mistral_batch import MistralBatchBackend
+
+
+def make_body(content, finish_reason, completion_tokens=5):
+    return {
+        "id": "fake-id",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": completion_tokens, "total_tokens": 10 + completion_tokens},
+    }
+
+
+def make_response(content, finish_reason, completion_tokens=5):
+    response = MagicMock()
+    response.model_dump.return_value = make_body(content, finish_reason, completion_tokens)
+    return response
+
+
+def test_infer_one_continues_truncated_response(model_config):
+    backend = MistralBackend(api_key="fake-api-key")
+    backend.client = MagicMock()
+    backend.client.chat.complete = MagicMock(side_effect=[
+        make_response('{"Registry related": "ye', "length"),
+        make_response('s"}', "stop", completion_tokens=2),
+    ])
+
+    result = backend.infer_one("Test prompt", model_config=model_config)
+
+    continuation_messages = backend.client.chat.complete.call_args.kwargs["messages"]
+    assert continuation_messages[-1] == {"role": "assistant", "content": '{"Registry related": "ye', "prefix": True}
+    assert json.loads(result["choices"][0]["message"]["content"]) == {"Registry related": "yes"}
+    assert result["choices"][0]["finish_reason"] == "stop"
+    assert result["usage"]["completion_tokens"] == 7
+    assert result["continuations"] == 1
+
+
+def test_continuation_repeating_prefix_is_not_duplicated(model_config):
+    backend = MistralBackend(api_key="fake-api-key")
+    backend.client = MagicMock()
+    backend.client.chat.complete = MagicMock(side_effect=[
+        make_response('{"a": ', "length"),
+        make_response('{"a": 1}', "stop"),
+    ])
+
+    result = backend.infer_one("Test prompt", model_config=model_config)
+
+    assert result["choices"][0]["message"]["content"] == '{"a": 1}'
+
+
+@pytest.mark.asyncio
+async def test_async_continuation_is_bounded(model_config):
+    backend = MistralAsyncBackend(api_key="dummy-key")
+    backend.max_continuations = 2
+    backend.client.chat.complete = MagicMock(return_value=make_response("x", "length"))
+
+    result = await backend.infer_one("Test prompt", model_config=model_config)
+
+    assert backend.client.chat.complete.call_count == 3
+    assert result["continuations"] == 2
+
+
+def test_batch_continues_truncated_results(model_config):
+    backend = MistralBatchBackend(api_key="dummy")
+    outputs = [
+        [
+            {"custom_id": "0", "response": {"body": make_body('{"a": ', "length")}},
+            {"custom_id": "1", "response": {"body": make_body('{"b": 2}', "stop")}},
+        ],
+        [
+            {"custom_id": "0", "response": {"body": make_body('1}', "stop")}},
+        ],
+    ]
+    submitted = []
+
+    def fake_run_batch(batch_data, model_config):
+        submitted.append(batch_data)
+        return outputs[len(submitted) - 1]
+
+    backend._run_batch = fake_run_batch
+
+    results = list(backend.infer_many(["Prompt 0", "Prompt 1"], model_config=model_config, use_cache=False))
+
+    assert [item["custom_id"] for item in submitted[1]] == ["0"]
+    assert submitted[1][0]["body"]["messages"][-1]["prefix"] is True
+    assert results[0]["choices"][0]["message"]["content"] == '{"a": 1}'
+    assert results[1]["choices"][0]["message"]["content"] == '{"b": 2}'
@@ -63,6 +63,24 @@ def test_infer_one_with_cache(mistral_backend_with_cache, model_config, llm_raw_
     prompt = "Test prompt"
     result = mistral_backend_with_cache.infer_one(prompt, model_config=model_config)
     # Verify that chat.complete was called with the expected parameters.
-    result_from_cache = mistral_backend_with_cache.cache_storage.get(prompt)
+    cache_key = mistral_backend_with_cache.cache_key_builder.build(prompt, model_config)
+    result_from_cache = mistral_backend_with_cache.cache_storage.get(cache_key)
 
     assert result == result_from_cache
+
+def test_cache_key_builder_namespace(mistral_fake_response, model_config):
+    from llm_inference.cache.keys import CacheKeyBuilder
+    from llm_inference.cache.tmp import TmpCacheStorage
+
+    backend = MistralBackend(
+        api_key="fake-api-key",
+        cache_storage=TmpCacheStorage(),
+        cache_key_builder=CacheKeyBuilder(namespace="w01"),
+    )
+    backend.client = MagicMock()
+    backend.client.chat.complete = MagicMock(return_value=mistral_fake_response)
+    backend.infer_one("Test prompt", model_config=model_config)
+
+    cache_key = backend.cache_key_builder.build("Test prompt", model_config)
+    assert cache_key.namespace == "w01"
+    assert backend.cache_storage.get(cache_key) is not None
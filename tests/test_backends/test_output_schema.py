@@ -0,0 +1,99 @@
+import json
+import pytest
+from unittest.mock import MagicMock
+
+from llm_inference.backends.mistral_sync import MistralBackend
+from llm_inference.backends.mistral_async import MistralAsyncBackend
+from llm_inference.cache.tmp import TmpCacheStorage
+from llm_inference.schema import OutputSchema, ROOT_FIELD
+
+
+@pytest.fixture
+def output_schema():
+    return OutputSchema.from_dict({
+        "name": "test_schema",
+        "stop_when": {"Registry related": "no"},
+        "fields": [
+            {"name": "Registry related", "pattern": "(?i)^(yes|no)$"},
+            {"name": "Population sex", "choices": ["Male", "Female", "Not specified"], "separator": "[|,]"},
+            {"name": "Population size", "types": ["integer", "string"], "pattern": "(?i)^(\\d+|not specified)$"},
+        ],
+    })
+
+
+def make_response(content):
+    class FakeResponse:
+        def model_dump(self):
+            return {
+                "id": "fake-id",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": json.dumps(content)}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+            }
+    return FakeResponse()
+
+
+def test_validate(output_schema):
+    assert output_schema.validate({"Registry related": "no"}) == {}
+    assert output_schema.validate({"Registry related": "yes", "Population sex": "Male | Female", "Population size": 313}) == {}
+
+    errors = output_schema.validate({"Registry related": "yes", "Population sex": "men"})
+    assert set(errors) == {"Population sex", "Population size"}
+    assert errors["Population size"] == "missing"
+
+    assert ROOT_FIELD in output_schema.validate(None)
+
+
+def test_reask_prompt_lists_only_invalid_fields(output_schema):
+    prompt = output_schema.make_reask_prompt({"Population size": "missing"})
+    assert '"Population size"' in prompt
+    assert '"Population sex"' not in prompt
+
+
+def test_infer_one_reasks_invalid_fields(model_config, output_schema):
+    backend = MistralBackend(api_key="fake-api-key", cache_storage=TmpCacheStorage(), output_schema=output_schema)
+    backend.client = MagicMock()
+    backend.client.chat.complete = MagicMock(side_effect=[
+        make_response({"Registry related": "yes", "Population sex": "Male", "Population size": "many"}),
+        make_response({"Population size": 42}),
+    ])
+
+    result = backend.infer_one("Test prompt", model_config=model_config)
+
+    assert backend.client.chat.complete.call_count == 2
+    reask_messages = backend.client.chat.complete.call_args.kwargs["messages"]
+    assert [message["role"] for message in reask_messages] == ["user", "assistant", "user"]
+    assert '"Population size"' in reask_messages[-1]["content"]
+    assert json.loads(result["choices"][0]["message"]["content"])["Population size"] == 42
+    assert result["output_schema"]["errors"] == {}
+    assert result["output_schema"]["reasks"] == 1
+
+    # The validated result is cached and never checked again.
+    assert backend.infer_one("Test prompt", model_config=model_config) == result
+    assert backend.client.chat.complete.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_async_infer_one_short_circuit(model_config, output_schema):
+    backend = MistralAsyncBackend(api_key="dummy-key", output_schema=output_schema)
+    backend.client.chat.complete = MagicMock(return_value=make_response({"Registry related": "no"}))
+
+    result = await backend.infer_one("Test prompt", model_config=model_config)
+
+    backend.client.chat.complete.assert_called_once()
+    assert result["output_schema"]["errors"] == {}
+    assert result["output_schema"]["reasks"] == 0
+
+
+@pytest.mark.asyncio
+async def test_async_infer_one_reasks_invalid_fields(model_config, output_schema):
+    backend = MistralAsyncBackend(api_key="dummy-key", output_schema=output_schema)
+    backend.client.chat.complete = MagicMock(side_effect=[
+        make_response({"Registry related": "yes", "Population sex": "Male", "Population size": "many"}),
+        make_response({"Population size": 42}),
+    ])
+
+    result = await backend.infer_one("Test prompt", model_config=model_config)
+
+    assert backend.client.chat.complete.call_count == 2
+    assert json.loads(result["choices"][0]["message"]["content"])["Population size"] == 42
+    assert result["output_schema"]["reasks"] == 1
@@ -0,0 +1,90 @@
+from unittest.mock import MagicMock
+
+from llm_inference.backends.mistral_sync import MistralBackend
+from llm_inference.token_budget import CompletionLengthTracker
+
+
+def make_response(content, finish_reason, completion_tokens):
+    response = MagicMock()
+    response.model_dump.return_value = {
+        "id": "fake-id",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": completion_tokens, "total_tokens": 10 + completion_tokens},
+    }
+    return response
+
+
+def test_suggest_max_tokens():
+    tracker = CompletionLengthTracker(percentile=90, margin=0.5, min_tokens=8, min_samples=10)
+    key = tracker.template_key("Template\n\nTitle: A")
+    assert key == tracker.template_key("Template\n\nTitle: A")
+
+    # Not enough observations: keep the configured value.
+    assert tracker.suggest_max_tokens(key, "model", 1024) == 1024
+
+    for completion_tokens in range(1, 21):
+        tracker.record(key, "model", completion_tokens)
+    assert tracker.quantile(key, "model") == 18.1
+    assert tracker.suggest_max_tokens(key, "model", 1024) == 28
+    # The configured value stays the ceiling.
+    assert tracker.suggest_max_tokens(key, "model", 16) == 16
+    # Observations are kept per model.
+    assert tracker.suggest_max_tokens(key, "other-model", 1024) == 1024
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "completion_lengths.json")
+    tracker = CompletionLengthTracker(min_samples=1, path=path, save_every=2)
+    tracker.record("template", "model", 10)
+    tracker.record("template", "model", 30)
+
+    reloaded = CompletionLengthTracker(min_samples=1, path=path)
+    assert reloaded.quantile("template", "model") == tracker.quantile("template", "model")
+
+
+def test_registered_templates():
+    tracker = CompletionLengthTracker(prefix_chars=16)
+    v1 = tracker.register_template("Annotate the abstract.")
+    v1_1 = tracker.register_template("Annotate the abstract. Also list the registries.")
+    assert v1 != v1_1
+
+    # Templates sharing their leading characters are told apart.
+    assert tracker.template_key("Annotate the abstract.\n\nTitle: A") == v1
+    assert tracker.template_key("Annotate the abstract. Also list the registries.\n\nTitle: A") == v1_1
+    # The record does not change the key of a template shorter than `prefix_chars`.
+    short = tracker.register_template("Compare.", template_id="compare")
+    assert tracker.template_key("Compare.\n\nA") == tracker.template_key("Compare.\n\nB") == short
+    # Unregistered prompts fall back to their leading characters.
+    assert tracker.template_key("Other template\n\nTitle: A") == tracker.template_key("Other template\n\nTitle: B")
+
+
+def test_close_saves_unsaved_observations(tmp_path):
+    path = str(tmp_path / "completion_lengths.json")
+    tracker = CompletionLengthTracker(min_samples=1, path=path, save_every=100)
+    tracker.record("template", "model", 10)
+    tracker.close()
+
+    reloaded = CompletionLengthTracker(min_samples=1, path=path)
+    assert reloaded.quantile("template", "model") == 10
+
+
+def test_infer_one_uses_tuned_max_tokens(model_config):
+    model_config = dict(model_config, max_tokens=1024)
+    tracker = CompletionLengthTracker(margin=0.0, min_tokens=1, min_samples=1, prefix_chars=8)
+    tracker.record(tracker.template_key("Template: record 1"), model_config["model"], 10)
+
+    backend = MistralBackend(api_key="fake-api-key", token_budget=tracker)
+    backend.client = MagicMock()
+    backend.client.chat.complete = MagicMock(side_effect=[
+        make_response('{"a": ', "length", 10),
+        make_response('1}', "stop", 3),
+    ])
+
+    result = backend.infer_one("Template: record 2", model_config=model_config)
+
+    first_call, continuation_call = backend.client.chat.complete.call_args_list
+    assert first_call.kwargs["max_tokens"] == 10
+    # The truncated answer is continued with the configured, higher cap.
+    assert continuation_call.kwargs["max_tokens"] == 1024
+    assert result["usage"]["completion_tokens"] == 13
+    assert tracker.quantile(tracker.template_key("Template: record 2"), model_config["model"]) > 10
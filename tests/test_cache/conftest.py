@@ -0,0 +1,48 @@
+import pytest
+
+
+@pytest.fixture
+def model_config():
+    return {
+        "model": "mistral-large-latest",
+        "temperature": 0.7,
+        "max_tokens": 5,
+        "random_seed": 42,
+        "response_format": {"type": "json_object"},
+    }
+
+
+@pytest.fixture
+def llm_raw_response():
+    return {
+        "id": "ce5d302de2204802a2a31f98cac5f88a",
+        "object": "chat.completion",
+        "model": "mistral-large-latest",
+        "usage": {"prompt_tokens": 437, "completion_tokens": 82, "total_tokens": 519},
+        "created": 1740663485,
+        "choices": [
+            {
+                "index": 0,
+                "message": {
+                    "content": '{"Registry related": "no"}',
+                    "tool_calls": None,
+                    "prefix": False,
+                    "role": "assistant",
+                },
+                "finish_reason": "stop",
+            }
+        ],
+    }
+
+
+class FakeResponseFromRaw:
+    def __init__(self, raw_response):
+        self._raw_response = raw_response
+
+    def model_dump(self):
+        return self._raw_response
+
+
+@pytest.fixture
+def mistral_fake_response(llm_raw_response):
+    return FakeResponseFromRaw(llm_raw_response)
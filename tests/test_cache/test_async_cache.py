@@ -0,0 +1,125 @@
+import asyncio
+import gc
+import threading
+import weakref
+
+import pytest
+from unittest.mock import MagicMock, Mock
+
+from llm_inference.backends.mistral_async import MistralAsyncBackend
+from llm_inference.cache.tiered import TieredCacheStorage
+from llm_inference.cache.tmp import TmpCacheStorage
+from llm_inference.cache.write_behind import WriteBehindCacheStorage
+
+
+@pytest.mark.asyncio
+async def test_sync_storages_run_in_the_cache_executor():
+    storage = TmpCacheStorage()
+    threads = []
+    storage.get = MagicMock(side_effect=lambda key: threads.append(threading.current_thread().name))
+
+    await storage.aput("key", {"data": "value"})
+    await storage.aget("key")
+    assert threads[0].startswith("llm-cache")
+
+
+@pytest.mark.asyncio
+async def test_tiered_memory_hits_stay_on_the_event_loop():
+    storage = TmpCacheStorage()
+    cache_storage = TieredCacheStorage(storage)
+    await cache_storage.aput("key", {"data": "value"})
+    storage.get = MagicMock()
+
+    assert await cache_storage.aget("key") == {"data": "value"}
+    storage.get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_write_behind_batches_puts():
+    storage = TmpCacheStorage()
+    storage.put_many = MagicMock(wraps=storage.put_many)
+    cache_storage = WriteBehindCacheStorage(storage, batch_size=3, flush_interval=10)
+
+    await cache_storage.aput("a", 1)
+    await cache_storage.aput("b", 2)
+    # Buffered entries are readable before they are written.
+    assert await cache_storage.aget_many(["a", "b", "c"]) == [1, 2, None]
+    assert storage.get("a") is None
+
+    await cache_storage.aput("c", 3)
+    for _ in range(100):
+        if storage.get("c") is not None:
+            break
+        await asyncio.sleep(0.01)
+    assert storage.get_many(["a", "b", "c"]) == [1, 2, 3]
+    storage.put_many.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_write_behind_flushes_on_close():
+    storage = TmpCacheStorage()
+    cache_storage = WriteBehindCacheStorage(storage, batch_size=100, flush_interval=10)
+    await cache_storage.aput("key", {"data": "value"})
+    assert storage.get("key") is None
+
+    await cache_storage.aclose()
+    assert storage.get("key") == {"data": "value"}
+
+
+@pytest.mark.filterwarnings("ignore:coroutine .* was never awaited")
+def test_write_behind_across_event_loops():
+    storage = TmpCacheStorage()
+    cache_storage = WriteBehindCacheStorage(storage, batch_size=2, flush_interval=0.05)
+
+    # A loop closed while its flush task is still pending.
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(cache_storage.aput("a", 1))
+    loop.close()
+
+    async def put_and_close():
+        await cache_storage.aput_many([("b", 2), ("c", 3)])
+        for _ in range(100):
+            if storage.get("c") is not None:
+                break
+            await asyncio.sleep(0.01)
+        assert storage.get_many(["a", "b", "c"]) == [1, 2, 3]
+        await cache_storage.aput("d", 4)
+        await cache_storage.aclose()
+
+    asyncio.run(asyncio.wait_for(put_and_close(), timeout=5))
+    assert storage.get("d") == 4
+    gc.collect()  # Collects the abandoned task of the first loop within this test.
+
+
+def test_write_behind_sync_puts():
+    storage = TmpCacheStorage()
+    cache_storage = WriteBehindCacheStorage(storage, batch_size=2)
+    cache_storage.put("a", 1)
+    assert cache_storage.get("a") == 1 and storage.get("a") is None
+    cache_storage.put("b", 2)
+    assert storage.get_many(["a", "b"]) == [1, 2]
+
+
+def test_write_behind_storages_are_garbage_collected():
+    inner = TmpCacheStorage()
+    storage = WriteBehindCacheStorage(inner, batch_size=10)
+    storage.put("key", "value")
+    reference = weakref.ref(storage)
+    del storage
+    gc.collect()
+    assert reference() is None
+
+    # The buffered entry was written when the storage was collected.
+    assert inner.get("key") == "value"
+
+
+@pytest.mark.asyncio
+async def test_async_backend_uses_async_cache(model_config, mistral_fake_response):
+    cache_storage = WriteBehindCacheStorage(TmpCacheStorage(), flush_interval=10)
+    backend = MistralAsyncBackend(api_key="dummy-key", cache_storage=cache_storage)
+    backend.client.chat.complete = Mock(return_value=mistral_fake_response)
+
+    first = await backend.infer_one("prompt", model_config)
+    assert await backend.infer_one("prompt", model_config) == first
+    assert backend.client.chat.complete.call_count == 1
+    await cache_storage.aclose()
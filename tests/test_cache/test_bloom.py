@@ -0,0 +1,100 @@
+import os
+
+from llm_inference.cache.bloom import BloomFilter, CacheKeyFilter
+from llm_inference.cache.disk import DiskCacheStorage
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f"key{i}" for i in range(1000)]
+    for key in keys:
+        bloom_filter.add(key)
+    assert all(key in bloom_filter for key in keys)
+
+    false_positives = sum(f"other{i}" in bloom_filter for i in range(10_000))
+    assert false_positives < 300
+
+    restored = BloomFilter.from_bytes(bloom_filter.to_bytes())
+    assert all(key in restored for key in keys)
+    assert restored.capacity == 1000
+
+
+def test_misses_skip_the_filesystem(tmp_path, monkeypatch):
+    storage = DiskCacheStorage(cache_dir=str(tmp_path), bloom_filter=True, bloom_capacity=1000)
+    storage.put("key", {"data": "value"})
+
+    probes = []
+    original_exists = os.path.exists
+    monkeypatch.setattr("llm_inference.cache.disk.os.path.exists", lambda path: probes.append(path) or original_exists(path))
+    assert storage.get("missing") is None
+    assert probes == []
+    assert storage.get("key") == {"data": "value"}
+    assert probes != []
+
+
+def test_filter_is_built_from_existing_entries_and_persisted(tmp_path):
+    writer = DiskCacheStorage(cache_dir=str(tmp_path))
+    for i in range(10):
+        writer.put(f"key{i}", i)
+
+    reader = DiskCacheStorage(cache_dir=str(tmp_path), bloom_filter=True, bloom_capacity=1000)
+    assert reader.get_many([f"key{i}" for i in range(11)]) == list(range(10)) + [None]
+    assert os.path.exists(reader.key_filter.snapshot_path)
+
+    reader.put("new", "value")
+    reopened = DiskCacheStorage(cache_dir=str(tmp_path), bloom_filter=True)
+    assert reopened.key_filter._read_snapshot().count == 10
+    assert reopened.get("new") == "value"
+
+
+def test_keys_written_by_other_processes_are_seen_after_refresh(tmp_path):
+    first = CacheKeyFilter(str(tmp_path), list_keys=lambda: [], capacity=100, refresh_interval=0)
+    second = CacheKeyFilter(str(tmp_path), list_keys=lambda: [], capacity=100, refresh_interval=3600)
+    assert not second.might_contain("key")
+
+    first.add("key")
+    second.refresh_interval = 0
+    assert second.might_contain("key")
+
+    first.compact()
+    assert not os.path.exists(first.journal_path)
+    assert second.might_contain("key")
+    assert CacheKeyFilter(str(tmp_path), list_keys=lambda: []).might_contain("key")
+
+
+def test_filter_grows_when_full(tmp_path):
+    keys = []
+    key_filter = CacheKeyFilter(str(tmp_path), list_keys=lambda: list(keys), capacity=10)
+    for i in range(25):
+        keys.append(f"key{i}")
+        key_filter.add(f"key{i}")
+    assert key_filter._filter.capacity >= 20
+    assert all(key_filter.might_contain(key) for key in keys)
+
+
+def test_misses_without_journal_do_not_reopen_it(tmp_path, monkeypatch):
+    key_filter = CacheKeyFilter(str(tmp_path), list_keys=lambda: [], capacity=100, refresh_interval=3600)
+    assert not key_filter.might_contain("missing")
+
+    opened = []
+    original_open = open
+    monkeypatch.setattr("builtins.open", lambda path, *args, **kwargs: opened.append(path) or original_open(path, *args, **kwargs))
+    assert not key_filter.might_contain("other")
+    assert opened == []
+
+
+def test_keys_written_by_other_processes_are_seen_before_refresh(tmp_path):
+    first = CacheKeyFilter(str(tmp_path), list_keys=lambda: [], capacity=100)
+    second = CacheKeyFilter(str(tmp_path), list_keys=lambda: [], capacity=100, refresh_interval=3600)
+    assert not second.might_contain("key")
+    first.add("key")
+    assert second.might_contain("key")
+
+
+def test_journal_is_compacted_when_it_grows(tmp_path):
+    key_filter = CacheKeyFilter(str(tmp_path), list_keys=lambda: [], capacity=1000, max_journal_bytes=100)
+    for i in range(30):
+        key_filter.add(f"key{i}")
+    assert os.path.getsize(key_filter.journal_path) <= 100
+    assert key_filter._read_snapshot().count >= 15
+    assert all(key_filter.might_contain(f"key{i}") for i in range(30))
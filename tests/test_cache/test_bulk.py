@@ -0,0 +1,76 @@
+import pytest
+from unittest.mock import MagicMock, Mock
+
+from llm_inference.backends.mistral_async import MistralAsyncBackend
+from llm_inference.backends.mistral_sync import MistralBackend
+from llm_inference.cache.sqlite import SqliteCacheStorage
+from llm_inference.cache.tiered import TieredCacheStorage
+from llm_inference.cache.tmp import TmpCacheStorage
+
+
+@pytest.fixture(params=["tmp", "sqlite", "tiered", "lmdb"])
+def cache_storage(request, tmp_path):
+    if request.param == "tmp":
+        return TmpCacheStorage()
+    if request.param == "sqlite":
+        return SqliteCacheStorage(db_path=str(tmp_path / "cache.sqlite3"), batch_size=2)
+    if request.param == "tiered":
+        return TieredCacheStorage(TmpCacheStorage())
+    pytest.importorskip("lmdb")
+    from llm_inference.cache.lmdb import LmdbCacheStorage
+    return LmdbCacheStorage(path=str(tmp_path / "lmdb"))
+
+
+def test_get_many_and_put_many(cache_storage):
+    cache_storage.put_many([(f"key{i}", {"i": i}) for i in range(5)])
+    cache_storage.put("other", {"i": -1})
+    assert cache_storage.get_many(["key3", "missing", "key0", "other", "key3"]) == [
+        {"i": 3}, None, {"i": 0}, {"i": -1}, {"i": 3},
+    ]
+    assert cache_storage.get_many([]) == []
+
+
+def test_sqlite_get_many_spans_several_queries(tmp_path):
+    with SqliteCacheStorage(db_path=str(tmp_path / "cache.sqlite3")) as storage:
+        storage.put_many([(f"key{i}", i) for i in range(1200)])
+        storage.flush()
+        assert storage.get_many([f"key{i}" for i in range(1201)]) == list(range(1200)) + [None]
+
+
+def test_infer_many_prefetches_cache_hits(model_config, mistral_fake_response):
+    cache_storage = TmpCacheStorage()
+    backend = MistralBackend(api_key="fake-api-key", cache_storage=cache_storage)
+    backend.client = MagicMock()
+    backend.client.chat.complete = MagicMock(return_value=mistral_fake_response)
+    backend.infer_one("Cached prompt", model_config)
+    backend.client.chat.complete.reset_mock()
+    cache_storage.get_many = MagicMock(wraps=cache_storage.get_many)
+
+    prompts = [
+        {"custom_id": "a", "prompt": "New prompt"},
+        {"custom_id": "b", "prompt": "Cached prompt"},
+        {"custom_id": "c", "prompt": "New prompt"},
+    ]
+    results = list(backend.infer_many(prompts, model_config))
+
+    # Cache hits come first, misses are inferred once per distinct prompt.
+    assert [result["custom_id"] for result in results] == ["b", "a", "c"]
+    assert backend.client.chat.complete.call_count == 1
+    cache_storage.get_many.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_async_infer_many_prefetches_cache_hits(model_config, mistral_fake_response):
+    cache_storage = TmpCacheStorage()
+    backend = MistralAsyncBackend(api_key="dummy-key", cache_storage=cache_storage)
+    backend.client.chat.complete = Mock(return_value=mistral_fake_response)
+    await backend.infer_one("Cached prompt", model_config)
+    backend.client.chat.complete.reset_mock()
+    cache_storage.get_many = MagicMock(wraps=cache_storage.get_many)
+
+    prompts = [{"custom_id": "a", "prompt": "New prompt"}, {"custom_id": "b", "prompt": "Cached prompt"}]
+    results = [result async for result in backend.infer_many(prompts, model_config=model_config)]
+
+    assert [result["custom_id"] for result in results] == ["b", "a"]
+    assert backend.client.chat.complete.call_count == 1
+    cache_storage.get_many.assert_called_once()
@@ -0,0 +1,95 @@
+import json
+import os
+import time
+
+import pytest
+
+from llm_inference.cache import cli
+from llm_inference.cache.codec import ValueCodec
+from llm_inference.cache.disk import DiskCacheStorage
+from llm_inference.cache.keys import CacheKeyBuilder
+from llm_inference.cache.sqlite import SqliteCacheStorage
+
+
+def make_disk_cache(path, model_config):
+    storage = DiskCacheStorage(cache_dir=str(path), pin_current_run=False)
+    for namespace in ["w01", "w02"]:
+        builder = CacheKeyBuilder(namespace=namespace)
+        for i in range(3):
+            storage.put(builder.build(f"prompt {i}", model_config), {"i": i, "namespace": namespace})
+    storage.put("legacy key", {"i": -1})
+    return storage
+
+
+def test_stats(tmp_path, model_config, capsys):
+    make_disk_cache(tmp_path, model_config)
+    cli.main(["stats", str(tmp_path), "--json"])
+    stats = json.loads(capsys.readouterr().out)
+    assert stats["entries"] == 7
+    assert stats["namespaces"] == {"w01": 3, "w02": 3, "<legacy>": 1}
+    assert stats["age_histogram"]["< 1 day"] == 7
+
+
+def test_prune_by_namespace_and_age(tmp_path, model_config):
+    storage = make_disk_cache(tmp_path, model_config)
+    old_key = CacheKeyBuilder(namespace="w01").build("prompt 0", model_config)
+    old_path = storage._cache_path(old_key.hashed)
+    os.utime(old_path, (time.time() - 40 * cli.DAY, time.time() - 40 * cli.DAY))
+
+    cli.main(["prune", str(tmp_path), "--namespace", "w02", "--dry_run"])
+    assert len(list(storage.iter_entries())) == 7
+
+    cli.main(["prune", str(tmp_path), "--namespace", "w02", "--older_than", "30"])
+    assert len(list(storage.iter_entries())) == 3
+    assert storage.get(old_key) is None
+
+
+def test_prune_by_size():
+    entries = [cli.CacheEntry(f"k{i}", size=100, created_at=0, accessed_at=i) for i in range(10)]
+    pruned = cli.select_prunable(entries, max_bytes=550)
+    assert [entry.hashed_key for entry in pruned] == ["k0", "k1", "k2", "k3", "k4"]
+
+
+def test_verify(tmp_path, model_config, capsys):
+    storage = make_disk_cache(tmp_path, model_config)
+    with open(storage._cache_path(storage._get_hashed_key("legacy key")), "w") as f:
+        f.write("{truncated")
+
+    errors = cli.verify(storage, workers=2)
+    assert [hashed_key for hashed_key, _ in errors] == [storage._get_hashed_key("legacy key")]
+    cli.main(["verify", str(tmp_path), "--delete"])
+    assert "1 corrupted entries deleted" in capsys.readouterr().out
+    assert cli.verify(storage, workers=2) == []
+
+
+def test_export_import_and_copy(tmp_path, model_config):
+    storage = make_disk_cache(tmp_path / "disk", model_config)
+    key = CacheKeyBuilder(namespace="w01").build("prompt 1", model_config)
+
+    cli.main(["export", str(tmp_path / "disk"), str(tmp_path / "export.jsonl.gz")])
+    cli.main(["import", str(tmp_path / "export.jsonl.gz"), f"sqlite:{tmp_path / 'imported.sqlite3'}", "--compression", "zlib"])
+    with SqliteCacheStorage(db_path=str(tmp_path / "imported.sqlite3")) as imported:
+        assert len(imported) == 7
+        assert imported.get(key) == storage.get(key)
+
+    cli.main(["copy", f"sqlite:{tmp_path / 'imported.sqlite3'}", f"disk:{tmp_path / 'copy'}"])
+    copy = DiskCacheStorage(cache_dir=str(tmp_path / "copy"), codec=ValueCodec(compression="zlib"))
+    assert copy.get(key) == storage.get(key)
+    assert copy.get("legacy key") == {"i": -1}
+
+
+def test_stats_and_prune_of_a_pack(tmp_path, model_config, capsys):
+    make_disk_cache(tmp_path / "disk", model_config)
+    cli.main(["pack", str(tmp_path / "disk"), str(tmp_path / "entries.pack")])
+    capsys.readouterr()
+
+    cli.main(["stats", str(tmp_path / "entries.pack"), "--json"])
+    stats = json.loads(capsys.readouterr().out)
+    assert stats["entries"] == 7
+    assert stats["namespaces"] == {"w01": 3, "w02": 3, "<legacy>": 1}
+
+    cli.main(["prune", str(tmp_path / "entries.pack"), "--namespace", "w02", "--dry_run"])
+    assert "Would delete 3 entries" in capsys.readouterr().out
+    with pytest.raises(SystemExit):
+        cli.main(["prune", str(tmp_path / "entries.pack"), "--namespace", "w02"])
+    assert "read-only" in capsys.readouterr().err
@@ -0,0 +1,100 @@
+import json
+import os
+
+import pytest
+
+from llm_inference.cache.codec import MISTRAL_UNUSED_FIELDS, ValueCodec, decode_value, project
+from llm_inference.cache.disk import DiskCacheStorage
+from llm_inference.cache.sqlite import SqliteCacheStorage
+from llm_inference.cache.tmp import TmpCacheStorage
+
+
+def test_project_drops_nested_fields(llm_raw_response):
+    projected = project(llm_raw_response, MISTRAL_UNUSED_FIELDS)
+    assert set(projected) == {"model", "usage", "choices"}
+    assert projected["choices"][0]["message"] == {"content": '{"Registry related": "no"}', "role": "assistant"}
+    assert projected["choices"][0]["finish_reason"] == "stop"
+    # The input is left untouched.
+    assert "tool_calls" in llm_raw_response["choices"][0]["message"]
+
+
+def test_zlib_codec_round_trip(llm_raw_response):
+    codec = ValueCodec(drop_fields=MISTRAL_UNUSED_FIELDS, compression="zlib")
+    data = codec.encode(llm_raw_response)
+    assert len(data) < len(json.dumps(llm_raw_response))
+    assert codec.decode(data) == project(llm_raw_response, MISTRAL_UNUSED_FIELDS)
+
+
+def test_decoding_is_transparent(llm_raw_response):
+    plain = json.dumps(llm_raw_response).encode("utf-8")
+    compressed = ValueCodec(compression="zlib").encode(llm_raw_response)
+    assert decode_value(plain) == llm_raw_response
+    assert decode_value(plain.decode("utf-8")) == llm_raw_response
+    assert decode_value(compressed) == llm_raw_response
+
+
+def test_zstd_codec_with_dictionary(llm_raw_response):
+    zstandard = pytest.importorskip("zstandard")
+    from llm_inference.cache.codec import train_zstd_dictionary
+
+    samples = []
+    for i in range(500):
+        sample = json.loads(json.dumps(llm_raw_response))
+        sample["usage"]["completion_tokens"] = i
+        samples.append(sample)
+    zstd_dictionary = train_zstd_dictionary(samples, dict_size=4096)
+
+    codec = ValueCodec(compression="zstd", zstd_dictionary=zstd_dictionary)
+    data = codec.encode(llm_raw_response)
+    assert len(data) < len(ValueCodec(compression="zstd").encode(llm_raw_response))
+    assert codec.decode(data) == llm_raw_response
+
+
+def test_unknown_compression():
+    with pytest.raises(ValueError):
+        ValueCodec(compression="lz4")
+
+
+def test_storages_read_entries_written_without_codec(tmp_path, llm_raw_response):
+    codec = ValueCodec(drop_fields=MISTRAL_UNUSED_FIELDS, compression="zlib")
+
+    storage = TmpCacheStorage()
+    storage.put("old", llm_raw_response)
+    storage.codec = codec
+    storage.put("new", llm_raw_response)
+    assert storage.get("old") == llm_raw_response
+    assert storage.get("new") == project(llm_raw_response, MISTRAL_UNUSED_FIELDS)
+
+    db_path = str(tmp_path / "cache.sqlite3")
+    with SqliteCacheStorage(db_path=db_path) as sqlite_storage:
+        sqlite_storage.put("old", llm_raw_response)
+    with SqliteCacheStorage(db_path=db_path, codec=codec) as sqlite_storage:
+        sqlite_storage.put("new", llm_raw_response)
+        sqlite_storage.flush()
+        assert sqlite_storage.get("old") == llm_raw_response
+        assert sqlite_storage.get("new") == project(llm_raw_response, MISTRAL_UNUSED_FIELDS)
+
+
+def test_missing_zstd_dictionary_is_not_corruption(tmp_path, llm_raw_response):
+    pytest.importorskip("zstandard")
+    from llm_inference.cache.codec import ZstdDictionaryError, train_zstd_dictionary
+
+    samples = []
+    for i in range(500):
+        sample = json.loads(json.dumps(llm_raw_response))
+        sample["usage"]["completion_tokens"] = i
+        samples.append(sample)
+    codec = ValueCodec(compression="zstd", zstd_dictionary=train_zstd_dictionary(samples, dict_size=4096))
+    storage = DiskCacheStorage(cache_dir=str(tmp_path), codec=codec)
+    storage.put("key", llm_raw_response)
+
+    reader = DiskCacheStorage(cache_dir=str(tmp_path))
+    with pytest.raises(ZstdDictionaryError):
+        reader.get("key")
+    assert storage.get("key") == llm_raw_response
+
+    file_path = storage._cache_path(storage._get_hashed_key("key"))
+    with open(file_path, "r+b") as f:
+        f.truncate(len(f.read()) // 2)
+    assert storage.get("key") is None
+    assert not os.path.exists(file_path)
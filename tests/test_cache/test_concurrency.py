@@ -0,0 +1,69 @@
+import multiprocessing
+import os
+
+from llm_inference.cache.disk import DiskCacheStorage
+from llm_inference.cache.locking import atomic_write, file_lock
+from llm_inference.cache.tmp import TmpCacheStorage
+
+
+def write_and_read(cache_dir, worker, errors):
+    storage = DiskCacheStorage(cache_dir=cache_dir)
+    value = {"worker": worker, "content": "x" * 100_000}
+    for _ in range(50):
+        storage.put("shared key", value)
+        read_value = storage.get("shared key")
+        if read_value is None or len(read_value["content"]) != 100_000:
+            errors.put(worker)
+
+
+def test_concurrent_writers_never_expose_partial_entries(tmp_path):
+    errors = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=write_and_read, args=(str(tmp_path), worker, errors))
+        for worker in range(4)
+    ]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+    assert errors.empty()
+    assert [name for _, _, names in os.walk(tmp_path) for name in names if name.endswith(".tmp")] == []
+
+
+def test_corrupted_entries_are_quarantined():
+    storage = TmpCacheStorage()
+    storage.put("key", {"data": "value"})
+    file_path = storage._cache_path(storage._get_hashed_key("key"))
+    with open(file_path, "w") as f:
+        f.write('{"data": "val')
+
+    assert storage.get("key") is None
+    assert not os.path.exists(file_path)
+    assert len(os.listdir(storage.quarantine_dir)) == 1
+    assert list(storage.iter_entries()) == []
+
+    storage.put("key", {"data": "value"})
+    assert storage.get("key") == {"data": "value"}
+
+
+def test_atomic_write_keeps_previous_content_on_failure(tmp_path):
+    file_path = str(tmp_path / "entry.cache")
+    atomic_write(file_path, b"previous")
+
+    try:
+        atomic_write(file_path, None)
+    except TypeError:
+        pass
+    with open(file_path, "rb") as f:
+        assert f.read() == b"previous"
+    assert os.listdir(tmp_path) == ["entry.cache"]
+
+
+def test_file_lock_is_exclusive(tmp_path):
+    lock_path = str(tmp_path / ".lock")
+    with file_lock(lock_path) as locked:
+        assert locked
+        with file_lock(lock_path, blocking=False) as other_locked:
+            assert not other_locked
+    with file_lock(lock_path, blocking=False) as locked:
+        assert locked
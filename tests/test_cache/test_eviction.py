@@ -0,0 +1,114 @@
+import os
+import time
+
+import pytest
+
+from llm_inference.cache.base import CacheEntry
+from llm_inference.cache.disk import DiskCacheStorage
+from llm_inference.cache.eviction import EvictionPolicy
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr("llm_inference.cache.disk.CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def make_entry(name, size=10, created_at=0.0, accessed_at=0.0):
+    return CacheEntry(hashed_key=name, size=size, created_at=created_at, accessed_at=accessed_at)
+
+
+def test_select_expired_entries_first():
+    policy = EvictionPolicy(ttl=100)
+    entries = [make_entry("old", created_at=0), make_entry("new", created_at=950)]
+    assert [e.hashed_key for e in policy.select(entries, now=1000)] == ["old"]
+
+
+def test_select_lru_down_to_low_watermark():
+    policy = EvictionPolicy(max_entries=4, low_watermark=0.5)
+    entries = [make_entry(f"k{i}", accessed_at=i) for i in range(5)]
+    evicted = policy.select(entries, pinned={"k0"})
+    assert [e.hashed_key for e in evicted] == ["k1", "k2", "k3"]
+
+
+def test_select_lfu_by_bytes():
+    policy = EvictionPolicy(max_bytes=25, strategy="lfu", low_watermark=1.0)
+    entries = [make_entry("a", accessed_at=3), make_entry("b", accessed_at=1), make_entry("c", accessed_at=2)]
+    evicted = policy.select(entries, access_counts={"a": 1, "b": 5, "c": 1})
+    assert [e.hashed_key for e in evicted] == ["c"]
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        EvictionPolicy(strategy="fifo")
+
+
+def test_disk_cache_defaults_to_cache_dir(cache_dir):
+    storage = DiskCacheStorage()
+    assert storage.cache_dir == str(cache_dir)
+
+
+def test_disk_cache_evicts_every_check_every_puts(cache_dir):
+    storage = DiskCacheStorage("evict", eviction_policy=EvictionPolicy(max_entries=2, check_every=3, low_watermark=1.0), pin_current_run=False)
+    for i in range(3):
+        storage.put(f"key{i}", {"i": i})
+        path = storage._cache_path(storage._get_hashed_key(f"key{i}"))
+        os.utime(path, (i, i))
+
+    assert len(list(storage.iter_entries())) == 2
+    assert storage.get("key0") is None
+    assert storage.get("key2") == {"i": 2}
+
+
+def test_disk_cache_pins_current_run(cache_dir):
+    storage = DiskCacheStorage("pinned", eviction_policy=EvictionPolicy(max_entries=1, check_every=None))
+    storage.put("key0", {"i": 0})
+    storage.put("key1", {"i": 1})
+    assert storage.evict() == 0
+
+    other_run = DiskCacheStorage("pinned", eviction_policy=EvictionPolicy(max_entries=1, check_every=None, low_watermark=1.0))
+    other_run.pin("key1")
+    assert other_run.evict() == 1
+    assert other_run.get("key0") is None
+    assert other_run.get("key1") == {"i": 1}
+
+
+def test_disk_cache_lfu_counts_are_saved(cache_dir):
+    policy = EvictionPolicy(max_entries=1, strategy="lfu", check_every=None, low_watermark=1.0)
+    storage = DiskCacheStorage("lfu", eviction_policy=policy, pin_current_run=False)
+    storage.put("rare", {"i": 0})
+    storage.put("frequent", {"i": 1})
+    for _ in range(3):
+        storage.get("frequent")
+    storage.get("rare")
+
+    assert storage.evict() == 1
+    assert storage.get("frequent") == {"i": 1}
+    assert storage.get("rare") is None
+
+
+def test_disk_cache_keeps_hits_recorded_during_eviction(cache_dir):
+    class HittingPolicy(EvictionPolicy):
+        def select(self, entries, pinned=frozenset(), access_counts=None):
+            storage.get("key")
+            return super().select(entries, pinned=pinned, access_counts=access_counts)
+
+    policy = HittingPolicy(max_entries=10, strategy="lfu", check_every=None)
+    storage = DiskCacheStorage("hits", eviction_policy=policy, pin_current_run=False)
+    storage.put("key", {"i": 0})
+    storage.get("key")
+
+    assert storage.evict() == 0
+    assert storage._access_counts == {storage._get_hashed_key("key"): 1}
+    assert storage._load_access_counts() == {storage._get_hashed_key("key"): 2}
+
+
+def test_disk_cache_background_eviction(cache_dir):
+    policy = EvictionPolicy(ttl=0, check_every=None, interval=0.01)
+    storage = DiskCacheStorage("background", eviction_policy=policy, pin_current_run=False)
+    storage.put("key", {"data": "value"})
+    deadline = time.time() + 5
+    while storage.get("key") is not None and time.time() < deadline:
+        time.sleep(0.01)
+    storage.close()
+    assert storage.get("key") is None
@@ -0,0 +1,75 @@
+import hashlib
+
+import pytest
+from unittest.mock import MagicMock, Mock
+
+from llm_inference.backends.mistral_async import MistralAsyncBackend
+from llm_inference.backends.mistral_sync import MistralBackend
+from llm_inference.cache.hashing import StreamingHasher, canonical_json, hash_json
+from llm_inference.cache.keys import CacheKey, CacheKeyBuilder
+from llm_inference.cache.tmp import TmpCacheStorage
+
+
+def test_keys_are_canonical(model_config):
+    builder = CacheKeyBuilder()
+    reordered_config = dict(reversed(list(model_config.items())))
+    assert builder.build("prompt", model_config) == builder.build("prompt", reordered_config)
+    assert builder.build("prompt", model_config) != builder.build("prompt", dict(model_config, temperature=0.0))
+    assert builder.build("prompt", model_config) != builder.build("other prompt", model_config)
+
+
+def test_namespace_and_version(model_config):
+    key = CacheKeyBuilder(namespace="w01", version=2).build("prompt", model_config)
+    assert isinstance(key, CacheKey)
+    assert key.startswith("w01:v2:")
+    assert key.hashed == f"w01-v2-{key.digest}"
+    assert TmpCacheStorage()._get_hashed_key(key) == key.hashed
+    assert key != CacheKeyBuilder(namespace="w01", version=3).build("prompt", model_config)
+
+    with pytest.raises(ValueError):
+        CacheKeyBuilder(namespace="../w01")
+
+
+def test_shared_cache_separates_models(model_config, mistral_fake_response):
+    cache_storage = TmpCacheStorage()
+    backends = {}
+    for model in ["mistral-large-latest", "mistral-small-latest"]:
+        backend = MistralBackend(api_key="fake-api-key", cache_storage=cache_storage)
+        backend.client = MagicMock()
+        backend.client.chat.complete = MagicMock(return_value=mistral_fake_response)
+        backends[model] = backend
+
+    for model, backend in backends.items():
+        backend.infer_one("Test prompt", model_config=dict(model_config, model=model))
+        backend.infer_one("Test prompt", model_config=dict(model_config, model=model))
+        # Each model is called once: the other model's answer is never returned.
+        assert backend.client.chat.complete.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_async_infer_many_infers_duplicates_once(model_config, mistral_fake_response):
+    backend = MistralAsyncBackend(api_key="dummy-key", cache_storage=TmpCacheStorage())
+    backend.client.chat.complete = Mock(return_value=mistral_fake_response)
+
+    prompts = [{"custom_id": i, "prompt": "Same prompt"} for i in range(3)]
+    results = [result async for result in backend.infer_many(prompts, model_config=model_config)]
+
+    assert backend.client.chat.complete.call_count == 1
+    assert sorted(result["custom_id"] for result in results) == [0, 1, 2]
+
+
+def test_streamed_batch_key_matches_canonical_json(model_config):
+    batch_data = [{"custom_id": str(i), "body": {"messages": [{"role": "user", "content": f"Prompt é {i}"}]}} for i in range(3)]
+    key = CacheKeyBuilder().build_batch(batch_data, model_config)
+    payload = canonical_json({"batch": batch_data, "model_config": model_config})
+    assert key.digest == hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def test_hash_algorithms(model_config):
+    sha256_key = CacheKeyBuilder().build("prompt", model_config)
+    blake2b_key = CacheKeyBuilder(hash_algorithm="blake2b").build("prompt", model_config)
+    assert blake2b_key.digest.startswith("b2-") and len(blake2b_key.digest) == 35
+    assert blake2b_key != sha256_key
+    assert StreamingHasher("blake2b").update_json_list([1, {"a": 2}]).hexdigest() == hash_json([1, {"a": 2}], "blake2b")
+    with pytest.raises(ValueError):
+        CacheKeyBuilder(hash_algorithm="md5")
@@ -0,0 +1,93 @@
+import multiprocessing
+import threading
+
+import pytest
+
+pytest.importorskip("lmdb")
+
+from llm_inference.cache.lmdb import LmdbCacheStorage
+
+
+def read_keys(path, keys, queue):
+    storage = LmdbCacheStorage(path=path, readonly=True)
+    queue.put([storage.get(key) for key in keys])
+
+
+def test_put_and_get(tmp_path):
+    with LmdbCacheStorage(path=str(tmp_path / "lmdb")) as storage:
+        storage.put("key", {"data": "value"})
+        assert storage.get("key") == {"data": "value"}
+        assert storage.get("missing") is None
+        assert len(storage) == 1
+
+
+def test_map_grows_when_full(tmp_path):
+    with LmdbCacheStorage(path=str(tmp_path / "lmdb"), map_size=64 * 1024) as storage:
+        for i in range(20):
+            storage.put(i, {"data": "x" * 10_000})
+        assert storage.get(19) == {"data": "x" * 10_000}
+
+
+def test_map_resize_waits_for_transactions(tmp_path):
+    with LmdbCacheStorage(path=str(tmp_path / "lmdb"), map_size=64 * 1024) as storage:
+        map_size = storage.env.info()["map_size"]
+        writer = threading.Thread(target=storage.put_many, args=([(i, {"data": "x" * 1024}) for i in range(100)],))
+        with storage._begin():
+            writer.start()
+            writer.join(timeout=0.5)
+            # The map is full, but it is not resized while a transaction is active.
+            assert writer.is_alive()
+            assert storage.env.info()["map_size"] == map_size
+        writer.join()
+        assert storage.env.info()["map_size"] > map_size
+        assert storage.get(99) == {"data": "x" * 1024}
+
+
+def test_many_process_readers(tmp_path):
+    path = str(tmp_path / "lmdb")
+    with LmdbCacheStorage(path=path) as storage:
+        for i in range(10):
+            storage.put(i, {"i": i})
+
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    processes = [context.Process(target=read_keys, args=(path, list(range(10)), queue)) for _ in range(3)]
+    for process in processes:
+        process.start()
+    results = [queue.get(timeout=30) for _ in processes]
+    for process in processes:
+        process.join()
+
+    assert results == [[{"i": i} for i in range(10)]] * 3
+
+
+def grow_map(path):
+    with LmdbCacheStorage(path=path, map_size=64 * 1024) as storage:
+        for i in range(20):
+            storage.put(i, {"data": "x" * 10_000})
+
+
+def test_map_grown_by_another_process(tmp_path):
+    path = str(tmp_path / "lmdb")
+    with LmdbCacheStorage(path=path, map_size=64 * 1024) as storage:
+        storage.put("key", {"data": "value"})
+        process = multiprocessing.get_context("spawn").Process(target=grow_map, args=(path,))
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+
+        assert storage.get(19) == {"data": "x" * 10_000}
+        assert storage.get_many(["key", 0, "missing"]) == [{"data": "value"}, {"data": "x" * 10_000}, None]
+        storage.put("other", 1)
+        assert storage.get("other") == 1
+
+
+def test_values_are_decoded_from_the_map(tmp_path):
+    from llm_inference.cache.codec import ValueCodec
+
+    with LmdbCacheStorage(path=str(tmp_path / "lmdb"), codec=ValueCodec(compression="zlib")) as storage:
+        storage.put_many([("compressed", {"data": "value"})])
+    with LmdbCacheStorage(path=str(tmp_path / "lmdb")) as storage:
+        storage.put("plain", ["é", 1])
+        assert storage.get_many(["compressed", "plain"]) == [{"data": "value"}, ["é", 1]]
+        assert storage._get_many_hashed([storage._get_hashed_key("plain")]) == [b'["\\u00e9", 1]']
@@ -0,0 +1,50 @@
+import pytest
+
+from llm_inference.cache import cli
+from llm_inference.cache.codec import ValueCodec
+from llm_inference.cache.disk import DiskCacheStorage
+from llm_inference.cache.keys import CacheKeyBuilder
+from llm_inference.cache.pack import PackCacheStorage, PackReader, write_pack
+
+
+def test_pack_round_trip(tmp_path):
+    source = DiskCacheStorage(cache_dir=str(tmp_path / "disk"), pin_current_run=False, codec=ValueCodec(compression="zlib"))
+    for i in range(500):
+        source.put(f"prompt {i}", {"i": i})
+    pack_path = str(tmp_path / "llm.pack")
+    assert write_pack(source._iter_hashed(), pack_path) == 500
+
+    storage = PackCacheStorage([pack_path])
+    assert len(storage.readers[0]) == 500
+    assert storage.get("prompt 42") == {"i": 42}
+    assert storage.get("prompt 500") is None
+    assert storage.get_many(["prompt 1", "missing", "prompt 499"]) == [{"i": 1}, None, {"i": 499}]
+    with pytest.raises(RuntimeError):
+        storage.put("prompt 500", {"i": 500})
+    storage.close()
+
+
+def test_pack_append_skips_known_entries(tmp_path):
+    pack_path = str(tmp_path / "llm.pack")
+    assert write_pack([("a", b'{"v": 1}'), ("b", b'{"v": 2}')], pack_path) == 2
+    assert write_pack([("b", b'{"v": 3}'), ("c", b'{"v": 4}')], pack_path) == 1
+
+    reader = PackReader(str(tmp_path / "llm.idx"))
+    assert dict(reader.iter_entries()) == {"a": b'{"v": 1}', "b": b'{"v": 2}', "c": b'{"v": 4}'}
+    assert reader.find("d") is None
+    reader.close()
+
+
+def test_pack_with_local_storage(tmp_path, model_config):
+    key = CacheKeyBuilder(namespace="w01").build("packed", model_config)
+    source = DiskCacheStorage(cache_dir=str(tmp_path / "source"), pin_current_run=False)
+    source.put(key, {"packed": True})
+    cli.main(["pack", str(tmp_path / "source"), str(tmp_path / "llm.pack")])
+
+    local = DiskCacheStorage(cache_dir=str(tmp_path / "local"), pin_current_run=False)
+    storage = PackCacheStorage([str(tmp_path / "llm.pack"), str(tmp_path / "missing.pack")], local_storage=local)
+    storage.put("new", {"packed": False})
+    assert storage.get(key) == {"packed": True}
+    assert storage.get_many([key, "new"]) == [{"packed": True}, {"packed": False}]
+    assert local.get(key) is None
+    assert len(dict(storage._iter_hashed())) == 2
@@ -0,0 +1,150 @@
+import http.client
+import threading
+
+import pytest
+
+from llm_inference.cache.disk import DiskCacheStorage
+from llm_inference.cache.pack import PackCacheStorage, write_pack
+from llm_inference.cache.remote import RemoteCacheStorage, decode_entries, decode_values, encode_entries
+from llm_inference.cache.server import CacheServer
+from llm_inference.cache.sqlite import SqliteCacheStorage
+from llm_inference.cache.tmp import TmpCacheStorage
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = CacheServer(SqliteCacheStorage(db_path=str(tmp_path / "shared.sqlite3")), ("127.0.0.1", 0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_workers_share_entries(server):
+    first = RemoteCacheStorage(server.url, batch_size=2)
+    second = RemoteCacheStorage(server.url, local_storage=TmpCacheStorage())
+    first.put_many([(f"prompt {i}", {"i": i}) for i in range(5)])
+
+    assert second.get("prompt 3") == {"i": 3}
+    assert second.get_many(["prompt 0", "missing", "prompt 4"]) == [{"i": 0}, None, {"i": 4}]
+    # Remote hits are kept in the local tier.
+    assert second.local_storage.get("prompt 4") == {"i": 4}
+    first.close()
+    second.close()
+
+
+def test_connection_reuse_across_threads(server):
+    storage = RemoteCacheStorage(server.url)
+    storage.put("shared", [1, 2, 3])
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(storage.get("shared"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [[1, 2, 3]] * 8
+
+
+def test_unreachable_server_degrades_to_local():
+    storage = RemoteCacheStorage("http://127.0.0.1:1", local_storage=TmpCacheStorage(), timeout=1)
+    storage.put("key", {"local": True})
+    assert storage.get("key") == {"local": True}
+    assert storage.get("other") is None
+
+
+def test_server_rejects_keys_outside_the_cache(tmp_path):
+    cache_dir = tmp_path / "cache"
+    server = CacheServer(DiskCacheStorage(cache_dir=str(cache_dir)), ("127.0.0.1", 0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    storage = RemoteCacheStorage(server.url)
+    try:
+        with pytest.raises(http.client.HTTPException, match="400"):
+            storage._put_many_hashed([("../../escaped", b"{}")])
+        with pytest.raises(http.client.HTTPException, match="400"):
+            storage._get_many_hashed(["../escaped"])
+    finally:
+        storage.close()
+        server.shutdown()
+        server.server_close()
+    assert not list(tmp_path.glob("**/escaped*"))
+    with pytest.raises(ValueError):
+        DiskCacheStorage(cache_dir=str(cache_dir))._cache_path("../escaped")
+
+
+def test_server_token(tmp_path):
+    server = CacheServer(SqliteCacheStorage(db_path=str(tmp_path / "shared.sqlite3")), ("127.0.0.1", 0), token="secret")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        RemoteCacheStorage(server.url, token="secret").put("key", 1)
+        assert RemoteCacheStorage(server.url, token="secret").get("key") == 1
+        # A wrong token is an unavailable server: misses, with a warning.
+        assert RemoteCacheStorage(server.url, token="wrong").get("key") is None
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    with pytest.raises(ValueError, match="without a token"):
+        CacheServer(TmpCacheStorage(), ("0.0.0.0", 0))
+
+
+def post(server, path, headers, body=b""):
+    host, port = server.server_address[:2]
+    connection = http.client.HTTPConnection(host, port, timeout=5)
+    try:
+        connection.putrequest("POST", path)
+        for name, value in headers.items():
+            connection.putheader(name, value)
+        connection.endheaders(body)
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+def test_server_checks_requests_before_reading_them(tmp_path):
+    server = CacheServer(TmpCacheStorage(), ("127.0.0.1", 0), token="secret", max_body_size=1024)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    authorized = {"Authorization": "Bearer secret"}
+    try:
+        # The announced bodies are never sent: the server replies without waiting for them.
+        assert post(server, "/put", {"Content-Length": str(10 ** 9)})[0] == 401
+        assert post(server, "/put", {**authorized, "Content-Length": str(10 ** 9)})[0] == 413
+        assert post(server, "/put", {**authorized, "Content-Length": "-1"})[0] == 400
+
+        truncated = encode_entries([("key", b"value")])[:-2]
+        status, body = post(server, "/put", {**authorized, "Content-Length": str(len(truncated))}, truncated)
+        assert status == 400 and b"Truncated" in body
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_malformed_frames():
+    entries = encode_entries([("key", b"value")])
+    assert decode_entries(entries) == [("key", b"value")]
+    for body in (entries[:1], entries[:5], entries[:-1]):
+        with pytest.raises(ValueError):
+            decode_entries(body)
+    with pytest.raises(ValueError):
+        decode_values(b"\x05\x00\x00\x00abc")
+
+
+def test_serve_packs(tmp_path):
+    write_pack([("a" * 64, b'{"packed": true}')], str(tmp_path / "entries.pack"))
+    server = CacheServer(PackCacheStorage([str(tmp_path / "entries.pack")]), ("127.0.0.1", 0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    storage = RemoteCacheStorage(server.url)
+    try:
+        assert storage._get_many_hashed(["a" * 64, "b" * 64]) == [b'{"packed": true}', None]
+        # Packs without a local storage are read-only.
+        with pytest.raises(http.client.HTTPException, match="500"):
+            storage._put_many_hashed([("c" * 64, b"{}")])
+    finally:
+        storage.close()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,66 @@
+import json
+import os
+import threading
+
+from llm_inference.cache.disk import DiskCacheStorage
+from llm_inference.cache.keys import CacheKeyBuilder
+from llm_inference.cache.migrate import iter_disk_cache_entries
+from llm_inference.cache.tmp import TmpCacheStorage
+
+
+def write_flat_entry(storage, key, value):
+    with open(storage._flat_cache_path(storage._get_hashed_key(key)), "w") as f:
+        json.dump(value, f)
+
+
+def test_entries_are_sharded_on_the_key_digest(model_config):
+    storage = TmpCacheStorage()
+    cache_key = CacheKeyBuilder().build("prompt", model_config)
+    storage.put(cache_key, {"data": "value"})
+
+    digest = cache_key.hashed.rsplit("-", 1)[-1]
+    expected_path = os.path.join(storage.cache_dir, digest[:2], digest[2:4], f"{cache_key.hashed}.cache")
+    assert os.path.exists(expected_path)
+    assert storage.get(cache_key) == {"data": "value"}
+
+
+def test_flat_layout(tmp_path):
+    storage = DiskCacheStorage(cache_dir=str(tmp_path), shard_depth=0)
+    storage.put("key", {"data": "value"})
+    assert os.listdir(tmp_path) == [f"{storage._get_hashed_key('key')}.cache"]
+
+
+def test_flat_entries_are_migrated_on_read():
+    storage = TmpCacheStorage()
+    write_flat_entry(storage, "key", {"data": "value"})
+
+    assert storage.get("key") == {"data": "value"}
+    hashed_key = storage._get_hashed_key("key")
+    assert not os.path.exists(storage._flat_cache_path(hashed_key))
+    assert os.path.exists(storage._cache_path(hashed_key))
+
+
+def test_flat_entries_stay_readable_without_migration(tmp_path):
+    storage = DiskCacheStorage(cache_dir=str(tmp_path), migrate_on_read=False)
+    write_flat_entry(storage, "key", {"data": "value"})
+    assert storage.get("key") == {"data": "value"}
+    assert os.path.exists(storage._flat_cache_path(storage._get_hashed_key("key")))
+
+
+def test_migrate_flat_layout_concurrently_with_readers():
+    storage = TmpCacheStorage()
+    keys = [f"key{i}" for i in range(200)]
+    for key in keys:
+        write_flat_entry(storage, key, {"key": key})
+
+    reader = DiskCacheStorage(cache_dir=storage.cache_dir, migrate_on_read=False)
+    misses = []
+    thread = threading.Thread(target=lambda: misses.extend(key for key in keys if reader.get(key) is None))
+    thread.start()
+    moved = storage.migrate_flat_layout()
+    thread.join()
+
+    assert misses == []
+    assert moved == len(keys)
+    assert len(list(storage.iter_entries())) == len(keys)
+    assert len(list(iter_disk_cache_entries(storage.cache_dir))) == len(keys)
@@ -0,0 +1,94 @@
+import gc
+import threading
+import weakref
+
+from llm_inference.cache.migrate import import_disk_cache
+from llm_inference.cache.sqlite import SqliteCacheStorage
+from llm_inference.cache.tmp import TmpCacheStorage
+
+
+def test_put_and_get(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite3")
+    storage = SqliteCacheStorage(db_path=db_path, batch_size=10)
+    storage.put("key", {"data": "value"})
+
+    # Buffered writes are visible before they are committed.
+    assert storage.get("key") == {"data": "value"}
+    assert storage.get("missing") is None
+
+    storage.close()
+    with SqliteCacheStorage(db_path=db_path) as reopened:
+        assert reopened.get("key") == {"data": "value"}
+        assert len(reopened) == 1
+
+
+def test_batched_writes_are_visible_to_other_connections(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite3")
+    writer = SqliteCacheStorage(db_path=db_path, batch_size=2)
+    reader = SqliteCacheStorage(db_path=db_path)
+
+    writer.put("a", 1)
+    assert reader.get("a") is None
+    writer.put("b", 2)
+    assert reader.get("a") == 1
+    assert reader.get("b") == 2
+
+
+def test_entries_stay_visible_while_committed(tmp_path, monkeypatch):
+    storage = SqliteCacheStorage(db_path=str(tmp_path / "cache.sqlite3"), batch_size=10)
+    storage.put("key", "value")
+    put_many_hashed = storage._put_many_hashed
+    seen_during_commit = []
+
+    def commit(items):
+        # Another thread reading before the transaction is committed.
+        seen_during_commit.append(storage.get_many(["key"]))
+        return put_many_hashed(items)
+
+    monkeypatch.setattr(storage, "_put_many_hashed", commit)
+    storage.flush()
+    assert seen_during_commit == [["value"]]
+    assert storage._pending == {}
+    assert storage.get("key") == "value"
+
+
+def test_storages_are_garbage_collected(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite3")
+    storage = SqliteCacheStorage(db_path=db_path, batch_size=10)
+    storage.put("key", "value")
+    reference = weakref.ref(storage)
+    del storage
+    gc.collect()
+    assert reference() is None
+
+    # The buffered write was committed when the storage was collected.
+    assert SqliteCacheStorage(db_path=db_path).get("key") == "value"
+
+
+def test_concurrent_threads(tmp_path):
+    storage = SqliteCacheStorage(db_path=str(tmp_path / "cache.sqlite3"), batch_size=5)
+
+    def work(offset):
+        for i in range(20):
+            storage.put(offset + i, {"i": offset + i})
+            assert storage.get(offset + i) == {"i": offset + i}
+
+    threads = [threading.Thread(target=work, args=(offset,)) for offset in (0, 100, 200)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(storage) == 60
+
+
+def test_import_disk_cache(tmp_path):
+    disk_storage = TmpCacheStorage()
+    for i in range(5):
+        disk_storage.put(f"key {i}", {"i": i})
+    with open(f"{disk_storage.cache_dir}/corrupted.cache", "w") as f:
+        f.write('{"truncated": ')
+
+    with SqliteCacheStorage(db_path=str(tmp_path / "cache.sqlite3")) as storage:
+        assert import_disk_cache(disk_storage.cache_dir, storage, batch_size=2) == 5
+        assert storage.get("key 3") == {"i": 3}
@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from llm_inference.cache.tiered import TieredCacheStorage
+from llm_inference.cache.tmp import TmpCacheStorage
+
+
+def test_memory_tier_serves_hot_keys():
+    storage = TmpCacheStorage()
+    storage.get = MagicMock(wraps=storage.get)
+    cache_storage = TieredCacheStorage(storage)
+
+    cache_storage.put("key", {"data": "value"})
+    assert cache_storage.get("key") == {"data": "value"}
+    assert cache_storage.get("missing") is None
+    storage.get.assert_called_once_with("missing")
+
+    stats = cache_storage.stats()
+    assert (stats["memory_hits"], stats["storage_hits"], stats["misses"]) == (1, 0, 1)
+
+
+def test_storage_hits_are_promoted():
+    storage = TmpCacheStorage()
+    storage.put("key", {"data": "value"})
+    cache_storage = TieredCacheStorage(storage)
+
+    assert cache_storage.get("key") == {"data": "value"}
+    assert cache_storage.get("key") == {"data": "value"}
+    assert cache_storage.stats()["storage_hits"] == 1
+    assert cache_storage.stats()["memory_hits"] == 1
+
+
+def test_hits_return_independent_copies():
+    cache_storage = TieredCacheStorage(TmpCacheStorage())
+    cache_storage.put("key", {"data": "value"})
+    cache_storage.get("key")["data"] = "modified"
+    assert cache_storage.get("key") == {"data": "value"}
+
+
+def test_eviction_by_entries_and_bytes():
+    cache_storage = TieredCacheStorage(TmpCacheStorage(), max_entries=2, max_bytes=100)
+    cache_storage.put("a", 1)
+    cache_storage.put("b", 2)
+    cache_storage.get("a")
+    cache_storage.put("c", 3)
+    # "b" is the least recently used entry.
+    assert cache_storage.stats()["memory_entries"] == 2
+    assert cache_storage._recall(cache_storage._get_hashed_key("b")) is None
+
+    cache_storage.put("d", "x" * 90)
+    assert cache_storage.stats()["memory_bytes"] <= 100
+    # Evicted entries are still served by the persistent tier.
+    assert cache_storage.get("b") == 2
+
+
+def test_stats_are_exact_across_threads():
+    cache_storage = TieredCacheStorage(TmpCacheStorage(), max_entries=10)
+    cache_storage.put("hot", 1)
+
+    def lookup(i):
+        cache_storage.get("hot")
+        cache_storage.get(f"missing {i}")
+        cache_storage.get_many(["hot", f"other {i}"])
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lookup, range(400)))
+    stats = cache_storage.stats()
+    assert stats["memory_hits"] == 800
+    assert stats["misses"] == 800
+    assert stats["lookups"] == 1600
@@ -0,0 +1,65 @@
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from weaviate.classes.config import DataType
+
+
+class FakeQuery:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def fetch_objects(self, limit=None, after=None, filters=None, return_properties=None, **kwargs):
+        self.collection.queries += 1
+        objects = self.collection.objects
+        if filters is not None:
+            wanted = set(filters.value)
+            objects = [obj for obj in objects if str(obj.uuid) in wanted]
+        if after is not None:
+            objects = [obj for obj in objects if obj.uuid.int > uuid.UUID(str(after)).int]
+        objects = objects[:limit] if limit is not None else objects[:100]
+        return SimpleNamespace(objects=[self.collection.project(obj, return_properties) for obj in objects])
+
+
+class FakeCollection:
+    """Collection of the v4 Weaviate client, its objects sorted by id."""
+
+    def __init__(self, size, seed=0):
+        rng = random.Random(seed)
+        objects = []
+        for i in range(size):
+            object_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+            objects.append(SimpleNamespace(uuid=object_id, properties={
+                "object_id": str(object_id),
+                "title": f"Title {i}",
+                "year": 2000 + i % 20,
+                "published_at": datetime(2000, 1, 1, tzinfo=timezone.utc) + timedelta(days=i),
+                # Set on a few objects only: null in most shards.
+                "registry_id": uuid.UUID(int=i, version=4) if i < 5 else None,
+            }))
+        self.objects = sorted(objects, key=lambda obj: obj.uuid.int)
+        self.query = FakeQuery(self)
+        self.config = SimpleNamespace(get=lambda: SimpleNamespace(properties=[
+            SimpleNamespace(name="object_id", data_type=DataType.TEXT),
+            SimpleNamespace(name="title", data_type=DataType.TEXT),
+            SimpleNamespace(name="year", data_type=DataType.INT),
+            SimpleNamespace(name="published_at", data_type=DataType.DATE),
+            SimpleNamespace(name="registry_id", data_type=DataType.UUID),
+        ]))
+        self.queries = 0
+
+    @staticmethod
+    def project(obj, return_properties):
+        if return_properties is None:
+            return obj
+        return SimpleNamespace(uuid=obj.uuid, properties={name: obj.properties[name] for name in return_properties})
+
+    def iterator(self, return_properties=None, cache_size=None, **kwargs):
+        return (self.project(obj, return_properties) for obj in self.objects)
+
+
+@pytest.fixture
+def fake_collection():
+    return FakeCollection(1000)
@@ -0,0 +1,77 @@
+import json
+
+from more_europa.helpers.dedup import (
+    LSHIndex,
+    MinHasher,
+    NearDuplicateDetector,
+    estimate_jaccard,
+    jaccard,
+    normalize_text,
+    shingles,
+    write_reuse_audit,
+)
+
+ABSTRACT = (
+    "Background: patient registries collect data on rare diseases across Europe. "
+    "Methods: we analysed the records of the national cystic fibrosis registry between 2000 and 2020 "
+    "and compared survival between centres with different care models. "
+    "Results: median survival improved in all centres over the study period."
+)
+
+
+def test_normalize_text():
+    text = "Cystic&nbsp;fibrosis   <i>registry</i> data.\n© 2021 Elsevier Ltd. All rights reserved."
+    assert normalize_text(text) == "cystic fibrosis registry data"
+
+
+def test_minhash_estimates_jaccard():
+    hasher = MinHasher(num_perm=256)
+    a = shingles(normalize_text(ABSTRACT))
+    b = shingles(normalize_text(ABSTRACT.replace("2020", "2021")))
+    estimate = estimate_jaccard(hasher.signature(a), hasher.signature(b))
+    assert abs(estimate - jaccard(a, b)) < 0.1
+
+
+def test_lsh_index_query():
+    hasher = MinHasher()
+    index = LSHIndex(threshold=0.8)
+    index.insert("a", hasher.signature(shingles(normalize_text(ABSTRACT))))
+    assert [key for key, _ in index.query(hasher.signature(shingles(normalize_text(ABSTRACT + " "))))] == ["a"]
+    assert index.query(hasher.signature(shingles("an unrelated randomized trial of aspirin in adults"))) == []
+
+
+def test_detector_clusters_variants(tmp_path):
+    detector = NearDuplicateDetector(threshold=0.8)
+    representatives = detector.cluster([
+        ("pubmed", ABSTRACT),
+        ("other", ABSTRACT.replace(" ", "  ").replace("&", "&amp;") + " © 2021 The Authors."),
+        ("unrelated", "A randomized trial of aspirin " * 10),
+        ("short", "Registry"),
+    ])
+    assert representatives["other"][0] == "pubmed"
+    assert representatives["unrelated"] == ("unrelated", 1.0)
+    assert representatives["short"] == ("short", 1.0)
+
+    audit_jsonl = tmp_path / "audit.jsonl"
+    assert write_reuse_audit(representatives, str(audit_jsonl), threshold=0.8) == 1
+    audit = [json.loads(line) for line in audit_jsonl.read_text().splitlines()]
+    assert audit[0]["object_id"] == "other" and audit[0]["reused_from"] == "pubmed"
+
+
+def test_list_items_are_not_copyright_notices():
+    shared = "We describe (a) the design of the registry, (b) its governance and "
+    first = normalize_text(shared + "(c) the linkage with hospital records of patients with cystic fibrosis.")
+    second = normalize_text(shared + "(c) survival estimates in a cohort of children with leukaemia.")
+    assert first != second
+    assert normalize_text("Registry data. Copyright 2020 The Authors.") == "registry data"
+
+
+def test_detector_confirms_candidates_with_exact_jaccard():
+    variant = ABSTRACT.replace("Results: median survival improved in all centres over the study period.", "")
+    similarity = jaccard(shingles(normalize_text(ABSTRACT)), shingles(normalize_text(variant)))
+    assert 0.7 < similarity < 0.75
+
+    for threshold, representative in [(0.7, ("pubmed", similarity)), (0.75, ("variant", 1.0))]:
+        detector = NearDuplicateDetector(threshold=threshold)
+        detector.add("pubmed", ABSTRACT)
+        assert detector.add("variant", variant) == representative
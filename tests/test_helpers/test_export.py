@@ -0,0 +1,67 @@
+import gzip
+import json
+import os
+import uuid
+
+import pyarrow
+import pyarrow.parquet
+import pytest
+
+from more_europa.helpers import export
+from more_europa.helpers.export import export_collection, iter_range, uuid_ranges
+
+
+def test_uuid_ranges_cover_the_collection(fake_collection):
+    ranges = uuid_ranges(7)
+    assert ranges[0][0] is None and ranges[-1][1] is None
+    ids = [obj.uuid for after, before in ranges for obj in iter_range(fake_collection, after, before, page_size=50)]
+    assert ids == [obj.uuid for obj in fake_collection.objects]
+
+
+def read_jsonl_shards(output_dir, manifest):
+    rows = []
+    for shard in manifest["shards"].values():
+        with gzip.open(os.path.join(output_dir, shard["file"]), "rt", encoding="utf-8") as f:
+            rows.extend(json.loads(line) for line in f)
+    return rows
+
+
+def test_export_is_resumable(fake_collection, tmp_path, monkeypatch):
+    output_dir = str(tmp_path / "export")
+    manifest = export_collection(fake_collection, output_dir, num_shards=8, workers=4, return_properties=["title"], file_format="jsonl")
+    assert manifest["rows"] == 1000
+    rows = read_jsonl_shards(output_dir, manifest)
+    assert sorted(row["uuid"] for row in rows) == sorted(str(obj.uuid) for obj in fake_collection.objects)
+    assert set(rows[0]) == {"uuid", "title"}
+
+    # Only the shards missing from the output are exported again.
+    os.remove(os.path.join(output_dir, manifest["shards"]["3"]["file"]))
+    exported = []
+    original_iter_range = export.iter_range
+    monkeypatch.setattr(export, "iter_range", lambda *args: exported.append(args[1]) or original_iter_range(*args))
+    manifest = export_collection(fake_collection, output_dir, num_shards=8, workers=4, return_properties=["title"], file_format="jsonl")
+    assert len(exported) == 1 and manifest["rows"] == 1000
+
+    with pytest.raises(ValueError):
+        export_collection(fake_collection, output_dir, num_shards=4, file_format="jsonl")
+
+
+def test_export_to_parquet(fake_collection, tmp_path):
+    manifest = export_collection(fake_collection, str(tmp_path), num_shards=4)
+    assert manifest["rows"] == 1000
+
+    # The shards share one schema, although most of them hold no registry_id.
+    paths = [str(tmp_path / shard["file"]) for shard in manifest["shards"].values()]
+    assert len({pyarrow.parquet.read_schema(path) for path in paths}) == 1
+    table = pyarrow.concat_tables(pyarrow.parquet.read_table(path) for path in paths)
+    assert table.num_rows == 1000
+    assert table.schema.field("published_at").type == pyarrow.timestamp("us", tz="UTC")
+    registry_ids = [value for value in table.column("registry_id").to_pylist() if value is not None]
+    assert sorted(registry_ids) == sorted(str(uuid.UUID(int=i, version=4)) for i in range(5))
+
+    # Resuming with another codec would mix codecs across shards.
+    with pytest.raises(ValueError, match="other settings"):
+        export_collection(fake_collection, str(tmp_path), num_shards=4, compression="snappy")
+
+    with pytest.raises(ValueError, match="Unknown properties"):
+        export_collection(fake_collection, str(tmp_path / "other"), return_properties=["missing"])
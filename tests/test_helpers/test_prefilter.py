@@ -0,0 +1,41 @@
+import json
+
+from more_europa.helpers.prefilter import AhoCorasick, RegistryPreFilter, make_negative_response
+
+
+def test_aho_corasick_matches():
+    matcher = AhoCorasick(["he", "she", "hers", "regist*"])
+    matches = list(matcher.iter_matches("She registered hers"))
+    assert [pattern for _, _, pattern in matches] == ["she", "regist*", "hers"]
+    # Whole word terms do not match inside other words.
+    assert matcher.search("ushers") is None
+
+
+def test_is_candidate():
+    prefilter = RegistryPreFilter(registry_names=["MUSIC", "SEER"])
+    assert prefilter.is_candidate("Data from the Swedish Stroke Register")
+    assert prefilter.is_candidate("A prospective COHORT of patients")
+    assert prefilter.is_candidate("Incidence in SEER, 2000-2015")
+    assert not prefilter.is_candidate("A randomized trial of aspirin")
+    assert prefilter.matches("the MUSIC registry") == ["MUSIC", "regist*"]
+
+
+def test_evaluate():
+    records = [
+        {"title": "Registry study", "abstract": "", "registry_name": "Not specified"},
+        {"title": "SEER analysis", "abstract": "", "registry_name": "SEER"},
+        {"title": "A cohort", "abstract": "", "registry_name": "NONE"},
+        {"title": "A trial", "abstract": "", "registry_name": "NONE"},
+    ]
+    metrics = RegistryPreFilter().evaluate(records)
+    assert (metrics["TP"], metrics["FP"], metrics["FN"], metrics["TN"]) == (1, 1, 1, 1)
+    assert metrics["recall"] == 0.5
+
+    metrics = RegistryPreFilter(registry_names=["SEER"]).evaluate(records)
+    assert metrics["recall"] == 1.0
+    assert metrics["negative_precision"] == 1.0
+
+
+def test_negative_response_is_parsable():
+    response = make_negative_response()
+    assert json.loads(response["choices"][0]["message"]["content"]) == {"Registry related": "no"}
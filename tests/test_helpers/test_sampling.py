@@ -0,0 +1,37 @@
+from collections import Counter
+
+from more_europa.helpers.sampling import (
+    fetch_objects_by_ids,
+    reservoir_sample,
+    sample_uuids_by_cursor,
+    sample_uuids_by_reservoir,
+)
+
+
+def test_reservoir_sample_is_reproducible_and_uniform():
+    assert reservoir_sample(range(10), 20) == list(range(10))
+    assert reservoir_sample(range(10_000), 50, seed=1) == reservoir_sample(range(10_000), 50, seed=1)
+    assert len(set(reservoir_sample(range(10_000), 50, seed=1))) == 50
+
+    counts = Counter(item for seed in range(2000) for item in reservoir_sample(range(20), 5, seed=seed))
+    # Each item is drawn with probability 1/4, 500 times on average.
+    assert all(400 < count < 600 for count in counts.values())
+
+
+def test_sample_uuids(fake_collection):
+    ids = {obj.uuid for obj in fake_collection.objects}
+    sampled = sample_uuids_by_reservoir(fake_collection, 30, seed=42)
+    assert len(set(sampled)) == 30 and set(sampled) <= ids
+
+    fake_collection.queries = 0
+    sampled = sample_uuids_by_cursor(fake_collection, 30, seed=42)
+    assert len(sampled) == 30 and set(sampled) <= ids
+    assert fake_collection.queries < 100
+    assert sampled == sample_uuids_by_cursor(fake_collection, 30, seed=42)
+
+
+def test_fetch_objects_by_ids_keeps_order(fake_collection):
+    uuids = [obj.uuid for obj in fake_collection.objects[::-7]]
+    objects = fetch_objects_by_ids(fake_collection, uuids, chunk_size=25, workers=3, return_properties=["title"])
+    assert [obj.uuid for obj in objects] == uuids
+    assert set(objects[0].properties) == {"title"}
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from more_europa.helpers import vector_store
+from more_europa.helpers.vector_store import WeaviateConnectionManager
+
+
+class FakeClient:
+    def __init__(self, **config):
+        self.config = config
+        self.ready = True
+        self.closed = False
+
+    def is_connected(self):
+        return not self.closed
+
+    def is_ready(self):
+        return self.ready
+
+    def close(self):
+        self.closed = True
+
+
+class FakeAsyncClient(FakeClient):
+    async def connect(self):
+        pass
+
+    async def is_ready(self):
+        return self.ready
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_weaviate(monkeypatch):
+    clients = []
+
+    def connect(client_class):
+        def factory(**config):
+            clients.append(client_class(**config))
+            return clients[-1]
+        return factory
+
+    monkeypatch.setattr(vector_store.weaviate, "connect_to_custom", connect(FakeClient))
+    monkeypatch.setattr(vector_store.weaviate, "use_async_with_custom", connect(FakeAsyncClient))
+    return clients
+
+
+def test_client_is_reused_and_reconnected(fake_weaviate):
+    manager = WeaviateConnectionManager(health_check_interval=0, http_host="weaviate.test")
+    client = manager.client()
+    assert client.config["http_host"] == "weaviate.test"
+    assert manager.client() is client
+    assert len(fake_weaviate) == 1
+
+    client.ready = False
+    assert manager.client() is not client
+    assert client.closed and len(fake_weaviate) == 2
+
+
+def test_context_manager_closes(fake_weaviate):
+    with WeaviateConnectionManager() as client:
+        assert not client.closed
+    assert client.closed
+
+
+def test_shared_managers(fake_weaviate):
+    assert vector_store.get_weaviate_client(http_host="a") is vector_store.get_weaviate_client(http_host="a")
+    assert vector_store.get_weaviate_client(http_host="a") is not vector_store.get_weaviate_client(http_host="b")
+    vector_store.close_weaviate_clients()
+    assert all(client.closed for client in fake_weaviate)
+
+
+@pytest.mark.asyncio
+async def test_async_client(fake_weaviate):
+    manager = WeaviateConnectionManager(health_check_interval=0)
+    async with manager as client:
+        assert await manager.aclient() is client
+        client.ready = False
+        assert await manager.aclient() is not client
+    assert fake_weaviate[-1].closed
+
+
+def test_async_client_per_event_loop(fake_weaviate):
+    manager = WeaviateConnectionManager(health_check_interval=60)
+    first = asyncio.run(manager.aclient())
+    second = asyncio.run(manager.aclient())
+    assert second is not first
+    assert len(fake_weaviate) == 2
+
+    async def reuse():
+        return await manager.aclient() is await manager.aclient()
+
+    assert asyncio.run(reuse())
@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+HEAVY_MODULES = ["weaviate", "mistralai", "lmdb", "numpy", "pandas"]
+
+
+def loaded_modules(code: str) -> list:
+    """Runs code in a fresh interpreter and returns the heavy modules it loaded."""
+    check = f"{code}\nimport sys\nprint(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    output = subprocess.run([sys.executable, "-c", check], env=env, check=True, capture_output=True, text=True).stdout
+    return [module for module in output.strip().split(",") if module]
+
+
+def test_packages_import_no_heavy_dependency():
+    assert loaded_modules("import llm_inference.backends, llm_inference.cache, more_europa.helpers") == []
+
+
+def test_attributes_are_loaded_on_first_use():
+    assert loaded_modules("from llm_inference.cache import DiskCacheStorage\nfrom more_europa.helpers import prefilter") == []
+    assert "mistralai" in loaded_modules("from llm_inference.backends import MistralBackend")
+    assert "numpy" in loaded_modules("from more_europa import helpers\nhelpers.dedup")
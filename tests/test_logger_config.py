@@ -0,0 +1,49 @@
+import io
+import json
+import logging
+
+import pytest
+
+from llm_inference.logger_config import RateLimitFilter, configure_logging, stop_logging
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    stop_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def test_queued_json_lines(restore_root_logger):
+    stream = io.StringIO()
+    configure_logging(level="INFO", json_lines=True, stream=stream)
+    logger = logging.getLogger("llm_inference.test")
+    logger.info("Found %d/%d keys", 3, 4, extra={"storage": "disk"})
+    logger.debug("Not written")
+    stop_logging()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(lines) == 1
+    assert lines[0]["message"] == "Found 3/4 keys"
+    assert lines[0]["level"] == "INFO" and lines[0]["storage"] == "disk"
+
+
+def test_rate_limit_filter(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("llm_inference.logger_config.time.monotonic", lambda: now[0])
+    rate_limit = RateLimitFilter(max_per_second=2)
+
+    def record(msg, level=logging.INFO):
+        return logging.LogRecord("cache", level, __file__, 1, msg, ("key",), None)
+
+    assert [rate_limit.filter(record("Cache hit for key: %s")) for _ in range(4)] == [True, True, False, False]
+    assert rate_limit.filter(record("Other message: %s"))
+    assert rate_limit.filter(record("Cache hit for key: %s", logging.WARNING))
+
+    now[0] = 1.5
+    passed = record("Cache hit for key: %s")
+    assert rate_limit.filter(passed)
+    assert passed.suppressed == 2